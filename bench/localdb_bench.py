@@ -0,0 +1,254 @@
+# bench/localdb_bench.py
+# LocalDB ölçek benchmark'ı: sentetik veriyle (bench/synthetic.py) 1k/10k/100k/1M görevde
+# replace_all, okuma sorguları, tekil yazımlar, kuyruk ve pomodoro sorgularını ölçer.
+# Sonuçlar JSON'dur; --compare ile önceki bir koşuyla karşılaştırılır.
+#
+#   python -m bench.localdb_bench                         # tüm ölçekler, JSON stdout'a
+#   python -m bench.localdb_bench --sizes 1k,10k --out base.json
+#   python -m bench.localdb_bench --sizes 10k --compare base.json
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from bench import synthetic
+from services.local_db import DEFAULT_DURABILITY, DURABILITY_PROFILES, LocalDB
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = "1k,10k,100k,1m"
+SESSION_CHUNK = 50_000
+QUEUE_PER_TASK = 0.05  # dequeue_all öncesi kuyrukta bekleyen yerel değişiklik (görev başına)
+
+class _Recorder:
+    def __init__(self, scale: str, n_tasks: int):
+        self.scale = scale
+        self.n_tasks = n_tasks
+        self.results: List[Dict[str, Any]] = []
+
+    def once(self, op: str, fn: Callable[..., Any], *args: Any) -> Any:
+        t0 = time.perf_counter()
+        out = fn(*args)
+        self._add(op, [time.perf_counter() - t0], out)
+        return out
+
+    def repeat(self, op: str, fn: Callable[..., Any], runs: int, *args: Any) -> Any:
+        times, out = [], None
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            out = fn(*args)
+            times.append(time.perf_counter() - t0)
+        self._add(op, times, out)
+        return out
+
+    def per_op(self, op: str, fns: List[Callable[[], Any]]):
+        """Her çağrı ayrı ölçülür (tekil yazımlar: her biri kendi commit'i)."""
+        times = []
+        for fn in fns:
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        self._add(op, times, None)
+
+    def _add(self, op: str, times: List[float], out: Any):
+        ms = [t * 1000 for t in times]
+        self.results.append({
+            "scale": self.scale,
+            "tasks": self.n_tasks,
+            "op": op,
+            "runs": len(ms),
+            "median_ms": round(statistics.median(ms), 3),
+            "min_ms": round(min(ms), 3),
+            "max_ms": round(max(ms), 3),
+            "total_ms": round(sum(ms), 3),
+            "rows": len(out) if isinstance(out, list) else None,
+        })
+        print(f"  {self.scale:>5} {op:<36} median {statistics.median(ms):10.2f} ms  (n={len(ms)})", file=sys.stderr)
+
+def bench_scale(scale: str, n: int, workdir: str, seed: int, repeat: int, ops: int,
+                durability: str) -> List[Dict[str, Any]]:
+    path = os.path.join(workdir, f"bench-{scale}.db")
+    for f in (path, path + "-wal", path + "-shm"):
+        if os.path.exists(f):
+            os.remove(f)
+    rec = _Recorder(scale, n)
+    db = LocalDB(path, durability=durability)
+
+    # ---- yükleme (bootstrap: boş DB'ye tam çekim) ----
+    # veri argüman olarak geçilir: listeler aşağıda del ile bırakılır
+    rec.once("replace_all.tags", db.replace_all, "tags", synthetic.tags(seed))
+    tasks = synthetic.tasks(n, seed)
+    rec.once("replace_all.tasks", db.replace_all, "tasks", tasks)
+    events = synthetic.events(n, seed)
+    rec.once("replace_all.events", db.replace_all, "events", events)
+
+    def load_sessions():
+        chunk: List[Dict[str, Any]] = []
+        for s in synthetic.pomodoro_sessions(n, seed):
+            chunk.append(s)
+            if len(chunk) >= SESSION_CHUNK:
+                db.merge_rows("pomodoro_sessions", chunk)
+                chunk = []
+        if chunk:
+            db.merge_rows("pomodoro_sessions", chunk)
+    rec.once("merge_rows.pomodoro_sessions", load_sessions)
+
+    # ---- yenileme (sunucuda değişiklik yok) ----
+    rec.once("replace_all.tasks.unchanged", db.replace_all, "tasks", tasks)
+    rec.once("replace_all.events.unchanged", db.replace_all, "events", events)
+    del tasks, events
+
+    # ---- snapshot (yedek/geri yükleme; boş DB'ye import toplu yükleme yolunu kullanır) ----
+    snap = os.path.join(workdir, f"snapshot-{scale}.jsonl")
+    restore_path = os.path.join(workdir, f"bench-{scale}-restore.db")
+    for f in (restore_path, restore_path + "-wal", restore_path + "-shm"):
+        if os.path.exists(f):
+            os.remove(f)
+
+    def export_snapshot():
+        with open(snap, "w", encoding="utf-8") as f:
+            return db.export_snapshot(f)
+    counts = rec.once("snapshot.export", export_snapshot)
+    restore = LocalDB(restore_path, durability=durability)
+
+    def import_snapshot():
+        with open(snap, encoding="utf-8") as f:
+            return restore.import_snapshot(f)
+    rec.once("snapshot.import.empty", import_snapshot)
+    rec.once("snapshot.import.unchanged", import_snapshot)
+    restore.close()
+    rec.results.append({"scale": scale, "tasks": n, "op": "snapshot_rows", "value": sum(counts.values())})
+
+    # ---- okumalar (UI her emit'te) ----
+    week_start = synthetic.ANCHOR.isoformat()
+    week_end = (synthetic.ANCHOR + timedelta(days=7)).isoformat()
+    month_start = synthetic.ANCHOR.date().isoformat()
+    month_end = (synthetic.ANCHOR + timedelta(days=30)).date().isoformat()
+    rec.repeat("get_tasks", db.get_tasks, repeat)
+    rec.repeat("get_tasks.tag", lambda: db.get_tasks(tag_ids=[1]), repeat)
+    rec.repeat("get_tasks_columnar", db.get_tasks_columnar, repeat)
+    rec.repeat("get_events", db.get_events, repeat)
+    rec.repeat("get_events_in_range.week", lambda: db.get_events_in_range(week_start, week_end), repeat)
+    rec.repeat("get_events_in_range.week.expand",
+               lambda: db.get_events_in_range(week_start, week_end, expand_recurring=True), repeat)
+    rec.repeat("search", lambda: db.search("rapor toplantı"), repeat)
+    rec.repeat("get_subtree.root", lambda: db.get_subtree(1), repeat)
+
+    # ---- pomodoro ----
+    # en çok oturumu olan görev (sentetik veride 1 numaralı görevin oturumu olmayabilir)
+    busiest = max(db.pomodoro_rollup("task"), key=lambda r: r["sessions"])["task_id"]
+    rec.repeat("list_pomodoro_sessions_for_task", db.list_pomodoro_sessions_for_task, repeat, busiest)
+    rec.repeat("pomodoro_rollup.day.month",
+               lambda: db.pomodoro_rollup("day", start_day=month_start, end_day=month_end), repeat)
+    rec.repeat("pomodoro_rollup.task", lambda: db.pomodoro_rollup("task"), repeat)
+    rec.repeat("pomodoro_rollup.tag", lambda: db.pomodoro_rollup("tag"), repeat)
+    rec.repeat("pomodoro_rollup.project", lambda: db.pomodoro_rollup("project"), repeat)
+
+    # ---- tekil yazımlar (her biri bir commit; UI'deki düzenlemeler) ----
+    rec.per_op("upsert_task.new", [
+        lambda i=i: db.upsert_task(None, f"bench {i}", "", None) for i in range(ops)
+    ])
+    rec.per_op("upsert_task.update", [
+        lambda i=i: db.upsert_task(1 + i, f"bench edit {i}", "not", None) for i in range(ops)
+    ])
+    rec.per_op("set_task_status", [
+        lambda i=i: db.set_task_status(1 + i, "done") for i in range(ops)
+    ])
+    rec.per_op("create_event", [
+        lambda i=i: db.create_event(1 + i, week_start, week_end) for i in range(ops)
+    ])
+    rec.per_op("insert_pomodoro_session", [
+        lambda i=i: db.insert_pomodoro_session(1 + i, week_start, week_end, 1500, 1500, "") for i in range(ops)
+    ])
+
+    # ---- kuyruk (ölçekle orantılı; her görev ayrı kayıt, birleştirilmez) ----
+    with db.transaction():
+        for tid in range(ops + 1, ops + 1 + int(n * QUEUE_PER_TASK)):
+            db.set_task_status(tid, "done")
+    rec.once("dequeue_all", db.dequeue_all)
+
+    db.close()
+    rec.results.append({"scale": scale, "tasks": n, "op": "db_size_bytes", "value": os.path.getsize(path)})
+    return rec.results
+
+def compare(base: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """(scale, op) eşleşen ölçümler için median oranı (new / base; <1 hızlanma)."""
+    old = {(r["scale"], r["op"]): r for r in base["results"] if "median_ms" in r}
+    out = []
+    for r in new["results"]:
+        b = old.get((r["scale"], r["op"]))
+        if b is None or "median_ms" not in r:
+            continue
+        ratio = r["median_ms"] / b["median_ms"] if b["median_ms"] else None
+        out.append({"scale": r["scale"], "op": r["op"], "base_ms": b["median_ms"],
+                    "new_ms": r["median_ms"], "ratio": round(ratio, 3) if ratio is not None else None})
+    return out
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m bench.localdb_bench")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help=f"virgüllü: {', '.join(SCALES)} ya da sayı")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=5, help="okuma sorgusu başına tekrar")
+    ap.add_argument("--ops", type=int, default=200, help="tekil yazım testlerinde işlem sayısı")
+    ap.add_argument("--durability", default=DEFAULT_DURABILITY, choices=sorted(DURABILITY_PROFILES))
+    ap.add_argument("--workdir", help="DB dosyalarının yeri (verilirse silinmez)")
+    ap.add_argument("--out", help="JSON sonuç dosyası (yoksa stdout)")
+    ap.add_argument("--compare", help="karşılaştırılacak önceki JSON sonuç dosyası")
+    args = ap.parse_args(argv)
+
+    sizes = []
+    for s in args.sizes.split(","):
+        s = s.strip().lower()
+        if s:
+            sizes.append((s, SCALES[s] if s in SCALES else int(s)))
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="localdb-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    results: List[Dict[str, Any]] = []
+    try:
+        for scale, n in sizes:
+            print(f"== {scale} ({n} görev)", file=sys.stderr)
+            results.extend(bench_scale(scale, n, workdir, args.seed, args.repeat, args.ops, args.durability))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "ops": args.ops,
+            "durability": args.durability,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["compare"] = compare(json.load(f), report)
+        for c in report["compare"]:
+            print(f"  {c['scale']:>5} {c['op']:<36} {c['base_ms']:10.2f} -> {c['new_ms']:10.2f} ms  x{c['ratio']}",
+                  file=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=1)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
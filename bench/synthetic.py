@@ -0,0 +1,104 @@
+# bench/synthetic.py
+# LocalDB benchmark'ları için tohumlu (seed) sentetik veri. Satırlar sunucudan (supabase_api.fetch_*)
+# gelen biçimdedir; replace_all/merge_rows doğrudan yutar. Aynı seed + boyut her zaman aynı veriyi üretir.
+# Her tablo kendi RNG'siyle üretilir: büyük ölçekte tablolar sırayla üretilip bırakılabilir.
+
+from __future__ import annotations
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+# Zamanlar sabit bir güne göre üretilir (koşular arası karşılaştırılabilir olsun)
+ANCHOR = datetime(2025, 1, 6)  # pazartesi
+SPAN_DAYS = 365
+START = ANCHOR - timedelta(days=SPAN_DAYS // 2)
+
+N_TAGS = 50
+EVENTS_PER_TASK = 0.5
+RECURRING_RATIO = 0.05
+SESSIONS_PER_TASK = 1.0
+PARENT_RATIO = 0.1  # hiyerarşi trigger'ları da ölçülsün
+
+STATUSES = ("todo", "in_progress", "done")
+WORDS = (
+    "rapor", "toplantı", "sunum", "kod", "inceleme", "plan", "bütçe", "müşteri", "tasarım", "test",
+    "report", "meeting", "review", "deploy", "draft", "budget", "design", "sprint", "email", "call",
+)
+RRULES = (
+    "RRULE=FREQ=DAILY;INTERVAL=1",
+    "RRULE=FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "RRULE=FREQ=WEEKLY;INTERVAL=2",
+    "RRULE=FREQ=MONTHLY;BYMONTHDAY=15",
+    "RRULE=FREQ=DAILY;COUNT=10",
+)
+
+def _rng(seed: int, table: str) -> random.Random:
+    return random.Random(f"{seed}:{table}")
+
+def _ts(d: datetime) -> str:
+    return d.isoformat(timespec="seconds")
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def tags(seed: int = 42, n_tags: int = N_TAGS) -> List[Dict[str, Any]]:
+    return [{"id": i, "name": f"tag-{i}"} for i in range(1, n_tags + 1)]
+
+def tasks(n_tasks: int, seed: int = 42, n_tags: int = N_TAGS) -> List[Dict[str, Any]]:
+    rng = _rng(seed, "tasks")
+    out: List[Dict[str, Any]] = []
+    for i in range(1, n_tasks + 1):
+        created = START + timedelta(seconds=rng.randrange(SPAN_DAYS * 86400))
+        updated = created + timedelta(seconds=rng.randrange(30 * 86400))
+        due = created + timedelta(days=rng.randrange(1, 60))
+        out.append({
+            "id": i,
+            "title": _text(rng, rng.randint(2, 5)),
+            "notes": _text(rng, rng.randint(0, 20)),
+            "status": rng.choice(STATUSES),
+            "due_date": due.date().isoformat() if rng.random() < 0.6 else None,
+            "has_time": 1 if rng.random() < EVENTS_PER_TASK / 2 else 0,
+            "deleted": 1 if rng.random() < 0.02 else 0,
+            "created_at": _ts(created),
+            "updated_at": _ts(updated),
+            "tag_id": rng.randint(1, n_tags) if n_tags and rng.random() < 0.8 else None,
+            "parent_id": rng.randint(1, i - 1) if i > 1 and rng.random() < PARENT_RATIO else None,
+        })
+    return out
+
+def events(n_tasks: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rng = _rng(seed, "events")
+    out: List[Dict[str, Any]] = []
+    for i in range(1, int(n_tasks * EVENTS_PER_TASK) + 1):
+        begin = START + timedelta(days=rng.randrange(SPAN_DAYS), hours=rng.randint(7, 19))
+        end = begin + timedelta(minutes=rng.choice((15, 30, 45, 60, 90, 120)))
+        out.append({
+            "id": i,
+            "task_id": rng.randint(1, n_tasks),
+            "title": _text(rng, rng.randint(2, 5)),
+            "notes": _text(rng, rng.randint(0, 10)),
+            "start_ts": _ts(begin),
+            "end_ts": _ts(end),
+            "rrule": rng.choice(RRULES) if rng.random() < RECURRING_RATIO else None,
+            "deleted": 1 if rng.random() < 0.02 else 0,
+            "updated_at": _ts(begin - timedelta(days=rng.randrange(1, 30))),
+        })
+    return out
+
+def pomodoro_sessions(n_tasks: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Oturumlar yalnızca eklenir; parça parça merge edilebilsin diye generator."""
+    rng = _rng(seed, "pomodoro_sessions")
+    for i in range(1, int(n_tasks * SESSIONS_PER_TASK) + 1):
+        planned = rng.choice((900, 1500, 1500, 1500, 3000))
+        actual = max(60, int(planned * rng.uniform(0.3, 1.1)))
+        ended = START + timedelta(seconds=rng.randrange(SPAN_DAYS * 86400))
+        yield {
+            "id": i,
+            "task_id": rng.randint(1, n_tasks),
+            "started_at": _ts(ended - timedelta(seconds=actual)),
+            "ended_at": _ts(ended),
+            "planned_secs": planned,
+            "actual_secs": actual,
+            "note": _text(rng, rng.randint(0, 6)),
+            "created_at": _ts(ended),
+        }
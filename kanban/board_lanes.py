@@ -2,7 +2,7 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 from theme.colors import COLOR_TEXT, COLOR_SECONDARY_BG
 
 class TaskLane(QtWidgets.QListWidget):
-    dropped = QtCore.pyqtSignal(int)  # task_id
+    dropped = QtCore.pyqtSignal(object)  # task_id (63 bit)
 
     def __init__(self, title: str, parent=None):
         super().__init__(parent)
@@ -88,8 +88,8 @@ class TaskLane(QtWidgets.QListWidget):
                 it.setSizeHint(QtCore.QSize(w, sz.height()))
 
 class KanbanBoard(QtWidgets.QWidget):
-    statusChanged = QtCore.pyqtSignal(int, str)  # (task_id, new_status)
-    taskActivated = QtCore.pyqtSignal(int)       # task_id
+    statusChanged = QtCore.pyqtSignal(object, str)  # (task_id, new_status)
+    taskActivated = QtCore.pyqtSignal(object)       # task_id
 
     def __init__(self, parent=None):
         super().__init__(parent)
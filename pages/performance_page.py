@@ -1,13 +1,64 @@
+from datetime import date, timedelta
 from PyQt6 import QtWidgets
 from theme.colors import COLOR_PRIMARY_BG, COLOR_SECONDARY_BG, COLOR_TEXT
 
+def _fmt_secs(secs: int | None) -> str:
+    m = int(secs or 0) // 60
+    return f"{m // 60}h {m % 60:02d}m" if m >= 60 else f"{m}m"
+
+def _fmt_ratio(ratio: float | None) -> str:
+    return f"%{round(ratio * 100)}" if ratio else "—"
+
 class PerformancePage(QtWidgets.QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._store = None
         self.setStyleSheet(f"background:{COLOR_PRIMARY_BG}; color:{COLOR_TEXT};")
         v = QtWidgets.QVBoxLayout(self); v.setContentsMargins(12,12,12,12); v.setSpacing(8)
         title = QtWidgets.QLabel("Performance"); title.setStyleSheet("font-size:20px; font-weight:600;")
         v.addWidget(title)
         card = QtWidgets.QFrame(); card.setStyleSheet(f"background:{COLOR_SECONDARY_BG}; border:1px solid #3a3a3a; border-radius:12px;")
-        v2 = QtWidgets.QVBoxLayout(card); v2.addWidget(QtWidgets.QLabel("Coming soon…"))
+        v2 = QtWidgets.QVBoxLayout(card)
+        self.lbl_summary = QtWidgets.QLabel("Henüz pomodoro kaydı yok"); v2.addWidget(self.lbl_summary)
+        row = QtWidgets.QHBoxLayout(); row.setSpacing(8)
+        self.list_days  = QtWidgets.QListWidget()
+        self.list_tasks = QtWidgets.QListWidget()
+        self.list_tags  = QtWidgets.QListWidget()
+        for label, lst in (("Son 7 gün", self.list_days), ("Görevler", self.list_tasks), ("Etiketler", self.list_tags)):
+            col = QtWidgets.QVBoxLayout(); col.addWidget(QtWidgets.QLabel(label)); col.addWidget(lst, 1)
+            row.addLayout(col, 1)
+        v2.addLayout(row, 1)
         v.addWidget(card, 1)
+
+    # ---- Orchestrator entegrasyonu ----
+    def set_store(self, store):
+        self._store = store
+        if hasattr(store, "pomodoroUpdated"):
+            store.pomodoroUpdated.connect(lambda _tid: self.reload())
+        self.reload()
+
+    def reload(self):
+        if not self._store:
+            return
+        today = date.today()
+        start, end = (today - timedelta(days=6)).isoformat(), (today + timedelta(days=1)).isoformat()
+        try:
+            days  = self._store.get_pomodoro_rollup("day", start_day=start, end_day=end)
+            tasks = self._store.get_pomodoro_rollup("task", start_day=start, end_day=end)
+            tags  = self._store.get_pomodoro_rollup("tag", start_day=start, end_day=end)
+        except Exception:
+            return
+        total = sum(int(d["actual_secs"] or 0) for d in days)
+        planned = sum(int(d["planned_secs"] or 0) for d in days)
+        self.lbl_summary.setText(
+            f"Son 7 gün odak: {_fmt_secs(total)} — plan/gerçek {_fmt_ratio(total / planned if planned else None)}"
+        )
+        self.list_days.clear()
+        for d in days:
+            self.list_days.addItem(f"{d['day']} — {_fmt_secs(d['actual_secs'])} ({d['sessions']} oturum)")
+        self.list_tasks.clear()
+        for t in sorted(tasks, key=lambda r: -int(r["actual_secs"] or 0)):
+            self.list_tasks.addItem(f"{t['title'] or 'Task #%s' % t['task_id']} — {_fmt_secs(t['actual_secs'])} {_fmt_ratio(t['ratio'])}")
+        self.list_tags.clear()
+        for g in tags:
+            self.list_tags.addItem(f"{g['tag'] or 'Etiketsiz'} — {_fmt_secs(g['actual_secs'])}")
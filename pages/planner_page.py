@@ -7,6 +7,7 @@ from kanban.board_lanes import KanbanBoard
 from theme.colors import COLOR_PRIMARY_BG, COLOR_SECONDARY_BG
 from services.sync_orchestrator import SyncOrchestrator
 from pages.pomodoro_page import PomodoroPage
+from utils.timeutil import from_epoch
 
 # Diyalog (tek ekran – task/event)
 try:
@@ -165,7 +166,9 @@ class PlannerPage(QtWidgets.QWidget):
         self.store.tagsUpdated.connect(self._apply_tags)
         if hasattr(self.left, "attachStore"):
             self.left.attachStore(self.store)
+        self._push_event_window()
         self.store.bootstrap()
+        self.store.start_background_sync()
 
     def _on_refresh_clicked(self):
         self.store.refresh()
@@ -243,12 +246,9 @@ class PlannerPage(QtWidgets.QWidget):
     def _open_task_dialog_by_id(self, task_id: int):
         if not EventTaskDialog:
             return
-        # Lokalden oku
+        # Lokalden oku (store'un id önbelleği)
         try:
-            from services.local_db import LocalDB
-            db = getattr(self, "_debug_db_singleton", None) or LocalDB()
-            self._debug_db_singleton = db
-            t = db.get_task_by_id(int(task_id))
+            t = self.store.get_task(int(task_id))
         except Exception:
             t = None
         m = ItemModel(kind="task", id=int(task_id), title=(t or {}).get("title", ""), notes=(t or {}).get("notes", ""))
@@ -266,10 +266,17 @@ class PlannerPage(QtWidgets.QWidget):
         if not EventTaskDialog:
             return
         m = ItemModel(kind="event", id=getattr(evb, "id", None), title=getattr(evb, "title", ""), notes=getattr(evb, "notes", ""))
-        d = QtCore.QDate(evb.start.year, evb.start.month, evb.start.day)
+        start, end = evb.start, evb.end
+        if getattr(evb, "occurrence_of", None) is not None:
+            # Oluşum seriyi açar: kaydetme üst event'in kendi zamanını korusun (bütün seri kaymasın)
+            parent = self.store.get_event(int(evb.occurrence_of))
+            if parent is None or parent.get("start_epoch") is None or parent.get("end_epoch") is None:
+                return
+            start, end = from_epoch(parent["start_epoch"]), from_epoch(parent["end_epoch"])
+        d = QtCore.QDate(start.year, start.month, start.day)
         m.date = d
-        m.start = QtCore.QTime(evb.start.hour, evb.start.minute)
-        m.end   = QtCore.QTime(evb.end.hour, evb.end.minute)
+        m.start = QtCore.QTime(start.hour, start.minute)
+        m.end   = QtCore.QTime(end.hour, end.minute)
         m.task_id = getattr(evb, "task_id", None)
         m.rrule   = getattr(evb, "rrule", None)
         dlg = EventTaskDialog(m, self)
@@ -316,11 +323,10 @@ class PlannerPage(QtWidgets.QWidget):
             self.store.delete_task(int(model.id))
 
     # ---------------- Apply data to UI ----------------
-    def _apply_tasks(self, tasks: list[dict]):
-        # has_time=1 olanları gizle
-        filtered = [t for t in tasks if not bool(t.get("has_time", 0))]
+    def _apply_tasks(self, tasks: list):
+        # has_time=1 olanlar LocalDB sorgusunda zaten elendi (SQL_GET_TASKS)
         if hasattr(self.kanban, "set_tasks"):
-            self.kanban.set_tasks(filtered)
+            self.kanban.set_tasks(tasks)
 
     def _apply_events(self, events: list[dict]):
         if hasattr(self.week, "setEvents"):
@@ -363,11 +369,18 @@ class PlannerPage(QtWidgets.QWidget):
         self.stacked.setCurrentIndex(0 if mode == "weekly" else 1)
 
     def on_tags_changed(self, s: set):
-        pass
+        # Süzme LocalDB'de yapılır; sonuç tasksUpdated/eventsUpdated ile gelir
+        self.store.set_tag_filter(s)
 
     def on_anchor_date_changed(self, qdate: QtCore.QDate):
         self._anchor_date = qdate
         if hasattr(self.week, "setAnchorDate"): self.week.setAnchorDate(qdate)
+        self._push_event_window()
+
+    def _push_event_window(self):
+        # Haftalık görünümün 7 günü; prefetch payını orchestrator ekler
+        monday = self._anchor_date.addDays(-(self._anchor_date.dayOfWeek() - 1))
+        self.store.set_event_window(_to_iso_qdate(monday), _to_iso_qdate(monday.addDays(7)))
 
     # ---------------- Week view block hareketi ----------------
     def _on_block_created(self, ev: EventBlock):
@@ -377,16 +390,22 @@ class PlannerPage(QtWidgets.QWidget):
                                      QtCore.QTime(ev.end.hour, ev.end.minute)).toString(QtCore.Qt.DateFormat.ISODate)
         task_id   = int(getattr(ev, "task_id", 0) or 0)
         if task_id and start_iso and end_iso:
-            self.store.create_event(task_id, start_iso, end_iso)
+            t = self.store.get_task(task_id)
+            self.store.create_event(task_id, start_iso, end_iso, title=(t or {}).get("title"))
 
     def _on_block_moved(self, ev: EventBlock):
+        # tekrarlayan oluşumun id'si serinindir: güncelleme bütün seriyi taşırdı
+        if getattr(ev, "occurrence_of", None) is not None:
+            return
         if getattr(ev, "id", None):
             start_iso = QtCore.QDateTime(QtCore.QDate(ev.start.year, ev.start.month, ev.start.day),
                                          QtCore.QTime(ev.start.hour, ev.start.minute)).toString(QtCore.Qt.DateFormat.ISODate)
             end_iso   = QtCore.QDateTime(QtCore.QDate(ev.end.year, ev.end.month, ev.end.day),
                                          QtCore.QTime(ev.end.hour, ev.end.minute)).toString(QtCore.Qt.DateFormat.ISODate)
             if start_iso and end_iso:
-                self.store.update_event(int(ev.id), start_iso, end_iso)
+                # taşıma/boyutlandırma yalnızca saati yazar: diğer alanları okuyup geri yazmak,
+                # henüz yayınlanmamış (commit edilmiş) bir düzenlemeyi eski değerle ezebilirdi
+                self.store.move_event(int(ev.id), start_iso, end_iso)
 
     def _on_block_resized(self, ev: EventBlock):
         self._on_block_moved(ev)
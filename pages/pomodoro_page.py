@@ -24,6 +24,9 @@ except Exception:  # pragma: no cover - fallback colors
     COLOR_TEXT_MUTED = "#AEAEAE"
     COLOR_ACCENT = "#15B4B9"
 
+# Görev panelinde gösterilen durumlar
+_IN_PROGRESS = ("in progress", "in_progress", "progress", "working", "doing")
+
 
 class PomodoroPage(QtWidgets.QWidget):
     """
@@ -56,6 +59,8 @@ class PomodoroPage(QtWidgets.QWidget):
         self._tick_start_mono_ms: int = 0
         self._store: Any = None
         self._task_fetcher: Optional[Callable[[], List[Dict[str, Any]]]] = None
+        self._tag_names: Dict[int, str] = {}  # tag_id -> ad (görevlerde yalnızca tag_id var)
+        self._hierarchy: Dict[int, Dict[str, Any]] = {}  # task_id -> parent/project adları
 
         self._timer = QtCore.QTimer(self)
         self._timer.setInterval(1000)
@@ -80,6 +85,12 @@ class PomodoroPage(QtWidgets.QWidget):
     ):
         self._store = store
         self._task_fetcher = None
+        if hasattr(store, "tagsUpdated"):
+            store.tagsUpdated.connect(self.set_tags)
+        try:
+            self._tag_names = {int(g["id"]): g["name"] for g in store.db.get_tags()}
+        except Exception:
+            pass
         for name in fetcher_name_candidates:
             if hasattr(store, name):
                 fn = getattr(store, name)
@@ -96,9 +107,18 @@ class PomodoroPage(QtWidgets.QWidget):
         self.reload_tasks()
 
     def set_tasks(self, tasks: List[Dict[str, Any]]):
+        if self._store is not None and hasattr(self._store, "get_task_hierarchy"):
+            try:
+                self._hierarchy = self._store.get_task_hierarchy()
+            except Exception:
+                self._hierarchy = {}
         self._task_fetcher = lambda: self._normalize_tasks(tasks)
         self.reload_tasks()
 
+    def set_tags(self, tags: List[Dict[str, Any]]):
+        self._tag_names = {int(g["id"]): g["name"] for g in tags or []}
+        self.reload_tasks()
+
     def reload_tasks(self):
         items = []
         if self._task_fetcher:
@@ -106,13 +126,6 @@ class PomodoroPage(QtWidgets.QWidget):
                 items = self._task_fetcher() or []
             except Exception:
                 items = []
-        # Sadece "In Progress"
-        items = [
-            t
-            for t in items
-            if (t.get("status") or "").lower()
-            in ("in progress", "in_progress", "progress", "working", "doing")
-        ]
         self._tasks_all = items
         self._fill_tag_project_filters()
 
@@ -316,16 +329,23 @@ class PomodoroPage(QtWidgets.QWidget):
     # ------------------------------ Tasks Sidebar -------------------------------
 
     def _normalize_tasks(self, tasks: Any) -> List[Dict[str, Any]]:
+        # Sadece "In Progress" görevler; diğerleri için dict hiç oluşturulmaz
         out: List[Dict[str, Any]] = []
         for t in tasks or []:
-            if isinstance(t, dict):
+            if hasattr(t, "get"):  # dict veya services.records kaydı
+                status = t.get("status") or t.get("state") or ""
+                if status.lower() not in _IN_PROGRESS:
+                    continue
                 tid = t.get("id") or t.get("task_id")
                 title = t.get("title") or t.get("name") or f"Task {tid}"
-                tag = t.get("tag") or t.get("tag_name") or ""
-                proj = t.get("project") or t.get("project_name") or ""
-                parent = t.get("parent") or t.get("parent_title") or ""
-                status = t.get("status") or t.get("state") or ""
+                tag = t.get("tag") or t.get("tag_name") or self._tag_names.get(t.get("tag_id"), "")
+                h = self._hierarchy.get(tid) or {}
+                proj = t.get("project") or t.get("project_name") or h.get("project") or ""
+                parent = t.get("parent") or t.get("parent_title") or h.get("parent") or ""
+                if parent == proj:  # doğrudan projenin altında
+                    parent = ""
             elif isinstance(t, (tuple, list)) and len(t) >= 2:
+                # (id, title) çifti: durum bilgisi yok, liste çağıranda süzülmüş sayılır
                 tid, title = t[0], t[1]
                 tag = proj = parent = status = ""
             else:
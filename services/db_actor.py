@@ -0,0 +1,91 @@
+# services/db_actor.py
+# Tek yazıcı (single-writer) LocalDB: yazma bağlantısının sahibi ayrı bir thread'dir.
+# GUI thread komutları kuyruğa atar ve hemen döner; sonuç concurrent.futures.Future ile
+# ya da Qt sinyaliyle (committed/failed, GUI thread'e kuyruklu teslim) gelir.
+# Okumalar LocalDB(readonly=True) bağlantılarıyla yapılır; WAL sayesinde yazıcıyı beklemez.
+
+from __future__ import annotations
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Union
+from PyQt6 import QtCore
+from services.local_db import DB_PATH, DEFAULT_DURABILITY, LocalDB
+
+_STOP = object()
+
+class DBActor(QtCore.QObject):
+    committed = QtCore.pyqtSignal(str, object)  # komut adı, sonuç
+    failed    = QtCore.pyqtSignal(str, str)     # komut adı, hata
+
+    def __init__(self, path: str = DB_PATH, durability: str = DEFAULT_DURABILITY, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._ready = threading.Event()
+        self._init_error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, args=(durability,), name="LocalDB-writer", daemon=True
+        )
+        self._thread.start()
+        # Migration'lar yazıcıda çalışır; okuyucular ancak şema hazır olunca açılmalı
+        self._ready.wait()
+        if self._init_error is not None:
+            raise self._init_error
+
+    # ---- public ----
+    def submit(self, cmd: Union[str, Callable[..., Any]], *args, **kwargs) -> Future:
+        """
+        Yazma komutunu kuyruğa atar. cmd bir LocalDB metod adı ("upsert_task") ya da
+        ilk argümanı yazıcı LocalDB olan bir fonksiyondur.
+        """
+        fut: Future = Future()
+        if not self._thread.is_alive():
+            fut.set_exception(RuntimeError("DB writer kapalı"))
+            return fut
+        self._queue.put((cmd, args, kwargs, fut))
+        return fut
+
+    def call(self, cmd: Union[str, Callable[..., Any]], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """submit() + sonucu bekle (yalnızca sonucu hemen gereken çağrılar için)."""
+        return self.submit(cmd, *args, **kwargs).result(timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: Optional[float] = None):
+        """Kuyruktaki komutları bitirir ve yazıcıyı kapatır."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def open_reader(self) -> LocalDB:
+        return LocalDB(self.path, readonly=True)
+
+    # ---- writer thread ----
+    def _run(self, durability: str):
+        try:
+            db = LocalDB(self.path, durability=durability)
+        except BaseException as e:
+            self._init_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            cmd, args, kwargs, fut = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            name = cmd if isinstance(cmd, str) else getattr(cmd, "__name__", "command")
+            try:
+                fn = getattr(db, cmd) if isinstance(cmd, str) else (lambda *a, **k: cmd(db, *a, **k))
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                fut.set_exception(e)
+                self.failed.emit(name, str(e))
+                continue
+            fut.set_result(result)
+            self.committed.emit(name, result)
+        db.close()
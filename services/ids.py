@@ -0,0 +1,49 @@
+# services/ids.py
+# İstemcide üretilen, zamana göre sıralı 63 bit tamsayı id'ler (ULID/Snowflake benzeri):
+#   [41 bit: ID_EPOCH'tan beri milisaniye][22 bit: rastgele başlangıçlı sayaç]
+# Sunucu şemasındaki bigint PK'lara sığar; id'yi sunucu atamadığı için yeni satır için
+# round-trip beklenmez, farklı makinelerde çevrimdışı oluşturulan satırlar çakışmaz
+# (aynı milisaniyede 2^22 aralıkta rastgele başlangıç). Eski autoincrement id'ler
+# (< LEGACY_ID_MAX) geçerli kalır; yeniden anahtarlananlar LocalDB'de id_aliases'ta tutulur.
+
+from __future__ import annotations
+import secrets
+import threading
+import time
+from typing import Optional
+
+ID_EPOCH_MS = 1_577_836_800_000  # 2020-01-01T00:00:00Z
+TIME_BITS = 41                   # ~69 yıl
+SEQ_BITS = 22
+SEQ_MASK = (1 << SEQ_BITS) - 1
+# Bundan küçük id'ler eski (SQLite autoincrement / sunucu) id'leridir
+LEGACY_ID_MAX = 1 << 40
+
+_lock = threading.Lock()
+_last_ms = -1
+_seq = 0
+
+def new_id(now_ms: Optional[int] = None) -> int:
+    """Yeni benzersiz id; aynı süreçte art arda çağrılar kesin artan sırada döner."""
+    global _last_ms, _seq
+    with _lock:
+        ms = (int(time.time() * 1000) if now_ms is None else int(now_ms)) - ID_EPOCH_MS
+        if ms <= _last_ms:
+            # aynı milisaniye (veya saat geri gitti): sayaç ilerler, taşarsa sonraki ms'ye geçilir
+            ms = _last_ms
+            _seq = (_seq + 1) & SEQ_MASK
+            if _seq == 0:
+                ms += 1
+                _seq = secrets.randbits(SEQ_BITS - 1)
+        else:
+            # yarı aralıktan başla: aynı ms içinde sayaca yer kalsın
+            _seq = secrets.randbits(SEQ_BITS - 1)
+        _last_ms = ms
+        return (ms << SEQ_BITS) | _seq
+
+def id_time_ms(i: int) -> int:
+    """İstemci id'sinin üretildiği an (Unix ms)."""
+    return (int(i) >> SEQ_BITS) + ID_EPOCH_MS
+
+def is_client_id(i: int) -> bool:
+    return int(i) >= LEGACY_ID_MAX
@@ -1,276 +1,2052 @@
 from __future__ import annotations
-import os, sqlite3, json, datetime as dt
-from typing import Any, Dict, List, Optional
+import os, sqlite3, json, time, random, contextlib, pathlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from utils.timeutil import utc_now_iso, to_epoch
+from services import ids, recurrence
+from services.records import EventRow, SessionRow, TagRow, TaskRow
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "local.db")
 
+# Dayanıklılık profilleri: "safe" her commit'te tam fsync, "balanced" WAL + NORMAL
+# (commit başına fsync yok, checkpoint'te var; güç kesintisinde son commit'ler kaybolabilir
+# ama DB bozulmaz), "fast" test/bench içindir.
+DURABILITY_PROFILES: Dict[str, Dict[str, str]] = {
+    "safe":     {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "balanced": {"journal_mode": "WAL",    "synchronous": "NORMAL"},
+    "fast":     {"journal_mode": "WAL",    "synchronous": "OFF"},
+}
+DEFAULT_DURABILITY = "balanced"
+
+# sync_queue yeniden deneme: base * 2^attempts (±%20 jitter), üst sınır QUEUE_BACKOFF_MAX
+QUEUE_BACKOFF_BASE = 2.0
+QUEUE_BACKOFF_MAX = 15 * 60.0
+QUEUE_LEASE_SECS = 60.0
+
+# Bakım: senkronlanmış tombstone'lar bu kadar gün sonra silinir; bundan eski pomodoro
+# oturumları arşiv tablosuna taşınır (günlük rollup'lar pomodoro_daily'de kalır).
+TOMBSTONE_GRACE_DAYS = 7
+POMODORO_ARCHIVE_DAYS = 365
+VACUUM_STEP_PAGES = 2048
+
+# id ile okunan satırlar için bellek içi önbellek (tablo başına kayıt sayısı)
+ROW_CACHE_SIZE = 4096
+
+# merge_rows en az bu kadar satır yazacaksa FTS trigger'ları kapatılır; indeks farkı küme sorgularıyla yazılır
+FTS_BULK_MIN = 1000
+
 def _now_iso() -> str:
-    return dt.datetime.utcnow().isoformat()
+    return utc_now_iso()
 
-class LocalDB:
-    def __init__(self, path: str = DB_PATH):
-        self.path = path
-        self._conn = sqlite3.connect(self.path)
-        self._conn.row_factory = sqlite3.Row
-        self._ensure_schema()
-        # Pomodoro session table migration
-        self.migrate_add_pomodoro_sessions()
+# ---------------- Migrations ----------------
+# Her adım (version, fn) — fn ve schema_version güncellemesi tek bir transaction'dır (BEGIN IMMEDIATE,
+# hata olursa ROLLBACK); adım ya tamamen uygulanır ya hiç.
+# Yeni şema değişiklikleri buraya yeni bir adım olarak eklenir; eski adımlar değiştirilmez.
 
-    # ---------------- Schema ----------------
-    def _ensure_schema(self):
-        c = self._conn.cursor()
-        c.execute("""
-        CREATE TABLE IF NOT EXISTS tasks(
+def _m001_base_tables(c: sqlite3.Connection):
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS tasks(
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        notes TEXT DEFAULT '',
+        status TEXT DEFAULT 'todo',
+        due_date TEXT,
+        has_time INTEGER DEFAULT 0,
+        deleted INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT (datetime('now')),
+        updated_at TEXT DEFAULT (datetime('now'))
+    )""")
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS events(
+        id INTEGER PRIMARY KEY,
+        task_id INTEGER,
+        title TEXT,
+        notes TEXT DEFAULT '',
+        start_ts TEXT NOT NULL,
+        end_ts   TEXT NOT NULL,
+        rrule TEXT,
+        deleted INTEGER DEFAULT 0,
+        updated_at TEXT DEFAULT (datetime('now'))
+    )""")
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS tags(
+        id INTEGER PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL
+    )""")
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS sync_queue(
+        id INTEGER PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        op TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        created_at TEXT DEFAULT (datetime('now'))
+    )""")
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS pomodoro_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        started_at TEXT NOT NULL,
+        ended_at   TEXT NOT NULL,
+        planned_secs INTEGER NOT NULL,
+        actual_secs  INTEGER NOT NULL,
+        note TEXT DEFAULT '',
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+    )""")
+
+def _m002_hot_query_indexes(c: sqlite3.Connection):
+    # get_tasks: deleted=0 ... ORDER BY created_at DESC
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_deleted_created ON tasks(deleted, created_at)")
+    # get_events: deleted=0 ORDER BY start_ts
+    c.execute("CREATE INDEX IF NOT EXISTS idx_events_deleted_start ON events(deleted, start_ts)")
+    # list_pomodoro_sessions_for_task: task_id=? ORDER BY ended_at DESC
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pomodoro_task_ended ON pomodoro_sessions(task_id, ended_at)")
+
+def _m003_event_range_index(c: sqlite3.Connection):
+    # get_events_in_range: end_ts > window_start taraması geçmişi değil sadece
+    # pencereden sonrasını gezer; geçmiş büyüdükçe maliyet sabit kalır.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_events_deleted_end ON events(deleted, end_ts)")
+
+def _m004_sync_queue_row_id(c: sqlite3.Connection):
+    # Coalescing için hangi satıra ait olduğunu ayrı kolonda tut
+    c.execute("ALTER TABLE sync_queue ADD COLUMN row_id INTEGER")
+    c.execute("UPDATE sync_queue SET row_id = json_extract(payload, '$.id')")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_sync_queue_row ON sync_queue(table_name, row_id)")
+
+def _m005_sync_queue_leases(c: sqlite3.Connection):
+    c.execute("ALTER TABLE sync_queue ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    c.execute("ALTER TABLE sync_queue ADD COLUMN next_attempt_at REAL NOT NULL DEFAULT 0")
+    c.execute("ALTER TABLE sync_queue ADD COLUMN lease_until REAL")
+    c.execute("ALTER TABLE sync_queue ADD COLUMN last_error TEXT")
+
+def _m006_pomodoro_rollups(c: sqlite3.Connection):
+    # Sunucu şemasındaki tasks.tag_id (etiket bazlı toplamlar için)
+    c.execute("ALTER TABLE tasks ADD COLUMN tag_id INTEGER")
+    # Günlük toplamlar; ham oturumlar yeniden taranmaz. Gün = ended_at'in tarihi (_m018'den beri yerel saatle).
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS pomodoro_daily(
+        task_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        sessions INTEGER NOT NULL DEFAULT 0,
+        planned_secs INTEGER NOT NULL DEFAULT 0,
+        actual_secs INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(task_id, day)
+    ) WITHOUT ROWID""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pomodoro_daily_day ON pomodoro_daily(day)")
+    c.execute("""
+    INSERT INTO pomodoro_daily(task_id, day, sessions, planned_secs, actual_secs)
+    SELECT task_id, date(ended_at), COUNT(*), SUM(planned_secs), SUM(actual_secs)
+    FROM pomodoro_sessions GROUP BY task_id, date(ended_at)
+    """)
+    # Oturum silinince (arşiv vb.) toplamlar geçmiş olarak kalır; sadece INSERT izlenir.
+    c.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_pomodoro_daily_ins AFTER INSERT ON pomodoro_sessions
+    BEGIN
+        INSERT INTO pomodoro_daily(task_id, day, sessions, planned_secs, actual_secs)
+        VALUES (NEW.task_id, date(NEW.ended_at), 1, NEW.planned_secs, NEW.actual_secs)
+        ON CONFLICT(task_id, day) DO UPDATE SET
+            sessions = sessions + 1,
+            planned_secs = planned_secs + excluded.planned_secs,
+            actual_secs = actual_secs + excluded.actual_secs;
+    END""")
+
+# Zaman politikası utils/timeutil.py'de: TZ'siz değerler UTC. SQLite strftime('%s') aynı yorumu yapar.
+def _epoch_sql(col: str) -> str:
+    return f"CAST(strftime('%s', {col}) AS INTEGER)"
+
+_EPOCH_COLUMNS: List[Tuple[str, str, str]] = [
+    ("tasks", "due_epoch", "due_date"),
+    ("tasks", "created_epoch", "created_at"),
+    ("tasks", "updated_epoch", "updated_at"),
+    ("events", "start_epoch", "start_ts"),
+    ("events", "end_epoch", "end_ts"),
+    ("events", "updated_epoch", "updated_at"),
+    ("pomodoro_sessions", "started_epoch", "started_at"),
+    ("pomodoro_sessions", "ended_epoch", "ended_at"),
+]
+
+def _m007_epoch_columns(c: sqlite3.Connection):
+    # Metin kolonlardan türetilen (virtual generated) UTC epoch kolonları: her yazımda,
+    # merge dahil, SQLite tarafından güncel tutulur; indekslerde saklanır.
+    for table, col, src in _EPOCH_COLUMNS:
+        c.execute(f"ALTER TABLE {table} ADD COLUMN {col} INTEGER GENERATED ALWAYS AS ({_epoch_sql(src)}) VIRTUAL")
+    c.execute("DROP INDEX IF EXISTS idx_tasks_deleted_created")
+    c.execute("DROP INDEX IF EXISTS idx_events_deleted_start")
+    c.execute("DROP INDEX IF EXISTS idx_events_deleted_end")
+    c.execute("DROP INDEX IF EXISTS idx_pomodoro_task_ended")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_deleted_created ON tasks(deleted, created_epoch)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_events_deleted_start ON events(deleted, start_epoch)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_events_deleted_end ON events(deleted, end_epoch)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pomodoro_task_ended ON pomodoro_sessions(task_id, ended_epoch)")
+
+# Tam metin arama: kaynak tablolara bağlı (external content) FTS5 tabloları.
+# (fts tablosu, kaynak tablo, indekslenen kolonlar)
+_FTS_TABLES: List[Tuple[str, str, Tuple[str, ...]]] = [
+    ("tasks_fts", "tasks", ("title", "notes")),
+    ("events_fts", "events", ("title", "notes")),
+    ("pomodoro_fts", "pomodoro_sessions", ("note",)),
+]
+_FTS_OF: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {src: (fts, src, cols) for fts, src, cols in _FTS_TABLES}
+
+def _fts5_available(c: sqlite3.Connection) -> bool:
+    try:
+        c.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        c.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def _fts_triggers(fts: str, src: str, cols: Tuple[str, ...]) -> List[str]:
+    """Kaynak tabloyu FTS indeksiyle eşleyen _ai/_ad/_au trigger'ları."""
+    col_list = ", ".join(cols)
+    new_vals = ", ".join(f"new.{x}" for x in cols)
+    old_vals = ", ".join(f"old.{x}" for x in cols)
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {src} BEGIN
+            INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals});
+        END""",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {src} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals});
+        END""",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {col_list} ON {src} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {col_list}) VALUES ('delete', old.id, {old_vals});
+            INSERT INTO {fts}(rowid, {col_list}) VALUES (new.id, {new_vals});
+        END""",
+    ]
+
+def _m008_fulltext_search(c: sqlite3.Connection):
+    if not _fts5_available(c):
+        return  # search() LIKE ile çalışır
+    for fts, src, cols in _FTS_TABLES:
+        col_list = ", ".join(cols)
+        c.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {col_list}, content='{src}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )""")
+        for sql in _fts_triggers(fts, src, cols):
+            c.execute(sql)
+        if len(cols) > 1:
+            # başlık eşleşmesi nottan daha değerli
+            c.execute(f"INSERT INTO {fts}({fts}, rank) VALUES ('rank', 'bm25(5.0, 1.0)')")
+        c.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def _m009_recurring_events(c: sqlite3.Connection):
+    # Tekrarlayan event'ler az; pencere sorgusu bunları ayrı, küçük bir indeksle bulur.
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_events_recurring ON events(start_epoch)
+        WHERE deleted=0 AND rrule IS NOT NULL AND rrule <> ''
+    """)
+
+# Değişiklik takibi (CDC): her tabloda artan sayaç, satırlarda son yazımın row_version'ı.
+CDC_TABLES = ("tasks", "events", "tags")
+
+def _m010_change_tracking(c: sqlite3.Connection):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS change_counters(
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID""")
+    # Fiziksel silinen satırlar (soft delete'ler deleted=1 ile satırda kalır)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS deleted_rows(
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY(table_name, row_id)
+        ) WITHOUT ROWID""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_deleted_rows_version ON deleted_rows(table_name, version)")
+    for t in CDC_TABLES:
+        c.execute(f"ALTER TABLE {t} ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0")
+        c.execute(f"UPDATE {t} SET row_version=1")
+        c.execute(f"CREATE INDEX IF NOT EXISTS idx_{t}_row_version ON {t}(row_version)")
+        c.execute("INSERT OR IGNORE INTO change_counters(table_name, version) VALUES (?, 1)", (t,))
+        bump = f"UPDATE change_counters SET version = version + 1 WHERE table_name = '{t}';"
+        current = f"(SELECT version FROM change_counters WHERE table_name = '{t}')"
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{t}_cdc_ins AFTER INSERT ON {t} BEGIN
+                {bump}
+                UPDATE {t} SET row_version = {current} WHERE id = NEW.id;
+                DELETE FROM deleted_rows WHERE table_name = '{t}' AND row_id = NEW.id;
+            END""")
+        # row_version'ı kendisi değiştiren UPDATE (trigger'ın içindeki) tekrar saymaz
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{t}_cdc_upd AFTER UPDATE ON {t}
+            WHEN NEW.row_version IS OLD.row_version BEGIN
+                {bump}
+                UPDATE {t} SET row_version = {current} WHERE id = NEW.id;
+            END""")
+        c.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{t}_cdc_del AFTER DELETE ON {t} BEGIN
+                {bump}
+                INSERT OR REPLACE INTO deleted_rows(table_name, row_id, version)
+                VALUES ('{t}', OLD.id, {current});
+            END""")
+
+def _m011_maintenance(c: sqlite3.Connection):
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS pomodoro_sessions_archive(
             id INTEGER PRIMARY KEY,
-            title TEXT NOT NULL,
-            notes TEXT DEFAULT '',
-            status TEXT DEFAULT 'todo',
-            due_date TEXT,
-            has_time INTEGER DEFAULT 0,
-            deleted INTEGER DEFAULT 0,
-            created_at TEXT DEFAULT (datetime('now')),
-            updated_at TEXT DEFAULT (datetime('now'))
+            task_id INTEGER NOT NULL,
+            started_at TEXT NOT NULL,
+            ended_at TEXT NOT NULL,
+            planned_secs INTEGER NOT NULL,
+            actual_secs INTEGER NOT NULL,
+            note TEXT,
+            created_at TEXT
         )""")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_log(
+            task TEXT PRIMARY KEY,
+            last_run REAL NOT NULL
+        ) WITHOUT ROWID""")
+
+def _m012_task_tags(c: sqlite3.Connection):
+    # Görev-etiket ilişkisi (çoka çok). Sunucuda tek kolon (tasks.tag_id) var; trigger'lar
+    # ilişkiyi o kolondan besler, böylece replace_all/merge ve yerel yazımlar ek iş yapmaz.
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS task_tags(
+            task_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY(task_id, tag_id)
+        ) WITHOUT ROWID""")
+    # Etiket filtresi tag_id'den başlar
+    c.execute("CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag_id, task_id)")
+    # Etiketli görevlerin event'leri task_id üzerinden bulunur
+    c.execute("CREATE INDEX IF NOT EXISTS idx_events_task ON events(task_id)")
+    c.execute("""
+        INSERT OR IGNORE INTO task_tags(task_id, tag_id)
+        SELECT id, tag_id FROM tasks WHERE tag_id IS NOT NULL""")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_tag_ins AFTER INSERT ON tasks
+        WHEN NEW.tag_id IS NOT NULL BEGIN
+            INSERT OR IGNORE INTO task_tags(task_id, tag_id) VALUES (NEW.id, NEW.tag_id);
+        END""")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_tag_upd AFTER UPDATE OF tag_id ON tasks
+        WHEN NEW.tag_id IS NOT OLD.tag_id BEGIN
+            DELETE FROM task_tags WHERE task_id = OLD.id AND tag_id = OLD.tag_id;
+            INSERT OR IGNORE INTO task_tags(task_id, tag_id)
+            SELECT NEW.id, NEW.tag_id WHERE NEW.tag_id IS NOT NULL;
+        END""")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_tag_del AFTER DELETE ON tasks BEGIN
+            DELETE FROM task_tags WHERE task_id = OLD.id;
+        END""")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tags_task_tags_del AFTER DELETE ON tags BEGIN
+            DELETE FROM task_tags WHERE tag_id = OLD.id;
+        END""")
+
+def _m013_task_hierarchy(c: sqlite3.Connection):
+    # Proje/alt görev ağacı: tasks.parent_id + closure tablosu (her ata-torun çifti bir satır,
+    # kendisi depth=0). Alt ağaç, ata zinciri ve proje toplamları tek sorguda, özyinelemesiz okunur.
+    # Proje = kökteki (parent_id'si olmayan) görev.
+    c.execute("ALTER TABLE tasks ADD COLUMN parent_id INTEGER")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks(parent_id) WHERE parent_id IS NOT NULL")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS task_closure(
+            ancestor_id INTEGER NOT NULL,
+            descendant_id INTEGER NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY(ancestor_id, descendant_id)
+        ) WITHOUT ROWID""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_task_closure_desc ON task_closure(descendant_id, depth)")
+    c.execute("INSERT OR IGNORE INTO task_closure(ancestor_id, descendant_id, depth) SELECT id, id, 0 FROM tasks")
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_closure_ins AFTER INSERT ON tasks BEGIN
+            INSERT OR IGNORE INTO task_closure(ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);
+            INSERT OR IGNORE INTO task_closure(ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, NEW.id, depth + 1 FROM task_closure WHERE descendant_id = NEW.parent_id;
+            -- merge sırası yüzünden üstünden önce gelmiş çocuklar yeni görevin atalarına bağlanır
+            INSERT OR IGNORE INTO task_closure(ancestor_id, descendant_id, depth)
+            SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+            FROM tasks ch
+            JOIN task_closure d ON d.ancestor_id = ch.id
+            JOIN task_closure a ON a.descendant_id = NEW.id
+            WHERE ch.parent_id = NEW.id AND ch.id <> NEW.id
+              AND NOT EXISTS (SELECT 1 FROM task_closure x WHERE x.ancestor_id = ch.id AND x.descendant_id = NEW.parent_id);
+        END""")
+    # Döngü (görevi kendi alt ağacına taşımak) reddedilir
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_closure_cycle BEFORE UPDATE OF parent_id ON tasks
+        WHEN NEW.parent_id IS NOT OLD.parent_id AND EXISTS (
+            SELECT 1 FROM task_closure WHERE ancestor_id = OLD.id AND descendant_id = NEW.parent_id)
+        BEGIN
+            SELECT RAISE(ABORT, 'task hierarchy cycle');
+        END""")
+    # Alt ağaç taşınır: eski atalardan kopar, yeni üstün atalarına bağlanır
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_closure_move AFTER UPDATE OF parent_id ON tasks
+        WHEN NEW.parent_id IS NOT OLD.parent_id BEGIN
+            DELETE FROM task_closure
+            WHERE descendant_id IN (SELECT descendant_id FROM task_closure WHERE ancestor_id = NEW.id)
+              AND ancestor_id IN (SELECT ancestor_id FROM task_closure WHERE descendant_id = NEW.id AND ancestor_id <> NEW.id);
+            INSERT OR IGNORE INTO task_closure(ancestor_id, descendant_id, depth)
+            SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+            FROM task_closure a, task_closure d
+            WHERE a.descendant_id = NEW.parent_id AND d.ancestor_id = NEW.id;
+        END""")
+    # Fiziksel silmede çocuklar kök olur (parent_id'leri kalır; görev geri gelirse yeniden bağlanır)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_closure_del AFTER DELETE ON tasks BEGIN
+            DELETE FROM task_closure
+            WHERE descendant_id IN (SELECT descendant_id FROM task_closure WHERE ancestor_id = OLD.id)
+              AND ancestor_id IN (SELECT ancestor_id FROM task_closure WHERE descendant_id = OLD.id);
+        END""")
+
+def _m014_client_ids(c: sqlite3.Connection):
+    # Yeni satırlar istemci id'si alır (services.ids). Sunucuya hiç ulaşmamış (bekleyen insert'i
+    # olan, hiç denenmemiş) eski autoincrement satırlar da yeniden anahtarlanır; eski id -> yeni id
+    # id_aliases'ta kalır. Sunucudaki satırların id'leri aynen geçerlidir.
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS id_aliases(
+            table_name TEXT NOT NULL,
+            old_id INTEGER NOT NULL,
+            new_id INTEGER NOT NULL,
+            PRIMARY KEY(table_name, old_id)
+        ) WITHOUT ROWID""")
+    # Eski biçimde yerel oluşturma da op='upsert' ile kuyruğa girerdi. Satırın ilk bekleyen kaydı bir
+    # oluşturmaysa op='insert'e çevrilir ki aşağıda yeniden anahtarlansın: event'te payload task_id
+    # taşır (update_event taşımaz); görevde kayıt, görevin created_at'iyle aynı anda kuyruğa girmiştir
+    # (sunucudan gelen görevin created_at'i sunucununkidir).
+    c.execute("""
+        UPDATE sync_queue SET op='insert'
+        WHERE op='upsert' AND row_id IS NOT NULL AND attempts=0 AND lease_until IS NULL
+          AND id = (SELECT MIN(q.id) FROM sync_queue q
+                    WHERE q.table_name = sync_queue.table_name AND q.row_id = sync_queue.row_id)
+          AND (
+              (table_name='events' AND json_extract(payload, '$.task_id') IS NOT NULL)
+              OR (table_name='tasks' AND json_extract(payload, '$.title') IS NOT NULL AND EXISTS (
+                  SELECT 1 FROM tasks t WHERE t.id = sync_queue.row_id
+                    AND abs(strftime('%s', t.created_at) - strftime('%s', sync_queue.created_at)) <= 2))
+          )""")
+    rekeyed = set()
+    for table in ("tasks", "events"):
+        pending = c.execute("""
+            SELECT DISTINCT row_id FROM sync_queue
+            WHERE table_name=? AND op='insert' AND row_id IS NOT NULL
+              AND attempts=0 AND lease_until IS NULL
+        """, (table,)).fetchall()
+        for (old,) in pending:
+            if old < ids.LEGACY_ID_MAX:
+                _rekey_row(c, table, int(old), ids.new_id())
+                rekeyed.add(table)
+    # FTS indeksleri rowid'e bağlı: yeniden anahtarlanan tablolar yeniden kurulur
+    names = {r[0] for r in c.execute("SELECT name FROM sqlite_master")}
+    for fts, src, _ in _FTS_TABLES:
+        if src in rekeyed and fts in names:
+            c.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+def _rekey_row(c: sqlite3.Connection, table: str, old: int, new: int, alias: bool = True):
+    """Satırın id'sini ve ona işaret eden yerel referansları değiştirir (bekleyen kuyruk dahil)."""
+    if table == "tasks":
+        # closure/etiket satırları önce: parent_id güncellemesi trigger'ı yeni id'yi bulabilsin
+        c.execute("UPDATE task_closure SET ancestor_id=? WHERE ancestor_id=?", (new, old))
+        c.execute("UPDATE task_closure SET descendant_id=? WHERE descendant_id=?", (new, old))
+        c.execute("UPDATE task_tags SET task_id=? WHERE task_id=?", (new, old))
+        moved = c.execute("UPDATE tasks SET id=? WHERE id=?", (new, old)).rowcount
+        c.execute("UPDATE tasks SET parent_id=? WHERE parent_id=?", (new, old))
+        for ref in ("events", "pomodoro_sessions", "pomodoro_sessions_archive", "pomodoro_daily"):
+            c.execute(f"UPDATE {ref} SET task_id=? WHERE task_id=?", (new, old))
         c.execute("""
-        CREATE TABLE IF NOT EXISTS events(
-            id INTEGER PRIMARY KEY,
-            task_id INTEGER,
-            title TEXT,
-            notes TEXT DEFAULT '',
-            start_ts TEXT NOT NULL,
-            end_ts   TEXT NOT NULL,
-            rrule TEXT,
-            deleted INTEGER DEFAULT 0,
-            updated_at TEXT DEFAULT (datetime('now'))
-        )""")
+            UPDATE sync_queue SET payload=json_set(payload, '$.task_id', ?)
+            WHERE table_name='events' AND json_extract(payload, '$.task_id')=?
+        """, (new, old))
+    elif table == "tags":
+        moved = c.execute("UPDATE tags SET id=? WHERE id=?", (new, old)).rowcount
+        # task_tags'i trg_tasks_tag_upd taşır
+        c.execute("UPDATE tasks SET tag_id=? WHERE tag_id=?", (new, old))
         c.execute("""
-        CREATE TABLE IF NOT EXISTS tags(
-            id INTEGER PRIMARY KEY,
-            name TEXT UNIQUE NOT NULL
-        )""")
+            UPDATE sync_queue SET payload=json_set(payload, '$.tag_id', ?)
+            WHERE table_name='tasks' AND json_extract(payload, '$.tag_id')=?
+        """, (new, old))
+    else:
+        moved = c.execute(f"UPDATE {table} SET id=? WHERE id=?", (new, old)).rowcount
+    if moved and table in CDC_TABLES:
+        # id değişimi CDC için eski id'nin silinmesidir; yoksa changes_since okuyan tüketicide eski id'li
+        # hayalet satır kalır. Sayaç UPDATE trigger'ında arttı, yeni id'nin row_version'ı ile aynı sürüm.
         c.execute("""
-        CREATE TABLE IF NOT EXISTS sync_queue(
-            id INTEGER PRIMARY KEY,
-            table_name TEXT NOT NULL,
-            op TEXT NOT NULL,
-            payload TEXT NOT NULL,
-            created_at TEXT DEFAULT (datetime('now'))
-        )""")
-        self._conn.commit()
+            INSERT OR REPLACE INTO deleted_rows(table_name, row_id, version)
+            SELECT table_name, ?, version FROM change_counters WHERE table_name=?
+        """, (old, table))
+        c.execute("DELETE FROM deleted_rows WHERE table_name=? AND row_id=?", (table, new))
+    c.execute("""
+        UPDATE sync_queue SET row_id=?, payload=json_set(payload, '$.id', ?)
+        WHERE table_name=? AND row_id=?
+    """, (new, new, table, old))
+    if alias:
+        c.execute("INSERT OR REPLACE INTO id_aliases(table_name, old_id, new_id) VALUES (?,?,?)", (table, old, new))
 
-    def migrate_add_pomodoro_sessions(self):
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS pomodoro_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_id INTEGER NOT NULL,
-                started_at TEXT NOT NULL,
-                ended_at   TEXT NOT NULL,
-                planned_secs INTEGER NOT NULL,
-                actual_secs  INTEGER NOT NULL,
-                note TEXT DEFAULT '',
-                created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
-            );
-            """
+def _m015_sync_state(c: sqlite3.Connection):
+    # Artımlı çekim durumu: watermark = sunucudan görülen en büyük updated_at (epoch),
+    # full_at = son tam (prune'lu) çekimin zamanı.
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state(
+            table_name TEXT PRIMARY KEY,
+            watermark INTEGER,
+            full_at REAL,
+            pulled_at REAL
+        ) WITHOUT ROWID""")
+
+def _m016_bulk_load(c: sqlite3.Connection):
+    # import_snapshot boş tabloya yüklerken tablonun trigger/indekslerini kaldırır; DDL'leri burada
+    # durur, yarıda kalan yükleme açılışta tamamlanır (LocalDB._repair_bulk_load).
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS bulk_load(
+            table_name TEXT PRIMARY KEY,
+            ddl TEXT NOT NULL
+        ) WITHOUT ROWID""")
+
+def _m017_deleted_rows_pruning(c: sqlite3.Connection):
+    # purge_tombstones deleted_rows'u da budar: bir önceki temizlikteki sayaca (purge_mark) kadar olan
+    # kayıtlar silinir. pruned_version'dan eski bir sürümle sorulan changes_since "reset" döner.
+    c.execute("ALTER TABLE change_counters ADD COLUMN purge_mark INTEGER NOT NULL DEFAULT 0")
+    c.execute("ALTER TABLE change_counters ADD COLUMN pruned_version INTEGER NOT NULL DEFAULT 0")
+
+def _m018_pomodoro_local_day(c: sqlite3.Connection):
+    # pomodoro_daily.day artık yerel tarih: PerformancePage "bugün"ü date.today() ile sorar; UTC gününe
+    # göre gece yarısına yakın oturumlar bir önceki/sonraki güne yazılıyordu. Toplamlar ham oturumlardan
+    # (arşiv dahil) yeniden kurulur.
+    c.execute("DROP TRIGGER IF EXISTS trg_pomodoro_daily_ins")
+    c.execute("DELETE FROM pomodoro_daily")
+    c.execute("""
+    INSERT INTO pomodoro_daily(task_id, day, sessions, planned_secs, actual_secs)
+    SELECT task_id, date(ended_at, 'localtime'), COUNT(*), SUM(planned_secs), SUM(actual_secs)
+    FROM (
+        SELECT task_id, ended_at, planned_secs, actual_secs FROM pomodoro_sessions
+        UNION ALL
+        SELECT task_id, ended_at, planned_secs, actual_secs FROM pomodoro_sessions_archive
+        WHERE id NOT IN (SELECT id FROM pomodoro_sessions)
+    )
+    GROUP BY task_id, date(ended_at, 'localtime')
+    """)
+    c.execute("""
+    CREATE TRIGGER trg_pomodoro_daily_ins AFTER INSERT ON pomodoro_sessions
+    BEGIN
+        INSERT INTO pomodoro_daily(task_id, day, sessions, planned_secs, actual_secs)
+        VALUES (NEW.task_id, date(NEW.ended_at, 'localtime'), 1, NEW.planned_secs, NEW.actual_secs)
+        ON CONFLICT(task_id, day) DO UPDATE SET
+            sessions = sessions + 1,
+            planned_secs = planned_secs + excluded.planned_secs,
+            actual_secs = actual_secs + excluded.actual_secs;
+    END""")
+
+MIGRATIONS: List[Tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (1, _m001_base_tables),
+    (2, _m002_hot_query_indexes),
+    (3, _m003_event_range_index),
+    (4, _m004_sync_queue_row_id),
+    (5, _m005_sync_queue_leases),
+    (6, _m006_pomodoro_rollups),
+    (7, _m007_epoch_columns),
+    (8, _m008_fulltext_search),
+    (9, _m009_recurring_events),
+    (10, _m010_change_tracking),
+    (11, _m011_maintenance),
+    (12, _m012_task_tags),
+    (13, _m013_task_hierarchy),
+    (14, _m014_client_ids),
+    (15, _m015_sync_state),
+    (16, _m016_bulk_load),
+    (17, _m017_deleted_rows_pruning),
+    (18, _m018_pomodoro_local_day),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# ---------------- Hot queries ----------------
+# UI her emit'te bunları çalıştırır; check_query_plans() tablo taramasına dönüşü yakalar.
+
+# Satırlar services.records tiplerine sarılır; kolon listeleri bu yüzden açık yazılır.
+# İndeksler kapsayıcı (covering) değil: sorgular tüm satırı (title, notes, rrule ...) seçer, kapsayıcı
+# indeks tabloyu kopyalayıp her yazımı ikiye katlardı. İndeks taramayı ve sıralamayı kaldırır; satıra
+# rowid ile tek erişim kalır.
+SQL_GET_TASKS = f"""
+    SELECT {TaskRow.COLUMNS} FROM tasks
+    WHERE deleted=0 AND (has_time IS NULL OR has_time=0)
+    ORDER BY created_epoch DESC
+"""
+
+SQL_GET_EVENTS = f"""
+    SELECT {EventRow.COLUMNS} FROM events
+    WHERE deleted=0
+    ORDER BY start_epoch ASC
+"""
+
+SQL_GET_EVENTS_IN_RANGE = f"""
+    SELECT {EventRow.COLUMNS} FROM events
+    WHERE deleted=0 AND end_epoch > ? AND start_epoch < ?
+    ORDER BY end_epoch ASC
+"""
+
+# Pencereden önce başlamış olabilecek tekrarlayan üst event'ler (açılım recurrence.py'de)
+SQL_GET_RECURRING_EVENTS = f"""
+    SELECT {EventRow.COLUMNS} FROM events INDEXED BY idx_events_recurring
+    WHERE deleted=0 AND rrule IS NOT NULL AND rrule <> '' AND start_epoch < ?
+"""
+
+# Etiket filtresi (tag_ids JSON dizisi olarak tek parametre). Sorgu seçili etiketlerin
+# görevlerinden (task_tags, idx_task_tags_tag) başlar, satırlara id/task_id ile gider;
+# planlayıcı (istatistiğe göre) görev indeksini ya da tüm task_tags'i tarayabildiği için plan
+# CROSS JOIN + INDEXED BY ile sabit.
+# Sonuç küçük bir alt küme: sıralama geçici B-tree ile yapılır (bu yüzden HOT_QUERIES'te değiller).
+_TAGGED_TASKS = "(SELECT DISTINCT task_id AS tid FROM task_tags INDEXED BY idx_task_tags_tag WHERE tag_id IN (SELECT value FROM json_each(?))) AS sel"
+
+SQL_GET_TASKS_BY_TAGS = f"""
+    SELECT {TaskRow.COLUMNS} FROM {_TAGGED_TASKS}
+    CROSS JOIN tasks ON tasks.id = sel.tid
+    WHERE deleted=0 AND (has_time IS NULL OR has_time=0)
+    ORDER BY created_epoch DESC
+"""
+
+SQL_GET_EVENTS_IN_RANGE_BY_TAGS = f"""
+    SELECT {EventRow.COLUMNS} FROM {_TAGGED_TASKS}
+    CROSS JOIN events INDEXED BY idx_events_task ON events.task_id = sel.tid
+    WHERE deleted=0 AND end_epoch > ? AND start_epoch < ?
+    ORDER BY end_epoch ASC
+"""
+
+SQL_GET_RECURRING_EVENTS_BY_TAGS = f"""
+    SELECT {EventRow.COLUMNS} FROM {_TAGGED_TASKS}
+    CROSS JOIN events INDEXED BY idx_events_task ON events.task_id = sel.tid
+    WHERE deleted=0 AND rrule IS NOT NULL AND rrule <> '' AND start_epoch < ?
+"""
+
+SQL_POMODORO_FOR_TASK = f"""
+    SELECT {SessionRow.COLUMNS}
+    FROM pomodoro_sessions
+    WHERE task_id = ?
+    ORDER BY ended_epoch DESC
+"""
+
+HOT_QUERIES: Dict[str, Tuple[str, tuple]] = {
+    "get_tasks": (SQL_GET_TASKS, ()),
+    "get_events": (SQL_GET_EVENTS, ()),
+    "get_events_in_range": (SQL_GET_EVENTS_IN_RANGE, (0, 0)),
+    "get_recurring_events": (SQL_GET_RECURRING_EVENTS, (0,)),
+    "list_pomodoro_sessions_for_task": (SQL_POMODORO_FOR_TASK, (0,)),
+    "pomodoro_rollup_day": (
+        "SELECT day, SUM(actual_secs) FROM pomodoro_daily WHERE day >= ? AND day < ? GROUP BY day", ("", ""),
+    ),
+}
+
+# search(): her kaynak en iyi `limit` sonucunu verir, sonra bm25 sırasıyla birleşir.
+# Parametreler: (match, limit) x 3, limit
+SQL_SEARCH_FTS = """
+    SELECT * FROM (
+        SELECT 'task' AS kind, t.id AS id, t.id AS task_id, t.title AS title,
+               snippet(tasks_fts, -1, '[', ']', '…', 10) AS snippet, tasks_fts.rank AS rank
+        FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+        WHERE tasks_fts MATCH ? AND t.deleted = 0
+        ORDER BY tasks_fts.rank LIMIT ?
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'event', e.id, e.task_id, e.title,
+               snippet(events_fts, -1, '[', ']', '…', 10), events_fts.rank
+        FROM events_fts JOIN events e ON e.id = events_fts.rowid
+        WHERE events_fts MATCH ? AND e.deleted = 0
+        ORDER BY events_fts.rank LIMIT ?
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'pomodoro', s.id, s.task_id, t.title,
+               snippet(pomodoro_fts, -1, '[', ']', '…', 10), pomodoro_fts.rank
+        FROM pomodoro_fts JOIN pomodoro_sessions s ON s.id = pomodoro_fts.rowid
+        LEFT JOIN tasks t ON t.id = s.task_id
+        WHERE pomodoro_fts MATCH ?
+        ORDER BY pomodoro_fts.rank LIMIT ?
+    )
+    ORDER BY rank LIMIT ?
+"""
+
+def _json_ids(ids: Iterable[int]) -> str:
+    """id listesini json_each(?) parametresine çevirir."""
+    return json.dumps(sorted({int(i) for i in ids}))
+
+def _fts_query(text: str) -> str:
+    """Kullanıcı girdisi -> FTS5 sorgusu: her kelime ayrı terim, son kelime önek (yazarken arama)."""
+    words = [w for w in text.split() if w]
+    terms = ['"' + w.replace('"', '""') + '"' for w in words]
+    if terms and not text.endswith(" "):
+        terms[-1] += "*"
+    return " ".join(terms)
+
+# pomodoro_rollup(by=...) için gruplama ifadeleri ve ek join
+# (pomodoro_daily d, tasks t, tags g; proje için kök ata p)
+_ROLLUP_GROUPS: Dict[str, Tuple[str, str, str]] = {
+    "task": ("d.task_id AS task_id, t.title AS title", "d.task_id", ""),
+    "day":  ("d.day AS day", "d.day", ""),
+    "week": ("date(d.day, 'weekday 0', '-6 days') AS week", "date(d.day, 'weekday 0', '-6 days')", ""),  # haftanın pazartesisi
+    "tag":  ("t.tag_id AS tag_id, g.name AS tag", "t.tag_id", ""),
+    # alt görevlerin süreleri kökteki projeye toplanır (kök görevin kendisi de dahil)
+    "project": (
+        "p.id AS project_id, p.title AS project", "p.id",
+        """JOIN task_closure pc ON pc.descendant_id = d.task_id
+           JOIN tasks p ON p.id = pc.ancestor_id AND p.parent_id IS NULL""",
+    ),
+}
+
+# ---------------- Merge (server -> local) ----------------
+
+def _task_values(t: Dict[str, Any]) -> tuple:
+    return (
+        int(t["id"]),
+        t.get("title") or "",
+        t.get("notes") or "",
+        t.get("status") or "todo",
+        t.get("due_date"),
+        int(t.get("has_time") or 0),
+        int(t.get("deleted") or 0),
+        t.get("created_at") or _now_iso(),
+        t.get("updated_at") or _now_iso(),
+        t.get("tag_id"),
+        t.get("parent_id"),
+    )
+
+def _event_values(e: Dict[str, Any]) -> tuple:
+    return (
+        int(e["id"]),
+        e.get("task_id"),
+        e.get("title"),
+        e.get("notes") or "",
+        e.get("start_ts") or e.get("starts_at"),
+        e.get("end_ts") or e.get("ends_at"),
+        e.get("rrule"),
+        int(e.get("deleted") or 0),
+        e.get("updated_at") or _now_iso(),
+    )
+
+def _tag_values(g: Dict[str, Any]) -> tuple:
+    return (int(g["id"]), g.get("name"))
+
+def _session_values(s: Dict[str, Any]) -> tuple:
+    return (
+        int(s["id"]),
+        int(s["task_id"]),
+        s.get("started_at"),
+        s.get("ended_at"),
+        int(s.get("planned_secs") or 0),
+        int(s.get("actual_secs") or 0),
+        s.get("note"),
+        s.get("created_at") or _now_iso(),
+    )
+
+_MERGE_VALUES: Dict[str, Callable[[Dict[str, Any]], tuple]] = {
+    "tasks": _task_values,
+    "events": _event_values,
+    "tags": _tag_values,
+    "pomodoro_sessions": _session_values,
+}
+
+# merge_rows'un mevcut satırla karşılaştırdığı kolon
+_MERGE_COMPARE: Dict[str, str] = {
+    "tasks": "updated_epoch",
+    "events": "updated_epoch",
+    "tags": "name",
+    "pomodoro_sessions": "NULL",  # oturumlar değişmez; varsa dokunulmaz
+}
+
+# created_at yalnızca ilk eklemede yazılır; güncelleme updated_at daha yeni değilse no-op.
+# parent_id sunucu satırlarında yok (TASK_FIELDS): gelmezse yerel hiyerarşi korunur.
+_TASK_UPSERT = """
+    INSERT INTO tasks(id, title, notes, status, due_date, has_time, deleted, created_at, updated_at, tag_id, parent_id)
+    VALUES(?,?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(id) DO UPDATE SET
+        title=excluded.title, notes=excluded.notes, status=excluded.status,
+        due_date=excluded.due_date, has_time=excluded.has_time,
+        deleted=excluded.deleted, updated_at=excluded.updated_at, tag_id=excluded.tag_id,
+        parent_id=COALESCE(excluded.parent_id, tasks.parent_id)
+    WHERE tasks.updated_epoch IS NULL OR CAST(strftime('%s', excluded.updated_at) AS INTEGER) >= tasks.updated_epoch
+"""
+
+_EVENT_UPSERT = """
+    INSERT INTO events(id, task_id, title, notes, start_ts, end_ts, rrule, deleted, updated_at)
+    VALUES(?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(id) DO UPDATE SET
+        task_id=excluded.task_id, title=excluded.title, notes=excluded.notes,
+        start_ts=excluded.start_ts, end_ts=excluded.end_ts, rrule=excluded.rrule,
+        deleted=excluded.deleted, updated_at=excluded.updated_at
+    WHERE events.updated_epoch IS NULL OR CAST(strftime('%s', excluded.updated_at) AS INTEGER) >= events.updated_epoch
+"""
+
+# (insert_sql, update_sql) — ikisi de executemany ile aynı tuple'ları alır.
+# tags.name UNIQUE: aynı isimli yerel tag merge_rows'ta önce sunucu id'sine taşınır (_adopt_server_tag_ids).
+MERGE_SQL: Dict[str, Tuple[str, str]] = {
+    "tasks": (_TASK_UPSERT, _TASK_UPSERT),
+    "events": (_EVENT_UPSERT, _EVENT_UPSERT),
+    "tags": (
+        "INSERT OR IGNORE INTO tags(id, name) VALUES(?,?)",
+        "UPDATE OR IGNORE tags SET name=?2 WHERE id=?1",
+    ),
+    # pomodoro_daily trigger'ı yalnızca gerçekten eklenen oturumlar için çalışır
+    "pomodoro_sessions": (
+        """INSERT OR IGNORE INTO pomodoro_sessions
+           (id, task_id, started_at, ended_at, planned_secs, actual_secs, note, created_at)
+           VALUES(?,?,?,?,?,?,?,?)""",
+        "",
+    ),
+}
+
+# Toplu yüklemede (trigger'lar kapalı, tablo boştu) trigger'ların satır başına yaptığı işin küme karşılığı.
+def _cdc_fill(t: str) -> List[str]:
+    return [
+        f"UPDATE change_counters SET version = version + 1 WHERE table_name = '{t}'",
+        f"UPDATE {t} SET row_version = (SELECT version FROM change_counters WHERE table_name = '{t}')",
+        f"DELETE FROM deleted_rows WHERE table_name = '{t}' AND row_id IN (SELECT id FROM {t})",
+    ]
+
+_BULK_FILL: Dict[str, List[str]] = {
+    "tags": _cdc_fill("tags"),
+    "tasks": _cdc_fill("tasks") + [
+        "INSERT OR IGNORE INTO task_tags(task_id, tag_id) SELECT id, tag_id FROM tasks WHERE tag_id IS NOT NULL",
+        # ata zinciri yalnızca var olan üstlere kadar (trg_tasks_closure_ins gibi); derinlik döngüye karşı sınırlı
+        """
+        INSERT OR IGNORE INTO task_closure(ancestor_id, descendant_id, depth)
+        WITH RECURSIVE up(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM tasks
+            UNION ALL
+            SELECT p.id, up.descendant_id, up.depth + 1
+            FROM up JOIN tasks t ON t.id = up.ancestor_id JOIN tasks p ON p.id = t.parent_id
+            WHERE up.depth < (SELECT COUNT(*) FROM tasks)
         )
+        SELECT ancestor_id, descendant_id, depth FROM up""",
+    ],
+    "events": _cdc_fill("events"),
+    "pomodoro_sessions": ["""
+        INSERT INTO pomodoro_daily(task_id, day, sessions, planned_secs, actual_secs)
+        SELECT task_id, date(ended_at, 'localtime'), COUNT(*), SUM(planned_secs), SUM(actual_secs)
+        FROM pomodoro_sessions WHERE 1 GROUP BY task_id, date(ended_at, 'localtime')
+        ON CONFLICT(task_id, day) DO UPDATE SET
+            sessions = sessions + excluded.sessions,
+            planned_secs = planned_secs + excluded.planned_secs,
+            actual_secs = actual_secs + excluded.actual_secs"""],
+}
+
+# ---------------- Snapshot (export/import) ----------------
+# JSONL: başlık satırı, her tablo için {"table", "columns"} satırı ve ardından
+# kolon sırasıyla JSON dizileri. Kolonlar _MERGE_VALUES sırasıdır; import merge yolunu kullanır.
+SNAPSHOT_FORMAT = "planner-localdb-snapshot"
+SNAPSHOT_CHUNK = 5000
+SNAPSHOT_TABLES: List[Tuple[str, Tuple[str, ...], str]] = [
+    ("tags", ("id", "name"), "SELECT id, name FROM tags ORDER BY id"),
+    ("tasks",
+     ("id", "title", "notes", "status", "due_date", "has_time", "deleted", "created_at", "updated_at", "tag_id", "parent_id"),
+     "SELECT id, title, notes, status, due_date, has_time, deleted, created_at, updated_at, tag_id, parent_id FROM tasks ORDER BY id"),
+    ("events",
+     ("id", "task_id", "title", "notes", "start_ts", "end_ts", "rrule", "deleted", "updated_at"),
+     "SELECT id, task_id, title, notes, start_ts, end_ts, rrule, deleted, updated_at FROM events ORDER BY id"),
+    # arşivdekiler de aynı bölümde: geri yüklemede rollup'lar trigger ile yeniden oluşur
+    ("pomodoro_sessions",
+     ("id", "task_id", "started_at", "ended_at", "planned_secs", "actual_secs", "note", "created_at"),
+     """SELECT id, task_id, started_at, ended_at, planned_secs, actual_secs, note, created_at FROM pomodoro_sessions
+        UNION ALL
+        SELECT id, task_id, started_at, ended_at, planned_secs, actual_secs, note, created_at FROM pomodoro_sessions_archive"""),
+]
+
+class RowCache:
+    """id -> kayıt LRU; hit/miss sayaçlı. Yazım yolları ve CDC (sync_caches) geçersiz kılar."""
+    def __init__(self, max_size: int = ROW_CACHE_SIZE):
+        self.max_size = max_size
+        self._data: "OrderedDict[int, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int) -> Any:
+        row = self._data.get(key)
+        if row is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return row
+
+    def put(self, key: int, row: Any):
+        self._data[key] = row
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[int]):
+        for k in keys:
+            self._data.pop(int(k), None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+class LocalDB:
+    def __init__(self, path: str = DB_PATH, durability: str = DEFAULT_DURABILITY,
+                 readonly: bool = False):
+        """
+        readonly=True: yalnızca okuma bağlantısı (mode=ro); migration/pragma çalıştırmaz,
+        şemayı yazıcı bağlantı (services.db_actor.DBActor) hazırlamış olmalıdır.
+        """
+        self.path = path
+        self.readonly = readonly
+        if readonly:
+            self._conn = sqlite3.connect(f"{pathlib.Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self._conn = sqlite3.connect(self.path)
+        self._conn.row_factory = sqlite3.Row
+        self._tx_depth = 0
+        self._queue_counters = {"coalesced": 0, "cancelled": 0, "compacted": 0}
+        self._has_fts: Optional[bool] = None
+        self._occurrences = recurrence.OccurrenceCache()
+        self._row_cache = {"tasks": RowCache(), "events": RowCache()}
+        # eski (yeniden anahtarlanmış) id ile okunanlar: (tablo, sürüm, eski id) -> kayıt
+        self._alias_cache = RowCache()
+        self._cache_versions: Dict[str, int] = {}
+        if readonly:
+            return
+        # Yeni dosyalarda hemen geçerli; eskilerde enable_incremental_vacuum() tek seferlik VACUUM yapar
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.set_durability(durability)
+        self._migrate()
+        self._repair_bulk_load()
+        self._repair_fts()
+
+    def close(self):
+        self._conn.close()
+
+    # ---------------- Transactions ----------------
+    def set_durability(self, profile: str):
+        if profile not in DURABILITY_PROFILES:
+            raise ValueError(f"unknown durability profile: {profile!r}")
+        pragmas = DURABILITY_PROFILES[profile]
+        self._conn.execute(f"PRAGMA journal_mode={pragmas['journal_mode']}")
+        self._conn.execute(f"PRAGMA synchronous={pragmas['synchronous']}")
+        self.durability = profile
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator["LocalDB"]:
+        """
+        Tek commit'lik iş birimi. İç içe çağrılar dıştaki transaction'a katılır;
+        commit/rollback yalnızca en dış seviyede yapılır.
+        """
+        outermost = self._tx_depth == 0
+        if outermost and not self._conn.in_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")
+        self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._tx_depth -= 1
+            if outermost:
+                self._conn.rollback()
+                self.clear_caches()  # geri alınan yazımların okunmuş hali kalmasın
+            raise
+        else:
+            self._tx_depth -= 1
+            if outermost:
+                self._conn.commit()
+
+    def run_batch(self, calls: Iterable[Callable[["LocalDB"], Any]]) -> List[Any]:
+        """Birden fazla yazımı tek transaction (tek fsync) içinde çalıştırır."""
+        with self.transaction():
+            return [fn(self) for fn in calls]
+
+    # ---------------- Schema ----------------
+    def _migrate(self):
+        c = self._conn
+        c.execute("CREATE TABLE IF NOT EXISTS schema_version(version INTEGER NOT NULL)")
+        row = c.execute("SELECT version FROM schema_version").fetchone()
+        if row is None:
+            c.execute("INSERT INTO schema_version(version) VALUES(0)")
+            current = 0
+        else:
+            current = int(row[0])
+        c.commit()
+        for version, step in MIGRATIONS:
+            if version <= current:
+                continue
+            # Açık BEGIN şart: sqlite3'ün eski isolation modu DDL'den önce transaction açmaz,
+            # ALTER/CREATE anında commit edilir ve yarıda kalan adım tekrar çalıştırılamaz.
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                step(c)
+                c.execute("UPDATE schema_version SET version=?", (version,))
+            except BaseException:
+                c.rollback()
+                raise
+            c.commit()
+
+    def _repair_fts(self):
+        """Yarıda kalmış toplu import'tan eksik kalan FTS trigger'larını kurar ve indeksi yeniler."""
+        names = {r[0] for r in self._conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+        for fts, src, cols in _FTS_TABLES:
+            if fts in names and not {f"{fts}_ai", f"{fts}_ad", f"{fts}_au"} <= names:
+                with self._conn:
+                    self._end_fts_bulk(fts, src, cols)
+
+    def _repair_bulk_load(self):
+        """Yarıda kalmış import_snapshot'ın kaldırdığı trigger/indeksleri kurar ve türetilmiş veriyi doldurur."""
+        for (table,) in self._conn.execute("SELECT table_name FROM bulk_load").fetchall():
+            with self._conn:
+                self._end_bulk_load(table)
+
+    def _begin_bulk_load(self, table: str):
+        """
+        Boş tabloya toplu yükleme: tablonun trigger'ları ve ikincil indeksleri kaldırılır
+        (DDL'leri bulk_load'da saklanır); satırlar trigger'sız, indekssiz yazılır.
+        """
+        c = self._conn
+        objs = c.execute(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE tbl_name=? AND type IN ('index', 'trigger') AND sql IS NOT NULL", (table,)
+        ).fetchall()
+        c.execute("INSERT OR REPLACE INTO bulk_load(table_name, ddl) VALUES (?, ?)",
+                  (table, json.dumps([[name, sql] for _, name, sql in objs])))
+        for kind, name, _ in objs:
+            c.execute(f"DROP {kind.upper()} IF EXISTS {name}")
+
+    def _end_bulk_load(self, table: str):
+        """Indeksleri ve trigger'ları geri kurar; trigger'ların yazacağı veriyi (_BULK_FILL, FTS) tek seferde üretir."""
+        c = self._conn
+        row = c.execute("SELECT ddl FROM bulk_load WHERE table_name=?", (table,)).fetchone()
+        if row is None:
+            return
+        names = {r[0] for r in c.execute("SELECT name FROM sqlite_master")}
+        for name, sql in json.loads(row[0]):
+            if name not in names:
+                c.execute(sql)
+        for sql in _BULK_FILL.get(table, ()):
+            c.execute(sql)
+        fts = _FTS_OF.get(table)
+        if fts and self._fts_enabled():
+            c.execute(f"INSERT INTO {fts[0]}({fts[0]}) VALUES ('rebuild')")
+        c.execute("DELETE FROM bulk_load WHERE table_name=?", (table,))
+        self.clear_caches()
+
+    def _begin_fts_bulk(self, fts: str):
+        """FTS trigger'larını kaldırır; satır başına indeksleme yerine sonda tek 'rebuild' yapılır."""
+        for suffix in ("ai", "ad", "au"):
+            self._conn.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+
+    def _end_fts_bulk(self, fts: str, src: str, cols: Tuple[str, ...], rebuild: bool = True):
+        for sql in _fts_triggers(fts, src, cols):
+            self._conn.execute(sql)
+        if rebuild:
+            self._conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def _fts_bulk_target(self, table: str, n_writes: int) -> Optional[Tuple[str, str, Tuple[str, ...]]]:
+        """merge_rows'un trigger'sız yazacağı FTS tablosu; küçük yazımda veya trigger'lar zaten kapalıysa None."""
+        fts = _FTS_OF.get(table)
+        if fts is None or n_writes < FTS_BULK_MIN or not self._fts_enabled():
+            return None
+        # import_snapshot boş tabloya yüklerken trigger'ları kendisi kapatır
+        if self._conn.execute("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?",
+                              (f"{fts[0]}_ai",)).fetchone() is None:
+            return None
+        return fts
+
+    def _fts_delta(self, fts: str, src: str, cols: Tuple[str, ...], ids: List[int], delete: bool = False):
+        """Trigger'lar kapalıyken verilen satırların indeks kaydını siler/ekler (_ad/_ai'nin küme karşılığı)."""
+        if not ids:
+            return
+        col_list = ", ".join(cols)
+        if delete:
+            head = f"INSERT INTO {fts}({fts}, rowid, {col_list}) SELECT 'delete', id, {col_list}"
+        else:
+            head = f"INSERT INTO {fts}(rowid, {col_list}) SELECT id, {col_list}"
+        self._conn.execute(f"{head} FROM {src} WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(ids),))
+
+    def schema_version(self) -> int:
+        row = self._conn.execute("SELECT version FROM schema_version").fetchone()
+        return int(row[0]) if row else 0
+
+    # ---------------- Maintenance ----------------
+    def purge_tombstones(self, grace_days: float = TOMBSTONE_GRACE_DAYS) -> Dict[str, int]:
+        """
+        deleted=1 satırları fiziksel olarak siler; sync_queue'da hâlâ bekleyen
+        (sunucuya gitmemiş) satırlar ve grace_days'ten yeni silinenler kalır.
+        deleted_rows'tan bir önceki temizlikten eski kayıtlar budanır ("deleted_rows" sayacı).
+        """
+        cutoff = int(time.time() - grace_days * 86400)
+        out: Dict[str, int] = {}
+        self.clear_caches()
+        with self.transaction():
+            for table in ("tasks", "events"):
+                cur = self._conn.execute(f"""
+                    DELETE FROM {table}
+                    WHERE deleted=1 AND updated_epoch < ?
+                      AND id NOT IN (
+                          SELECT row_id FROM sync_queue
+                          WHERE table_name=? AND row_id IS NOT NULL
+                      )
+                """, (cutoff, table))
+                out[table] = cur.rowcount
+            # Fiziksel silmelerin CDC kaydı (yukarıdaki silmeler dahil) sınırsız büyümesin. Bir temizlik
+            # aralığı geride kalan okuyucu changes_since'ten "reset" alır ve önbelleğini boşaltır.
+            cur = self._conn.execute("""
+                DELETE FROM deleted_rows WHERE version <= (
+                    SELECT purge_mark FROM change_counters c WHERE c.table_name = deleted_rows.table_name)
+            """)
+            out["deleted_rows"] = cur.rowcount
+            self._conn.execute("UPDATE change_counters SET pruned_version = purge_mark, purge_mark = version")
+        return out
+
+    def archive_pomodoro_sessions(self, older_than_days: float = POMODORO_ARCHIVE_DAYS) -> int:
+        """Eski oturumları pomodoro_sessions_archive'a taşır; rollup'lar etkilenmez."""
+        cutoff = int(time.time() - older_than_days * 86400)
+        with self.transaction():
+            self._conn.execute("""
+                INSERT OR IGNORE INTO pomodoro_sessions_archive
+                    (id, task_id, started_at, ended_at, planned_secs, actual_secs, note, created_at)
+                SELECT id, task_id, started_at, ended_at, planned_secs, actual_secs, note, created_at
+                FROM pomodoro_sessions WHERE ended_epoch < ?
+            """, (cutoff,))
+            cur = self._conn.execute("DELETE FROM pomodoro_sessions WHERE ended_epoch < ?", (cutoff,))
+        return cur.rowcount
+
+    def optimize(self, analyze: bool = False):
+        """PRAGMA optimize; analyze=True ise tam ANALYZE (planlayıcı istatistikleri)."""
+        if analyze:
+            self._conn.execute("ANALYZE")
+        self._conn.execute("PRAGMA optimize")
         self._conn.commit()
 
+    def enable_incremental_vacuum(self) -> bool:
+        """Eski DB'leri auto_vacuum=INCREMENTAL'a geçirir (tek seferlik VACUUM). Değiştiyse True."""
+        if int(self._conn.execute("PRAGMA auto_vacuum").fetchone()[0]) == 2:
+            return False
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("VACUUM")
+        return True
+
+    def incremental_vacuum(self, max_pages: int = VACUUM_STEP_PAGES) -> int:
+        """Boş sayfaların en fazla max_pages kadarını dosyaya iade eder; iade edilen sayfa sayısı."""
+        before = int(self._conn.execute("PRAGMA freelist_count").fetchone()[0])
+        if before:
+            # execute() pragma'yı tek adım çalıştırıp bırakıyor (1 sayfa); executescript sonuna kadar yürütür
+            self._conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)})")
+        return before - int(self._conn.execute("PRAGMA freelist_count").fetchone()[0])
+
+    def last_maintenance(self, task: str) -> Optional[float]:
+        row = self._conn.execute("SELECT last_run FROM maintenance_log WHERE task=?", (task,)).fetchone()
+        return float(row[0]) if row else None
+
+    def record_maintenance(self, task: str, when: Optional[float] = None):
+        with self.transaction():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO maintenance_log(task, last_run) VALUES (?, ?)",
+                (task, time.time() if when is None else when),
+            )
+
+    # ---------------- Row cache ----------------
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        return {t: c.stats() for t, c in self._row_cache.items()}
+
+    def clear_caches(self):
+        for c in self._row_cache.values():
+            c.clear()
+        self._alias_cache.clear()
+        self._occurrences.invalidate()
+
+    def sync_caches(self) -> int:
+        """
+        Başka bağlantının (yazıcı thread) yaptığı değişiklikleri önbellekten düşer;
+        okuma bağlantıları commit bildiriminden sonra bunu çağırır. Düşen kayıt sayısı.
+        """
+        dropped = 0
+        for table, cache in self._row_cache.items():
+            since = self._cache_versions.get(table)
+            if since is None:
+                cache.clear()
+                self._cache_versions[table] = self.table_version(table)
+                continue
+            ch = self.changes_since(table, since)
+            if ch["reset"]:
+                cache.clear()
+                self._cache_versions[table] = ch["version"]
+            elif ch["version"] != since:
+                cache.invalidate(ch["upserted"])
+                cache.invalidate(ch["deleted"])
+                dropped += len(ch["upserted"]) + len(ch["deleted"])
+                self._cache_versions[table] = ch["version"]
+        return dropped
+
+    # ---------------- Change tracking ----------------
+    def table_version(self, table: str) -> int:
+        """Tablonun değişiklik sayacı; her insert/update/delete'te (merge dahil) artar."""
+        row = self._conn.execute(
+            "SELECT version FROM change_counters WHERE table_name=?", (table,)
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def table_versions(self) -> Dict[str, int]:
+        rs = self._conn.execute("SELECT table_name, version FROM change_counters").fetchall()
+        return {r[0]: int(r[1]) for r in rs}
+
+    def changes_since(self, table: str, version: int) -> Dict[str, Any]:
+        """
+        version'dan sonra değişen satırlar:
+        {"version": güncel sayaç, "upserted": [id...], "deleted": [id...], "reset": bool}
+        Soft delete (deleted=1) olan satırlar "deleted" içinde döner. reset=True: version'dan sonraki
+        fiziksel silmelerin kaydı budanmış (purge_tombstones); çağıran her şeyi yeniden okumalı.
+        """
+        if table not in CDC_TABLES:
+            raise ValueError(f"Değişiklik takibi yok: {table}")
+        # Sayaç önce okunur: arada gelen yazım bir sonraki çağrıda tekrar görünür, kaybolmaz.
+        current, pruned = self._conn.execute(
+            "SELECT version, pruned_version FROM change_counters WHERE table_name=?", (table,)
+        ).fetchone()
+        if int(version) < pruned:
+            return {"version": current, "upserted": [], "deleted": [], "reset": True}
+        soft = "deleted" if table != "tags" else "0"
+        rs = self._conn.execute(
+            f"SELECT id, {soft} FROM {table} WHERE row_version > ? ORDER BY row_version",
+            (int(version),),
+        ).fetchall()
+        gone = self._conn.execute(
+            "SELECT row_id FROM deleted_rows WHERE table_name=? AND version > ? ORDER BY version",
+            (table, int(version)),
+        ).fetchall()
+        upserted = [int(r[0]) for r in rs if not r[1]]
+        deleted = [int(r[0]) for r in rs if r[1]] + [int(r[0]) for r in gone]
+        return {"version": current, "upserted": upserted, "deleted": deleted, "reset": False}
+
+    def explain_query_plan(self, sql: str, params: tuple = ()) -> List[str]:
+        rs = self._conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return [r[3] for r in rs]
+
+    def check_query_plans(self) -> List[Tuple[str, str]]:
+        """HOT_QUERIES içinde tam tablo taraması veya geçici sıralama yapanları döndürür."""
+        problems = []
+        for name, (sql, params) in HOT_QUERIES.items():
+            for detail in self.explain_query_plan(sql, params):
+                if (detail.startswith("SCAN ") and " USING " not in detail) or "TEMP B-TREE" in detail:
+                    problems.append((name, detail))
+        return problems
+
     # ---------------- Queue helpers ----------------
-    def _enqueue(self, table: str, op: str, payload: Dict[str, Any]):
+    # Aynı (table, row_id) için bekleyen kayıtlar tek kayıtta birleştirilir:
+    #   insert/upsert + upsert -> payload'lar birleşir (ilk kaydın op'u kalır)
+    #   upsert + delete        -> delete
+    #   insert + delete        -> hiçbir şey (sunucu satırı hiç görmedi)
+    def _enqueue(self, table: str, op: str, payload: Dict[str, Any], row_id: Optional[int] = None):
+        if row_id is None and payload.get("id") is not None:
+            row_id = int(payload["id"])
+        prev = None
+        if row_id is not None:
+            prev = self._conn.execute(
+                "SELECT id, op, payload, lease_until FROM sync_queue WHERE table_name=? AND row_id=? ORDER BY id DESC LIMIT 1",
+                (table, row_id),
+            ).fetchone()
+            # sahiplenilmiş kayda dokunma, lease süresi dolmuş olsa bile: gönderim hâlâ sürüyor
+            # olabilir ve ack() kaydı silince sonradan eklenen alanlar da giderdi. Yeni kayıt aç.
+            # (nack/release lease'i NULL yapar; o kayıtlar yine birleşir.)
+            if prev is not None and prev["lease_until"] is not None:
+                prev = None
+        if prev is not None:
+            if op != "delete" and prev["op"] != "delete":
+                merged = json.loads(prev["payload"])
+                merged.update(payload)
+                self._conn.execute("UPDATE sync_queue SET payload=? WHERE id=?", (json.dumps(merged), prev["id"]))
+                self._queue_counters["coalesced"] += 1
+                return
+            if op == "delete" and prev["op"] == "insert":
+                self._conn.execute("DELETE FROM sync_queue WHERE id=?", (prev["id"],))
+                self._queue_counters["cancelled"] += 1
+                return
+            if op == "delete" and prev["op"] == "upsert":
+                self._conn.execute("DELETE FROM sync_queue WHERE id=?", (prev["id"],))
+                self._queue_counters["coalesced"] += 1
+            elif op == "delete":
+                return  # zaten silinecek
         self._conn.execute(
-            "INSERT INTO sync_queue(table_name, op, payload) VALUES (?,?,?)",
-            (table, op, json.dumps(payload)),
+            "INSERT INTO sync_queue(table_name, op, payload, row_id) VALUES (?,?,?,?)",
+            (table, op, json.dumps(payload), row_id),
         )
-        self._conn.commit()
+
+    def compact_queue(self) -> int:
+        """
+        Kuyruğu drain öncesi yeniden sıkıştırır (eski sürümden kalan veya row_id'siz
+        kayıtlar için). Silinen kayıt sayısını döndürür.
+        """
+        with self.transaction():
+            rows = self._conn.execute(
+                "SELECT id, table_name, op, payload, row_id, lease_until FROM sync_queue ORDER BY id ASC"
+            ).fetchall()
+            live: Dict[Tuple[str, int], Dict[str, Any]] = {}
+            drop: List[int] = []
+            rewrite: Dict[int, Dict[str, Any]] = {}
+            for r in rows:
+                if r["row_id"] is None:
+                    continue
+                key = (r["table_name"], int(r["row_id"]))
+                if r["lease_until"] is not None:
+                    live.pop(key, None)  # sahiplenilmiş kayıt bir bariyer (bkz. _enqueue)
+                    continue
+                prev = live.get(key)
+                op = r["op"]
+                if prev is None:
+                    live[key] = {"id": r["id"], "op": op, "payload": json.loads(r["payload"])}
+                    continue
+                if op != "delete" and prev["op"] != "delete":
+                    prev["payload"].update(json.loads(r["payload"]))
+                    rewrite[prev["id"]] = prev
+                    drop.append(r["id"])
+                elif op == "delete" and prev["op"] == "insert":
+                    drop.extend((prev["id"], r["id"]))
+                    rewrite.pop(prev["id"], None)
+                    del live[key]
+                elif op == "delete" and prev["op"] == "upsert":
+                    drop.append(prev["id"])
+                    rewrite.pop(prev["id"], None)
+                    live[key] = {"id": r["id"], "op": op, "payload": json.loads(r["payload"])}
+                elif op == "delete":
+                    drop.append(r["id"])
+                else:
+                    # delete'ten sonra yeniden yazım: sırayı koru
+                    live[key] = {"id": r["id"], "op": op, "payload": json.loads(r["payload"])}
+            if rewrite:
+                self._conn.executemany(
+                    "UPDATE sync_queue SET payload=? WHERE id=?",
+                    [(json.dumps(v["payload"]), qid) for qid, v in rewrite.items()],
+                )
+            if drop:
+                self._conn.executemany("DELETE FROM sync_queue WHERE id=?", [(q,) for q in drop])
+        self._queue_counters["compacted"] += len(drop)
+        return len(drop)
+
+    def queue_stats(self) -> Dict[str, Any]:
+        by_table = {
+            r[0]: r[1] for r in
+            self._conn.execute("SELECT table_name, COUNT(*) FROM sync_queue GROUP BY table_name")
+        }
+        retrying = self._conn.execute("SELECT COUNT(*) FROM sync_queue WHERE attempts > 0").fetchone()[0]
+        return {"depth": sum(by_table.values()), "by_table": by_table, "retrying": retrying,
+                **self._queue_counters}
+
+    def claim_batch(self, limit: int = 50, lease_secs: float = QUEUE_LEASE_SECS) -> List[Dict[str, Any]]:
+        """
+        Zamanı gelmiş ve lease'i olmayan en eski `limit` kaydı lease_secs süreyle sahiplenir.
+        Kayıtlar ack() edilene kadar kuyrukta kalır; lease süresi dolarsa yeniden alınabilir.
+        """
+        now = time.time()
+        with self.transaction():
+            rows = self._conn.execute("""
+                SELECT id, table_name, op, payload, attempts FROM sync_queue
+                WHERE next_attempt_at <= ? AND (lease_until IS NULL OR lease_until <= ?)
+                ORDER BY id ASC LIMIT ?
+            """, (now, now, int(limit))).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE sync_queue SET lease_until=? WHERE id=?",
+                    [(now + lease_secs, r["id"]) for r in rows],
+                )
+        return [{
+            "id": r["id"],
+            "table": r["table_name"],
+            "op": r["op"],
+            "payload": json.loads(r["payload"]),
+            "attempts": r["attempts"],
+        } for r in rows]
+
+    def ack(self, queue_ids: Iterable[int]):
+        """Sunucuya başarıyla gönderilen kayıtları kuyruktan siler."""
+        with self.transaction():
+            self._conn.executemany("DELETE FROM sync_queue WHERE id=?", [(int(q),) for q in queue_ids])
+
+    def nack(self, queue_ids: Iterable[int], error: str = ""):
+        """Başarısız gönderim: attempts++ ve üstel geri çekilme ile yeniden planla."""
+        now = time.time()
+        with self.transaction():
+            ids = [int(q) for q in queue_ids]
+            params = []
+            for qid in ids:
+                r = self._conn.execute("SELECT attempts FROM sync_queue WHERE id=?", (qid,)).fetchone()
+                if r is None:
+                    continue
+                attempts = int(r[0]) + 1
+                delay = min(QUEUE_BACKOFF_MAX, QUEUE_BACKOFF_BASE * (2 ** (attempts - 1)))
+                delay *= random.uniform(0.8, 1.2)
+                params.append((attempts, now + delay, error[:500], qid))
+            self._conn.executemany(
+                "UPDATE sync_queue SET attempts=?, next_attempt_at=?, last_error=?, lease_until=NULL WHERE id=?",
+                params,
+            )
+
+    def release(self, queue_ids: Iterable[int]):
+        """Lease'i deneme sayısını artırmadan bırakır (örn. ağ yokken yarıda kesilen batch)."""
+        with self.transaction():
+            self._conn.executemany(
+                "UPDATE sync_queue SET lease_until=NULL WHERE id=?", [(int(q),) for q in queue_ids]
+            )
 
     def dequeue_all(self) -> List[Dict[str, Any]]:
-        rows = self._conn.execute(
-            "SELECT id, table_name, op, payload FROM sync_queue ORDER BY id ASC"
-        ).fetchall()
-        self._conn.execute("DELETE FROM sync_queue")
-        self._conn.commit()
-        out = []
-        for r in rows:
-            out.append({
-                "id": r["id"],
-                "table": r["table_name"],
-                "op": r["op"],
-                "payload": json.loads(r["payload"]),
-            })
+        """
+        Tüm kuyruğu tek seferde alır ve siler. Gönderim yarıda kalırsa kayıtlar kaybolur;
+        senkronizasyon için claim_batch()/ack() kullanılmalı.
+        """
+        with self.transaction():
+            self.compact_queue()
+            rows = self._conn.execute(
+                "SELECT id, table_name, op, payload FROM sync_queue ORDER BY id ASC"
+            ).fetchall()
+            self._conn.execute("DELETE FROM sync_queue")
+            out = []
+            for r in rows:
+                out.append({
+                    "id": r["id"],
+                    "table": r["table_name"],
+                    "op": r["op"],
+                    "payload": json.loads(r["payload"]),
+                })
         return out
 
     # ---------------- Replace pulls ----------------
-    def replace_all(self, table: str, rows: List[Dict[str, Any]]):
-        if table == "tasks":
-            self._conn.execute("DELETE FROM tasks")
-            for t in rows or []:
-                self._conn.execute("""
-                    INSERT INTO tasks(id, title, notes, status, due_date, has_time, deleted, created_at, updated_at)
-                    VALUES(?,?,?,?,?,?,?,?,?)
-                """, (
-                    t.get("id"),
-                    t.get("title",""),
-                    t.get("notes",""),
-                    t.get("status","todo"),
-                    t.get("due_date"),
-                    int(t.get("has_time",0)),
-                    int(t.get("deleted",0)) if "deleted" in t else 0,
-                    t.get("created_at") or _now_iso(),
-                    t.get("updated_at") or _now_iso(),
-                ))
-
-        elif table == "events":
-            self._conn.execute("DELETE FROM events")
-            for e in rows or []:
-                start_ts = e.get("start_ts") or e.get("starts_at")
-                end_ts   = e.get("end_ts")   or e.get("ends_at")
-                self._conn.execute("""
-                    INSERT INTO events(id, task_id, title, notes, start_ts, end_ts, rrule, deleted, updated_at)
-                    VALUES(?,?,?,?,?,?,?,?,?)
-                """, (
-                    e.get("id"),
-                    e.get("task_id"),
-                    e.get("title"),
-                    e.get("notes",""),
-                    start_ts,
-                    end_ts,
-                    e.get("rrule"),
-                    int(e.get("deleted",0)) if "deleted" in e else 0,
-                    e.get("updated_at") or _now_iso(),
-                ))
-
-        elif table == "tags":
-            self._conn.execute("DELETE FROM tags")
-            for g in rows or []:
-                self._conn.execute("INSERT OR IGNORE INTO tags(id, name) VALUES(?,?)", (g.get("id"), g.get("name")))
+    def replace_all(self, table: str, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Sunucudaki tam tabloyu yerelle birleştirir (bkz. merge_rows, prune=True)."""
+        return self.merge_rows(table, rows, prune=True)
 
-        self._conn.commit()
+    def merge_rows(self, table: str, rows: List[Dict[str, Any]], prune: bool = False) -> Dict[str, int]:
+        """
+        Sunucu satırlarını yerel tabloya fark bazlı yazar:
+          - yeni id'ler eklenir, updated_at'i daha yeni olanlar güncellenir,
+            aynı/eski olanlara dokunulmaz,
+          - prune=True ise gelen listede olmayan yerel satırlar silinir,
+          - sync_queue'da bekleyen yerel değişikliği olan satırlar korunur,
+          - tags: aynı isimli yerel etiket sunucudaki id'ye taşınır.
+        Dönen sayaçlar: inserted, updated, deleted, unchanged, pending.
+        """
+        if table not in MERGE_SQL:
+            raise ValueError(f"unknown table: {table!r}")
+        stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "pending": 0}
+        if table in self._row_cache:
+            self._row_cache[table].clear()
+        compare = _MERGE_COMPARE[table]
+        with self.transaction():
+            if table == "tags":
+                self._adopt_server_tag_ids(rows or [])
+            pending_ids, pending_names = self._pending_keys(table)
+            if prune:
+                existing = {r[0]: r[1] for r in self._conn.execute(f"SELECT id, {compare} FROM {table}")}
+            else:
+                # parça parça merge'de (import) yalnızca gelen id'ler okunur
+                ids = [int(r["id"]) for r in rows or [] if r.get("id") is not None]
+                existing = {r[0]: r[1] for r in self._conn.execute(
+                    f"SELECT id, {compare} FROM {table} WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(ids),),
+                )}
+
+            to_insert: List[tuple] = []
+            to_update: List[tuple] = []
+            seen = set()
+            for raw in rows or []:
+                if raw.get("id") is None:
+                    continue
+                vals = _MERGE_VALUES[table](raw)
+                rid = vals[0]
+                seen.add(rid)
+                if rid in pending_ids:
+                    stats["pending"] += 1
+                    continue
+                if rid not in existing:
+                    to_insert.append(vals)
+                    continue
+                cur_val = existing[rid]
+                if table == "tags":
+                    changed = vals[1] != cur_val
+                elif table == "pomodoro_sessions":
+                    changed = False
+                else:
+                    new_ts = to_epoch(raw.get("updated_at"))
+                    changed = new_ts is None or cur_val is None or new_ts > cur_val
+                if changed:
+                    to_update.append(vals)
+                else:
+                    stats["unchanged"] += 1
+
+            stale = [
+                (rid,) for rid, cur_val in existing.items()
+                if rid not in seen and rid not in pending_ids
+                and not (table == "tags" and cur_val in pending_names)
+            ] if prune else []
+
+            # Büyük merge'de satır başına FTS trigger'ı (~%60 süre) yerine iki küme sorgusu
+            fts = self._fts_bulk_target(table, len(to_insert) + len(to_update) + len(stale))
+            # tablonun büyük kısmı yazılıyorsa tek 'rebuild' fark sorgularından ucuzdur
+            rebuild = prune and 2 * (len(to_update) + len(stale)) >= len(existing)
+            if fts:
+                self._begin_fts_bulk(fts[0])
+                if not rebuild:
+                    self._fts_delta(*fts, [v[0] for v in to_update] + [r[0] for r in stale], delete=True)
+
+            insert_sql, update_sql = MERGE_SQL[table]
+            if to_insert:
+                # rowcount trigger'ların (FTS, CDC) yaptığı yazımları saymaz
+                stats["inserted"] = self._conn.executemany(insert_sql, to_insert).rowcount
+            if to_update:
+                stats["updated"] = self._conn.executemany(update_sql, to_update).rowcount
+            if stale:
+                stats["deleted"] = self._conn.executemany(
+                    f"DELETE FROM {table} WHERE id=?", stale).rowcount
+
+            if fts:
+                if not rebuild:
+                    self._fts_delta(*fts, [v[0] for v in to_insert] + [v[0] for v in to_update])
+                self._end_fts_bulk(*fts, rebuild=rebuild)
+        return stats
+
+    def _adopt_server_tag_ids(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Yerelde eklenen etiket sunucudan başka bir id ile döner; isim UNIQUE olduğu için
+        eklenemez ve prune yerel satırı silerdi. Aynı isimli yerel satır (görevlerin tag_id'si,
+        task_tags ve bekleyen kuyruk dahil) sunucu id'sine taşınır. Taşınan satır sayısı.
+        """
+        by_name = {r.get("name"): int(r["id"]) for r in rows if r.get("id") is not None and r.get("name")}
+        if not by_name:
+            return 0
+        c = self._conn
+        moves = [
+            (int(lid), by_name[name]) for lid, name in c.execute(
+                "SELECT id, name FROM tags WHERE name IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(by_name), ensure_ascii=False),),
+            ) if by_name[name] != lid
+        ]
+        if not moves:
+            return 0
+        # Önce geçici (negatif) id'lere: hedef id taşınan başka bir satırda olabilir
+        for old, _ in moves:
+            _rekey_row(c, "tags", old, -old, alias=False)
+        top = max([r[0] or 0 for r in c.execute("SELECT MAX(id) FROM tags")] + list(by_name.values()))
+        for old, new in moves:
+            if c.execute("SELECT 1 FROM tags WHERE id=?", (new,)).fetchone():
+                # hedef id'de sunucuda bu isimle olmayan yerel bir etiket var: boş bir id'ye geçer
+                top += 1
+                _rekey_row(c, "tags", new, top)
+            _rekey_row(c, "tags", -old, new, alias=False)
+            c.execute("INSERT OR REPLACE INTO id_aliases(table_name, old_id, new_id) VALUES ('tags',?,?)", (old, new))
+        # geçici id'ler hiçbir tüketiciye görünmedi; silinmiş olarak raporlanmasınlar
+        c.execute(
+            "DELETE FROM deleted_rows WHERE table_name='tags' AND row_id IN (SELECT value FROM json_each(?))",
+            (json.dumps([-old for old, _ in moves]),),
+        )
+        self.clear_caches()
+        return len(moves)
+
+    # ---------------- Incremental pulls ----------------
+    def get_sync_state(self, table: str) -> Dict[str, Any]:
+        """{"watermark": epoch|None, "full_at": ts|None, "pulled_at": ts|None}"""
+        row = self._conn.execute(
+            "SELECT watermark, full_at, pulled_at FROM sync_state WHERE table_name=?", (table,)
+        ).fetchone()
+        if row is None:
+            return {"watermark": None, "full_at": None, "pulled_at": None}
+        return {"watermark": row[0], "full_at": row[1], "pulled_at": row[2]}
+
+    def finish_pull(self, table: str, watermark: Optional[int], server_ids: Optional[Iterable[int]] = None,
+                    full: bool = False, now: Optional[float] = None) -> int:
+        """
+        Çekimin sonu; sayfalar (merge_rows) yazıldıktan sonra çağrılır. Watermark yalnızca burada
+        ilerler: sayfalar id sırasıyla gelir, yarıda kalan çekim daha küçük updated_at'li
+        çekilmemiş satırları atlatmasın. server_ids verilirse görülmeyen satırlar budanır
+        (prune_missing); full=True tam çekimdir (full_at yazılır). Sunucu silmeleri fiziksel
+        olduğundan satırlarda tombstone gelmez; silinenler yalnızca bu budamayla düşer.
+        Budanan satır sayısını döner.
+        """
+        now = time.time() if now is None else now
+        with self.transaction():
+            deleted = self.prune_missing(table, server_ids) if server_ids is not None else 0
+            self._conn.execute("""
+                INSERT INTO sync_state(table_name, watermark, full_at, pulled_at) VALUES (?,?,?,?)
+                ON CONFLICT(table_name) DO UPDATE SET
+                    watermark=MAX(COALESCE(watermark, excluded.watermark), COALESCE(excluded.watermark, watermark)),
+                    full_at=COALESCE(excluded.full_at, full_at),
+                    pulled_at=excluded.pulled_at
+            """, (table, watermark, now if full else None, now))
+        return deleted
+
+    def comparable_row_count(self, table: str) -> Optional[int]:
+        """
+        Sunucudaki satır sayısıyla karşılaştırılabilir yerel sayı (silinmişler hariç).
+        Tabloda sync_queue'da bekleyen kayıt varsa sayılar karşılaştırılamaz: None.
+        """
+        if table not in CDC_TABLES:
+            raise ValueError(f"unknown table: {table!r}")
+        if self._conn.execute("SELECT 1 FROM sync_queue WHERE table_name=? LIMIT 1", (table,)).fetchone():
+            return None
+        live = "" if table == "tags" else " WHERE deleted=0"
+        return int(self._conn.execute(f"SELECT COUNT(*) FROM {table}{live}").fetchone()[0])
+
+    def prune_missing(self, table: str, server_ids: Iterable[int]) -> int:
+        """Sunucuda artık olmayan (orada fiziksel silinmiş) yerel satırları siler; bekleyenler kalır."""
+        if table not in CDC_TABLES:
+            raise ValueError(f"unknown table: {table!r}")
+        keep = {int(i) for i in server_ids}
+        if table in self._row_cache:
+            self._row_cache[table].clear()
+        with self.transaction():
+            pending_ids, pending_names = self._pending_keys(table)
+            name = "name" if table == "tags" else "NULL"
+            stale = [
+                (rid,) for rid, nm in self._conn.execute(f"SELECT id, {name} FROM {table}")
+                if rid not in keep and rid not in pending_ids and nm not in pending_names
+            ]
+            if not stale:
+                return 0
+            return self._conn.executemany(f"DELETE FROM {table} WHERE id=?", stale).rowcount
+
+    # ---------------- Snapshot ----------------
+    def export_snapshot(self, stream, chunk_size: int = SNAPSHOT_CHUNK) -> Dict[str, int]:
+        """
+        tasks, tags, events ve pomodoro oturumlarını JSONL olarak stream'e (metin) yazar.
+        Tablolar fetchmany ile parça parça okunur; tek bir okuma transaction'ı tutarlı anlık görüntü verir.
+        Tablo başına yazılan satır sayısını döner.
+        """
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        counts: Dict[str, int] = {}
+        own_tx = not self._conn.in_transaction
+        if own_tx:
+            self._conn.execute("BEGIN")
+        try:
+            stream.write(dumps({"format": SNAPSHOT_FORMAT, "schema": self.schema_version(),
+                                "exported_at": _now_iso()}) + "\n")
+            for table, columns, sql in SNAPSHOT_TABLES:
+                stream.write(dumps({"table": table, "columns": columns}) + "\n")
+                cur = self._conn.cursor()
+                cur.row_factory = None
+                cur.execute(sql)
+                n = 0
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    stream.write("\n".join(map(dumps, rows)) + "\n")
+                    n += len(rows)
+                counts[table] = n
+        finally:
+            if own_tx:
+                self._conn.rollback()
+        return counts
+
+    def import_snapshot(self, stream, chunk_size: int = SNAPSHOT_CHUNK) -> Dict[str, Dict[str, int]]:
+        """
+        export_snapshot çıktısını merge_rows ile (parça başına bir transaction) içeri alır.
+        Yerelde daha yeni olan satırlar ve sync_queue'da bekleyenler korunur; hiçbir şey silinmez.
+        Boş bir tabloya yüklerken tablonun trigger'ları ve ikincil indeksleri kapatılır; indeksler,
+        FTS ve trigger'ların türettiği veri (CDC, task_tags, closure, pomodoro_daily) tablo sonunda
+        tek seferde kurulur (boş DB'ye ~25 µs/satır; bkz. bench/localdb_bench.py snapshot.*).
+        """
+        header = json.loads(stream.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError("Geçersiz snapshot dosyası")
+        stats: Dict[str, Dict[str, int]] = {}
+        table: Optional[str] = None
+        columns: Tuple[str, ...] = ()
+        chunk: List[Dict[str, Any]] = []
+        bulk: List[str] = []  # trigger/indeksleri kapatılmış tablolar
+
+        def end_bulk():
+            while bulk:
+                with self.transaction():
+                    self._end_bulk_load(bulk.pop())
+
+        def flush():
+            if not chunk:
+                return
+            rows = chunk
+            if table == "pomodoro_sessions":
+                # arşive taşınmış oturumlar tekrar eklenirse rollup'lar iki kez sayılır
+                archived = {r[0] for r in self._conn.execute(
+                    "SELECT id FROM pomodoro_sessions_archive WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps([r["id"] for r in rows]),),
+                )}
+                rows = [r for r in rows if r["id"] not in archived]
+            res = self.merge_rows(table, rows)
+            acc = stats.setdefault(table, dict.fromkeys(res, 0))
+            for k, v in res.items():
+                acc[k] += v
+            chunk.clear()
+
+        try:
+            for line in stream:
+                rec = json.loads(line)
+                if isinstance(rec, dict):
+                    flush()
+                    end_bulk()
+                    table, columns = rec["table"], tuple(rec["columns"])
+                    if table not in MERGE_SQL:
+                        raise ValueError(f"unknown table: {table!r}")
+                    if self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None:
+                        with self.transaction():
+                            self._begin_bulk_load(table)
+                        bulk.append(table)
+                    continue
+                chunk.append(dict(zip(columns, rec)))
+                if len(chunk) >= chunk_size:
+                    flush()
+            flush()
+        finally:
+            end_bulk()
+        return stats
+
+    def _pending_keys(self, table: str) -> Tuple[set, set]:
+        """sync_queue'da henüz gönderilmemiş satır id'leri (tags için isimler de)."""
+        ids, names = set(), set()
+        for r in self._conn.execute("SELECT row_id, payload FROM sync_queue WHERE table_name=?", (table,)):
+            if r[0] is not None:
+                ids.add(int(r[0]))
+            if table == "tags":
+                names.add(json.loads(r[1]).get("name"))
+        return ids, names
 
     # ---------------- Getters ----------------
-    def get_tasks(self) -> List[Dict[str, Any]]:
-        rs = self._conn.execute("""
-            SELECT * FROM tasks
-            WHERE deleted=0 AND (has_time IS NULL OR has_time=0)
-            ORDER BY created_at DESC
-        """).fetchall()
-        return [dict(r) for r in rs]
+    # Getter'lar services.records kayıtları döner (dict gibi okunur, satır başına dict yok).
+    def _fetch(self, row_cls, sql: str, params: tuple = ()) -> list:
+        cur = self._conn.cursor()
+        cur.row_factory = row_cls.row_factory
+        return cur.execute(sql, params).fetchall()
+
+    def get_tasks(self, tag_ids: Optional[Iterable[int]] = None) -> List[TaskRow]:
+        """tag_ids verilirse yalnızca bu etiketlerden birini taşıyan görevler (boş küme = hiçbiri)."""
+        if tag_ids is None:
+            return self._fetch(TaskRow, SQL_GET_TASKS)
+        return self._fetch(TaskRow, SQL_GET_TASKS_BY_TAGS, (_json_ids(tag_ids),))
+
+    def get_tasks_columnar(self, fields: Iterable[str] = ("id", "title", "status")) -> Dict[str, tuple]:
+        """
+        Toplu tüketiciler için hızlı yol: get_tasks() ile aynı satırlar, kolon kolon tuple'lar
+        ({"id": (..), "title": (..)}); satır nesnesi hiç oluşmaz.
+        """
+        fields = tuple(fields)
+        bad = [f for f in fields if f not in TaskRow._fields]
+        if bad:
+            raise ValueError(f"Bilinmeyen kolon: {bad}")
+        cur = self._conn.cursor()
+        cur.row_factory = None
+        rows = cur.execute(SQL_GET_TASKS.replace(TaskRow.COLUMNS, ", ".join(fields), 1)).fetchall()
+        cols = tuple(zip(*rows)) if rows else ((),) * len(fields)
+        return dict(zip(fields, cols))
 
-    def get_task_by_id(self, task_id: int) -> Optional[Dict[str, Any]]:
-        r = self._conn.execute("SELECT * FROM tasks WHERE id=?", (int(task_id),)).fetchone()
-        return dict(r) if r else None
+    # ---- Hiyerarşi (task_closure) ----
+    def get_subtree(self, task_id: int, include_self: bool = True) -> List[TaskRow]:
+        """Görevin tüm torunları (silinmemiş), derinlik sırasıyla; tek sorgu."""
+        return self._fetch(TaskRow, f"""
+            SELECT {", ".join("t." + f for f in TaskRow._fields)}
+            FROM task_closure c JOIN tasks t ON t.id = c.descendant_id
+            WHERE c.ancestor_id = ? AND c.depth >= ? AND t.deleted = 0
+            ORDER BY c.depth, t.created_epoch
+        """, (int(task_id), 0 if include_self else 1))
 
-    def get_events(self) -> List[Dict[str, Any]]:
+    def get_ancestors(self, task_id: int) -> List[TaskRow]:
+        """Kökten (proje) doğrudan üste kadar atalar."""
+        return self._fetch(TaskRow, f"""
+            SELECT {", ".join("t." + f for f in TaskRow._fields)}
+            FROM task_closure c JOIN tasks t ON t.id = c.ancestor_id
+            WHERE c.descendant_id = ? AND c.depth > 0
+            ORDER BY c.depth DESC
+        """, (int(task_id),))
+
+    def get_task_hierarchy(self) -> Dict[int, Dict[str, Any]]:
+        """Üstü olan görevler için {task_id: {parent_id, parent, project_id, project}} (UI etiketleri)."""
         rs = self._conn.execute("""
-            SELECT * FROM events
-            WHERE deleted=0
-            ORDER BY start_ts ASC
+            SELECT t.id, t.parent_id, p.title, r.id, r.title
+            FROM tasks t
+            JOIN tasks p ON p.id = t.parent_id
+            JOIN task_closure c ON c.descendant_id = t.id
+            JOIN tasks r ON r.id = c.ancestor_id AND r.parent_id IS NULL
+            WHERE t.parent_id IS NOT NULL AND t.deleted = 0
         """).fetchall()
-        return [dict(r) for r in rs]
+        return {r[0]: {"parent_id": r[1], "parent": r[2], "project_id": r[3], "project": r[4]} for r in rs}
+
+    def get_task_by_id(self, task_id: int) -> Optional[TaskRow]:
+        return self._get_by_id("tasks", TaskRow, int(task_id))
+
+    def get_tasks_by_ids(self, ids: Iterable[int]) -> Dict[int, TaskRow]:
+        """Toplu id araması: önbellekte olmayanlar tek sorguda (parça parça) okunur."""
+        cache = self._row_cache["tasks"]
+        out: Dict[int, TaskRow] = {}
+        missing = []
+        for i in {int(x) for x in ids}:
+            row = cache.get(i)
+            if row is None:
+                missing.append(i)
+            else:
+                out[i] = row
+        for k in range(0, len(missing), 500):
+            chunk = missing[k:k + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in self._fetch(TaskRow, f"SELECT {TaskRow.COLUMNS} FROM tasks WHERE id IN ({marks})", tuple(chunk)):
+                cache.put(row.id, row)
+                out[row.id] = row
+        return out
+
+    def _get_by_id(self, table: str, row_cls, row_id: int):
+        cache = self._row_cache[table]
+        row = cache.get(row_id)
+        if row is None:
+            rs = self._fetch(row_cls, f"SELECT {row_cls.COLUMNS} FROM {table} WHERE id=?", (row_id,))
+            if not rs and row_id < ids.LEGACY_ID_MAX:
+                return self._get_by_alias(table, row_cls, row_id)
+            row = rs[0] if rs else None
+            if row is not None:
+                cache.put(row_id, row)
+        return row
+
+    def _get_by_alias(self, table: str, row_cls, old_id: int):
+        """
+        Yeniden anahtarlanmış eski id ile okuma. Yazım yolları ve CDC yeni id'yi geçersiz kılar, eski id'yi
+        bilmez; bu yüzden kayıt tablonun değişiklik sayacıyla anahtarlanır, tablo değişince kendiliğinden düşer.
+        """
+        key = (table, self.table_version(table), old_id)
+        row = self._alias_cache.get(key)
+        if row is None:
+            rs = self._fetch(row_cls, f"""
+                SELECT {row_cls.COLUMNS} FROM {table}
+                WHERE id = (SELECT new_id FROM id_aliases WHERE table_name=? AND old_id=?)
+            """, (table, old_id))
+            row = rs[0] if rs else None
+            if row is not None:
+                self._alias_cache.put(key, row)
+        return row
+
+    def resolve_id(self, table: str, row_id: int) -> int:
+        """Eski (yeniden anahtarlanmış) id'yi güncel id'ye çevirir; değilse aynen döner."""
+        row_id = int(row_id)
+        if row_id >= ids.LEGACY_ID_MAX:
+            return row_id
+        r = self._conn.execute(
+            "SELECT new_id FROM id_aliases WHERE table_name=? AND old_id=?", (table, row_id)
+        ).fetchone()
+        return int(r[0]) if r else row_id
+
+    def get_events(self) -> List[EventRow]:
+        return self._fetch(EventRow, SQL_GET_EVENTS)
+
+    def get_events_in_range(self, start: Union[str, int], end: Union[str, int],
+                            expand_recurring: bool = False,
+                            tag_ids: Optional[Iterable[int]] = None) -> List[EventRow]:
+        """
+        [start, end) aralığıyla kesişen event'ler (ISO string veya UTC epoch; bitiş sırasına göre).
+        expand_recurring=True: rrule'lu event'lerin penceredeki tüm oluşumları da döner
+        (kopyalarda occurrence_of = üst event id).
+        tag_ids: yalnızca görevi bu etiketlerden birini taşıyan event'ler.
+        """
+        start_e = start if isinstance(start, int) else to_epoch(start)
+        end_e   = end if isinstance(end, int) else to_epoch(end)
+        if tag_ids is None:
+            tags: tuple = ()
+            range_sql, recurring_sql = SQL_GET_EVENTS_IN_RANGE, SQL_GET_RECURRING_EVENTS
+        else:
+            tags = (_json_ids(tag_ids),)
+            range_sql, recurring_sql = SQL_GET_EVENTS_IN_RANGE_BY_TAGS, SQL_GET_RECURRING_EVENTS_BY_TAGS
+        rs = self._fetch(EventRow, range_sql, tags + (start_e, end_e))
+        if not expand_recurring:
+            return rs
+        out = [r for r in rs if not r.rrule]
+        for ev in self._fetch(EventRow, recurring_sql, tags + (end_e,)):
+            starts = self._occurrences.occurrences(ev, start_e, end_e)
+            if starts is None:  # çözülemeyen kural: tekil event gibi
+                if ev.end_epoch is not None and ev.end_epoch > start_e:
+                    out.append(ev)
+                continue
+            out.extend(recurrence.materialize(ev, starts))
+        out.sort(key=lambda e: e.end_epoch if e.end_epoch is not None else 0)
+        return out
+
+    def get_event_by_id(self, ev_id: int) -> Optional[EventRow]:
+        return self._get_by_id("events", EventRow, int(ev_id))
+
+    def get_tags(self) -> List[TagRow]:
+        return self._fetch(TagRow, f"SELECT {TagRow.COLUMNS} FROM tags")
 
-    def get_event_by_id(self, ev_id: int) -> Optional[Dict[str, Any]]:
-        r = self._conn.execute("SELECT * FROM events WHERE id=?", (int(ev_id),)).fetchone()
-        return dict(r) if r else None
+    # ---------------- Search ----------------
+    def _fts_enabled(self) -> bool:
+        if self._has_fts is None:
+            self._has_fts = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name='tasks_fts'"
+            ).fetchone() is not None
+        return self._has_fts
 
-    def get_tags(self) -> List[Dict[str, Any]]:
-        rs = self._conn.execute("SELECT * FROM tags").fetchall()
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Görev, event ve pomodoro notlarında sıralı arama.
+        Her sonuç: kind ('task'|'event'|'pomodoro'), id, task_id, title, snippet, rank (küçük = iyi).
+        """
+        match = _fts_query(query or "")
+        if not match:
+            return []
+        if self._fts_enabled():
+            params = (match, limit) * 3 + (limit,)
+            rs = self._conn.execute(SQL_SEARCH_FTS, params).fetchall()
+            return [dict(r) for r in rs]
+        # FTS5'siz SQLite derlemeleri için yavaş yol
+        like = f"%{query.strip()}%"
+        rs = self._conn.execute("""
+            SELECT 'task' AS kind, id, id AS task_id, title, notes AS snippet, 0 AS rank
+            FROM tasks WHERE deleted=0 AND (title LIKE ?1 OR notes LIKE ?1)
+            UNION ALL
+            SELECT 'event', id, task_id, title, notes, 0
+            FROM events WHERE deleted=0 AND (title LIKE ?1 OR notes LIKE ?1)
+            UNION ALL
+            SELECT 'pomodoro', id, task_id, NULL, note, 0
+            FROM pomodoro_sessions WHERE note LIKE ?1
+            LIMIT ?2
+        """, (like, limit)).fetchall()
         return [dict(r) for r in rs]
 
     # ---------------- TAGS ops ----------------
     def add_tag_local(self, name: str) -> int:
-        cur = self._conn.execute("INSERT INTO tags(name) VALUES(?)", (name,))
-        tag_id = int(cur.lastrowid)
-        self._enqueue("tags", "insert", {"name": name})
-        self._conn.commit()
+        with self.transaction():
+            cur = self._conn.execute("INSERT INTO tags(name) VALUES(?)", (name,))
+            tag_id = int(cur.lastrowid)
+            self._enqueue("tags", "insert", {"name": name}, row_id=tag_id)
         return tag_id
 
     def delete_tag_local(self, tag_id: int):
-        self._conn.execute("DELETE FROM tags WHERE id=?", (int(tag_id),))
-        self._enqueue("tags", "delete", {"id": int(tag_id)})
-        self._conn.commit()
+        with self.transaction():
+            self._conn.execute("DELETE FROM tags WHERE id=?", (int(tag_id),))
+            self._enqueue("tags", "delete", {"id": int(tag_id)})
 
     # ---------------- TASKS ops ----------------
     def upsert_task(self, task_id: Optional[int], title: str, notes: str,
-                    due_date_iso: Optional[str], has_time: bool=False) -> int:
-        if task_id:
-            self._conn.execute("""
-                UPDATE tasks SET title=?, notes=?, due_date=?, has_time=?, updated_at=?
-                WHERE id=?
-            """, (title, notes, due_date_iso, int(has_time), _now_iso(), int(task_id)))
-            self._enqueue("tasks", "upsert", {
-                "id": int(task_id),
-                "title": title, "notes": notes,
-                "due_date": due_date_iso, "has_time": bool(has_time)
-            })
-            tid = int(task_id)
-        else:
-            cur = self._conn.execute("""
-                INSERT INTO tasks(title, notes, due_date, has_time, created_at, updated_at)
-                VALUES(?,?,?,?,?,?)
-            """, (title, notes, due_date_iso, int(has_time), _now_iso(), _now_iso()))
-            tid = int(cur.lastrowid)
-            self._enqueue("tasks", "upsert", {
-                "id": tid,
-                "title": title, "notes": notes,
-                "due_date": due_date_iso, "has_time": bool(has_time)
-            })
-        self._conn.commit()
+                    due_date_iso: Optional[str], has_time: bool=False, new_id: Optional[int] = None) -> int:
+        """
+        task_id=None yeni görev ekler; id istemcide üretilir (services.ids). new_id verilirse
+        (çağıran id'yi önceden üretip yazımı beklemeden kullanıyorsa) o kullanılır.
+        """
+        with self.transaction():
+            if task_id:
+                self._conn.execute("""
+                    UPDATE tasks SET title=?, notes=?, due_date=?, has_time=?, updated_at=?
+                    WHERE id=?
+                """, (title, notes, due_date_iso, int(has_time), _now_iso(), int(task_id)))
+                self._row_cache["tasks"].invalidate((task_id,))
+                self._enqueue("tasks", "upsert", {
+                    "id": int(task_id),
+                    "title": title, "notes": notes,
+                    "due_date": due_date_iso, "has_time": bool(has_time)
+                })
+                tid = int(task_id)
+            else:
+                tid = int(new_id) if new_id is not None else ids.new_id()
+                self._conn.execute("""
+                    INSERT INTO tasks(id, title, notes, due_date, has_time, created_at, updated_at)
+                    VALUES(?,?,?,?,?,?,?)
+                """, (tid, title, notes, due_date_iso, int(has_time), _now_iso(), _now_iso()))
+                self._enqueue("tasks", "insert", {
+                    "id": tid,
+                    "title": title, "notes": notes,
+                    "due_date": due_date_iso, "has_time": bool(has_time)
+                })
         return tid
 
     def delete_task(self, task_id: int):
-        self._conn.execute("UPDATE tasks SET deleted=1, updated_at=? WHERE id=?",
-                           (_now_iso(), int(task_id)))
-        self._enqueue("tasks", "delete", {"id": int(task_id)})
-        self._conn.commit()
+        self._row_cache["tasks"].invalidate((task_id,))
+        with self.transaction():
+            self._conn.execute("UPDATE tasks SET deleted=1, updated_at=? WHERE id=?",
+                               (_now_iso(), int(task_id)))
+            self._enqueue("tasks", "delete", {"id": int(task_id)})
 
     def set_task_status(self, task_id: int, status: str):
-        # 🔒 title'a dokunma — sadece status
-        self._conn.execute("UPDATE tasks SET status=?, updated_at=? WHERE id=?",
-                           (status, _now_iso(), int(task_id)))
-        self._enqueue("tasks", "upsert", {"id": int(task_id), "status": status})
-        self._conn.commit()
+        self._row_cache["tasks"].invalidate((task_id,))
+        with self.transaction():
+            # 🔒 title'a dokunma — sadece status
+            self._conn.execute("UPDATE tasks SET status=?, updated_at=? WHERE id=?",
+                               (status, _now_iso(), int(task_id)))
+            self._enqueue("tasks", "upsert", {"id": int(task_id), "status": status})
 
     def mark_task_has_time(self, task_id: int, has_time: bool):
-        self._conn.execute("UPDATE tasks SET has_time=?, updated_at=? WHERE id=?",
-                           (int(has_time), _now_iso(), int(task_id)))
-        self._enqueue("tasks", "upsert", {"id": int(task_id), "has_time": bool(has_time)})
-        self._conn.commit()
+        self._row_cache["tasks"].invalidate((task_id,))
+        with self.transaction():
+            self._conn.execute("UPDATE tasks SET has_time=?, updated_at=? WHERE id=?",
+                               (int(has_time), _now_iso(), int(task_id)))
+            self._enqueue("tasks", "upsert", {"id": int(task_id), "has_time": bool(has_time)})
+
+    def set_task_parent(self, task_id: int, parent_id: Optional[int]):
+        """
+        Görevi başka bir görevin altına taşır (None = kök/proje). Closure trigger'la güncellenir.
+        Hiyerarşi yereldir (sunucu şemasında parent_id yok): kuyruğa yazılmaz, updated_at değişmez.
+        """
+        task_id = int(task_id)
+        parent_id = None if parent_id is None else int(parent_id)
+        if parent_id is not None and self._conn.execute(
+            "SELECT 1 FROM task_closure WHERE ancestor_id=? AND descendant_id=?", (task_id, parent_id)
+        ).fetchone():
+            raise ValueError("Görev kendi alt görevinin altına taşınamaz")
+        self._row_cache["tasks"].invalidate((task_id,))
+        with self.transaction():
+            self._conn.execute("UPDATE tasks SET parent_id=? WHERE id=?", (parent_id, task_id))
+
+    def set_subtree_status(self, task_id: int, status: str) -> int:
+        """Görevin ve tüm alt görevlerinin durumunu tek UPDATE ile değiştirir; değişen satır sayısı."""
+        now = _now_iso()
+        with self.transaction():
+            ids = [r[0] for r in self._conn.execute("""
+                SELECT t.id FROM task_closure c JOIN tasks t ON t.id = c.descendant_id
+                WHERE c.ancestor_id=? AND t.deleted=0 AND t.status IS NOT ?
+            """, (int(task_id), status))]
+            self._conn.execute("""
+                UPDATE tasks SET status=?, updated_at=?
+                WHERE id IN (SELECT value FROM json_each(?))
+            """, (status, now, json.dumps(ids)))
+            self._row_cache["tasks"].invalidate(ids)
+            for tid in ids:
+                self._enqueue("tasks", "upsert", {"id": tid, "status": status})
+        return len(ids)
+
+    def set_task_tag(self, task_id: int, tag_id: Optional[int]):
+        """Görevin etiketini değiştirir (task_tags trigger ile güncellenir)."""
+        self._row_cache["tasks"].invalidate((task_id,))
+        tag_id = None if tag_id is None else int(tag_id)
+        with self.transaction():
+            self._conn.execute("UPDATE tasks SET tag_id=?, updated_at=? WHERE id=?",
+                               (tag_id, _now_iso(), int(task_id)))
+            self._enqueue("tasks", "upsert", {"id": int(task_id), "tag_id": tag_id})
 
     # ---------------- Events ops ----------------
     def create_event(self, task_id: int, start_iso: str, end_iso: str,
                      title: Optional[str]=None, notes: Optional[str]=None,
-                     rrule: Optional[str]=None) -> int:
-        cur = self._conn.execute("""
-            INSERT INTO events(task_id, title, notes, start_ts, end_ts, rrule, updated_at)
-            VALUES(?,?,?,?,?,?,?)
-        """, (int(task_id), title, notes or "", start_iso, end_iso, rrule, _now_iso()))
-        eid = int(cur.lastrowid)
-        self._enqueue("events", "upsert", {
-            "id": eid, "task_id": int(task_id), "title": title,
-            "notes": notes or "", "start_ts": start_iso, "end_ts": end_iso, "rrule": rrule
-        })
-        self._conn.commit()
+                     rrule: Optional[str]=None, new_id: Optional[int] = None) -> int:
+        eid = int(new_id) if new_id is not None else ids.new_id()
+        with self.transaction():
+            self._conn.execute("""
+                INSERT INTO events(id, task_id, title, notes, start_ts, end_ts, rrule, updated_at)
+                VALUES(?,?,?,?,?,?,?,?)
+            """, (eid, int(task_id), title, notes or "", start_iso, end_iso, rrule, _now_iso()))
+            self._enqueue("events", "insert", {
+                "id": eid, "task_id": int(task_id), "title": title,
+                "notes": notes or "", "start_ts": start_iso, "end_ts": end_iso, "rrule": rrule
+            })
         return eid
 
     def update_event(self, event_id: int, start_iso: str, end_iso: str,
                      title: Optional[str]=None, notes: Optional[str]=None,
                      rrule: Optional[str]=None):
-        self._conn.execute("""
-            UPDATE events SET start_ts=?, end_ts=?, title=?, notes=?, rrule=?, updated_at=?
-            WHERE id=?
-        """, (start_iso, end_iso, title, notes or "", rrule, _now_iso(), int(event_id)))
-        self._enqueue("events", "upsert", {
-            "id": int(event_id), "start_ts": start_iso, "end_ts": end_iso,
-            "title": title, "notes": notes or "", "rrule": rrule
-        })
-        self._conn.commit()
+        self._row_cache["events"].invalidate((event_id,))
+        with self.transaction():
+            self._conn.execute("""
+                UPDATE events SET start_ts=?, end_ts=?, title=?, notes=?, rrule=?, updated_at=?
+                WHERE id=?
+            """, (start_iso, end_iso, title, notes or "", rrule, _now_iso(), int(event_id)))
+            self._enqueue("events", "upsert", {
+                "id": int(event_id), "start_ts": start_iso, "end_ts": end_iso,
+                "title": title, "notes": notes or "", "rrule": rrule
+            })
+
+    def move_event(self, event_id: int, start_iso: str, end_iso: str):
+        """Yalnızca zamanı değiştirir (sürükle/boyutlandır); diğer alanlar okunup geri yazılmaz."""
+        self._row_cache["events"].invalidate((event_id,))
+        with self.transaction():
+            self._conn.execute("UPDATE events SET start_ts=?, end_ts=?, updated_at=? WHERE id=?",
+                               (start_iso, end_iso, _now_iso(), int(event_id)))
+            self._enqueue("events", "upsert", {"id": int(event_id), "start_ts": start_iso, "end_ts": end_iso})
 
     def delete_event(self, event_id: int):
-        self._conn.execute("UPDATE events SET deleted=1, updated_at=? WHERE id=?",
-                           (_now_iso(), int(event_id)))
-        self._enqueue("events", "delete", {"id": int(event_id)})
-        self._conn.commit()
+        self._row_cache["events"].invalidate((event_id,))
+        with self.transaction():
+            self._conn.execute("UPDATE events SET deleted=1, updated_at=? WHERE id=?",
+                               (_now_iso(), int(event_id)))
+            self._enqueue("events", "delete", {"id": int(event_id)})
 
     # ---------------- Pomodoro sessions ----------------
     def insert_pomodoro_session(
@@ -282,41 +2058,86 @@ class LocalDB:
         actual_secs: int,
         note: str,
     ) -> int:
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO pomodoro_sessions (task_id, started_at, ended_at, planned_secs, actual_secs, note)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (task_id, started_at_iso, ended_at_iso, planned_secs, actual_secs, note),
-        )
-        self._conn.commit()
-        return int(cur.lastrowid)
-
-    def list_pomodoro_sessions_for_task(self, task_id: int) -> list[dict]:
-        cur = self._conn.cursor()
-        cur.execute(
-            """
-            SELECT id, task_id, started_at, ended_at, planned_secs, actual_secs, note, created_at
-            FROM pomodoro_sessions
-            WHERE task_id = ?
-            ORDER BY datetime(ended_at) DESC
-            """,
-            (task_id,),
-        )
-        rows = cur.fetchall()
-        out = []
-        for r in rows:
-            out.append(
-                {
-                    "id": r[0],
-                    "task_id": r[1],
-                    "started_at": r[2],
-                    "ended_at": r[3],
-                    "planned_secs": r[4],
-                    "actual_secs": r[5],
-                    "note": r[6],
-                    "created_at": r[7],
-                }
+        sid = ids.new_id()
+        with self.transaction():
+            self._conn.execute(
+                """
+                INSERT INTO pomodoro_sessions (id, task_id, started_at, ended_at, planned_secs, actual_secs, note)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (sid, task_id, started_at_iso, ended_at_iso, planned_secs, actual_secs, note),
             )
-        return out
+        return sid
+
+    def pomodoro_rollup(self, by: str = "task", start_day: Optional[str] = None,
+                        end_day: Optional[str] = None, task_id: Optional[int] = None,
+                        under: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        pomodoro_daily üzerinden odak süresi toplamları.
+        by: "task" | "day" | "week" | "tag" | "project"; start_day dahil, end_day hariç (yerel tarih, 'YYYY-MM-DD').
+        under: yalnızca bu görevin alt ağacı (kendisi dahil).
+        Her satır: sessions, planned_secs, actual_secs, ratio (actual/planned).
+        """
+        if by not in _ROLLUP_GROUPS:
+            raise ValueError(f"unknown rollup grouping: {by!r}")
+        cols, group, join = _ROLLUP_GROUPS[by]
+        where, params = [], []
+        if start_day:
+            where.append("d.day >= ?"); params.append(start_day)
+        if end_day:
+            where.append("d.day < ?"); params.append(end_day)
+        if task_id is not None:
+            where.append("d.task_id = ?"); params.append(int(task_id))
+        if under is not None:
+            where.append("d.task_id IN (SELECT descendant_id FROM task_closure WHERE ancestor_id = ?)")
+            params.append(int(under))
+        rs = self._conn.execute(f"""
+            SELECT {cols},
+                   SUM(d.sessions) AS sessions,
+                   SUM(d.planned_secs) AS planned_secs,
+                   SUM(d.actual_secs) AS actual_secs,
+                   CAST(SUM(d.actual_secs) AS REAL) / NULLIF(SUM(d.planned_secs), 0) AS ratio
+            FROM pomodoro_daily d
+            LEFT JOIN tasks t ON t.id = d.task_id
+            LEFT JOIN tags g ON g.id = t.tag_id
+            {join}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            GROUP BY {group}
+            ORDER BY {group}
+        """, params).fetchall()
+        return [dict(r) for r in rs]
+
+    def list_pomodoro_sessions_for_task(self, task_id: int) -> List[SessionRow]:
+        return self._fetch(SessionRow, SQL_POMODORO_FOR_TASK, (int(task_id),))
+
+def _open_snapshot(path: str, mode: str):
+    import gzip
+    if path == "-":
+        import sys
+        return contextlib.nullcontext(sys.stdout if mode == "w" else sys.stdin)
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, mode + "t", encoding="utf-8")
+
+if __name__ == "__main__":
+    # python -m services.local_db [check-plans] [db]
+    # python -m services.local_db export <dosya|-> [db]    (.gz uzantısı sıkıştırır)
+    # python -m services.local_db import <dosya|-> [db]
+    import sys
+    args = sys.argv[1:]
+    cmd = args.pop(0) if args and args[0] in ("check-plans", "export", "import") else "check-plans"
+    if cmd in ("export", "import"):
+        if not args:
+            sys.exit(f"usage: python -m services.local_db {cmd} <file|-> [db]")
+        target = args.pop(0)
+        db = LocalDB(args[0] if args else DB_PATH)
+        t0 = time.perf_counter()
+        with _open_snapshot(target, "w" if cmd == "export" else "r") as f:
+            result = db.export_snapshot(f) if cmd == "export" else db.import_snapshot(f)
+        print(f"{cmd}: {result} ({time.perf_counter() - t0:.1f}s)", file=sys.stderr)
+        sys.exit(0)
+    db = LocalDB(args[0] if args else DB_PATH)
+    bad = db.check_query_plans()
+    for name, detail in bad:
+        print(f"{name}: {detail}")
+    print(f"schema v{db.schema_version()} — {len(HOT_QUERIES) - len({n for n, _ in bad})}/{len(HOT_QUERIES)} hot queries indexed")
+    sys.exit(1 if bad else 0)
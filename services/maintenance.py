@@ -0,0 +1,140 @@
+# services/maintenance.py
+# Uygulama boştayken (kullanıcı girdisi yok, senkron çalışmıyor) LocalDB bakımını yürütür.
+# İşler DBActor'un yazıcı thread'inde çalışır; her tick'te en fazla bir iş kuyruğa girer.
+# Son çalışma zamanları maintenance_log'da tutulur, böylece uygulama sık kapanıp açılsa da
+# işler aralıklarına uyar.
+
+from __future__ import annotations
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+from PyQt6 import QtCore
+from services.db_actor import DBActor
+from services.local_db import LocalDB
+
+# Kullanıcı bu kadar saniye dokunmazsa uygulama "boşta" sayılır
+IDLE_SECS = 120
+IDLE_CHECK_MS = 15000
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# (iş, en az kaç saniyede bir)
+MAINTENANCE_TASKS = (
+    ("purge_tombstones", 6 * HOUR),
+    ("archive_pomodoro", DAY),
+    ("optimize", HOUR),
+    ("analyze", 7 * DAY),
+    ("enable_incremental_vacuum", 30 * DAY),
+    ("incremental_vacuum", DAY),
+)
+
+_INPUT_EVENTS = {
+    QtCore.QEvent.Type.KeyPress,
+    QtCore.QEvent.Type.MouseButtonPress,
+    QtCore.QEvent.Type.MouseMove,
+    QtCore.QEvent.Type.Wheel,
+}
+
+def run_due(db: LocalDB, now: Optional[float] = None) -> Optional[tuple]:
+    """Vadesi gelen ilk işi yazıcı LocalDB üzerinde çalıştırır; (iş, sonuç) ya da None."""
+    now = time.time() if now is None else now
+    for task, every in MAINTENANCE_TASKS:
+        last = db.last_maintenance(task)
+        if last is not None and now - last < every:
+            continue
+        try:
+            result = _run(db, task)
+        except Exception as e:
+            print("maintenance error:", task, e)
+            result = None
+        db.record_maintenance(task, now)
+        return task, result
+    return None
+
+def _run(db: LocalDB, task: str):
+    if task == "purge_tombstones":
+        return db.purge_tombstones()
+    if task == "archive_pomodoro":
+        return db.archive_pomodoro_sessions()
+    if task == "optimize":
+        return db.optimize()
+    if task == "analyze":
+        return db.optimize(analyze=True)
+    if task == "enable_incremental_vacuum":
+        return db.enable_incremental_vacuum()
+    if task == "incremental_vacuum":
+        return db.incremental_vacuum()
+    raise ValueError(task)
+
+class MaintenanceScheduler(QtCore.QObject):
+    maintenanceRan = QtCore.pyqtSignal(str, object)  # iş, sonuç
+
+    def __init__(self, actor: DBActor, is_busy: Optional[Callable[[], bool]] = None, parent=None):
+        super().__init__(parent)
+        self.actor = actor
+        self._running: Optional[Future] = None
+        self._is_busy = is_busy or (lambda: False)
+        self._last_input = time.monotonic()
+        self._window: Optional[QtCore.QObject] = None
+        self._watched: Optional[QtCore.QObject] = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self._on_tick)
+
+    def start(self, interval_ms: int = IDLE_CHECK_MS, window: Optional[QtCore.QObject] = None):
+        """window verilirse kullanıcı girdisi yalnızca o pencerede izlenir; yoksa girdi izlenmez."""
+        if window is not None:
+            self.watch(window)
+        self._timer.start(int(interval_ms))
+
+    def stop(self):
+        self._timer.stop()
+        self._unwatch()
+
+    def watch(self, window: QtCore.QObject):
+        """
+        Girdi filtresini ana pencerenin QWindow'una kurar: alt widget'ların fare/klavye olayları
+        oradan geçer, uygulamanın geri kalanındaki olaylar (boya, timer, diğer pencereler) filtreye uğramaz.
+        Native pencere ilk gösterimde oluştuğu için o zamana kadar widget'ın kendisi izlenir.
+        """
+        self._unwatch()
+        self._window = window
+        handle = window.windowHandle() if hasattr(window, "windowHandle") else None
+        self._watched = handle or window
+        self._watched.installEventFilter(self)
+
+    def _unwatch(self):
+        if self._watched is not None:
+            self._watched.removeEventFilter(self)
+        self._window = self._watched = None
+
+    def eventFilter(self, obj: QtCore.QObject, ev: QtCore.QEvent) -> bool:
+        t = ev.type()
+        if t in _INPUT_EVENTS:
+            self._last_input = time.monotonic()
+        elif t == QtCore.QEvent.Type.Show and obj is self._window and self._watched is obj:
+            handle = obj.windowHandle()
+            if handle is not None:
+                obj.removeEventFilter(self)
+                handle.installEventFilter(self)
+                self._watched = handle
+        return False
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self._last_input >= IDLE_SECS and not self._is_busy()
+
+    def _on_tick(self):
+        if self.is_idle():
+            self.run_next()
+
+    def run_next(self) -> Optional[Future]:
+        """Vadesi gelen ilk işi yazıcı thread'e gönderir (önceki iş bitmediyse beklemez)."""
+        if self._running is not None and not self._running.done():
+            return None
+        self._running = self.actor.submit(run_due)
+        self._running.add_done_callback(self._on_done)
+        return self._running
+
+    def _on_done(self, fut: Future):
+        if fut.exception() is None and fut.result() is not None:
+            self.maintenanceRan.emit(*fut.result())
@@ -0,0 +1,113 @@
+# services/records.py
+# LocalDB satır tipleri. Her satır dict yerine typed bir NamedTuple'dır (tuple tabanlı,
+# __slots__ = ()): sqlite3'ün ürettiği tuple doğrudan sarılır, satır başına dict ve
+# anahtar tablosu oluşmaz. UI kodu dict gibi kullanmaya devam edebilir:
+#   r["title"], r.get("notes"), "id" in r, dict(r), {**r}, r.to_dict()
+# Değiştirmek için r.replace(title=...) yeni bir kayıt döner.
+
+from __future__ import annotations
+from typing import Any, Dict, NamedTuple, Optional
+
+def _mapping_api(cls):
+    """NamedTuple'a dict benzeri okuma API'si ve sqlite3 row_factory ekler."""
+    index = {f: i for i, f in enumerate(cls._fields)}
+    tuple_getitem = tuple.__getitem__
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return tuple_getitem(self, index[key])
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple_getitem(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = index.get(key)
+        return default if i is None else tuple_getitem(self, i)
+
+    def keys(self):
+        return cls._fields
+
+    def items(self):
+        return zip(cls._fields, self)
+
+    def __contains__(self, key) -> bool:
+        return key in index
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(cls._fields, self))
+
+    def replace(self, **changes):
+        return self._replace(**changes)
+
+    def row_factory(cursor, row):
+        return tuple.__new__(cls, row)
+
+    cls.__getitem__ = __getitem__
+    cls.get = get
+    cls.keys = keys
+    cls.items = items
+    cls.__contains__ = __contains__
+    cls.to_dict = to_dict
+    cls.replace = replace
+    cls.row_factory = staticmethod(row_factory)
+    cls.COLUMNS = ", ".join(cls._fields)
+    return cls
+
+@_mapping_api
+class TaskRow(NamedTuple):
+    id: int
+    title: Optional[str]
+    notes: Optional[str]
+    status: Optional[str]
+    due_date: Optional[str]
+    has_time: Optional[int]
+    deleted: Optional[int]
+    created_at: Optional[str]
+    updated_at: Optional[str]
+    tag_id: Optional[int]
+    parent_id: Optional[int]
+    due_epoch: Optional[int]
+    created_epoch: Optional[int]
+    updated_epoch: Optional[int]
+    row_version: int
+
+@_mapping_api
+class EventRow(NamedTuple):
+    id: int
+    task_id: Optional[int]
+    title: Optional[str]
+    notes: Optional[str]
+    start_ts: Optional[str]
+    end_ts: Optional[str]
+    rrule: Optional[str]
+    deleted: Optional[int]
+    updated_at: Optional[str]
+    start_epoch: Optional[int]
+    end_epoch: Optional[int]
+    updated_epoch: Optional[int]
+    row_version: int
+    # tablo kolonu değil: tekrarlayan event oluşumlarında üst event id'si
+    occurrence_of: Optional[int] = None
+
+# occurrence_of sorguda NULL olarak gelir
+EventRow.COLUMNS = ", ".join(f for f in EventRow._fields if f != "occurrence_of") + ", NULL AS occurrence_of"
+
+@_mapping_api
+class TagRow(NamedTuple):
+    id: int
+    name: str
+    row_version: int
+
+@_mapping_api
+class SessionRow(NamedTuple):
+    id: int
+    task_id: int
+    started_at: str
+    ended_at: str
+    planned_secs: int
+    actual_secs: int
+    note: Optional[str]
+    created_at: Optional[str]
+    started_epoch: Optional[int]
+    ended_epoch: Optional[int]
@@ -0,0 +1,222 @@
+# services/recurrence.py
+# RRULE açılımı (RFC 5545'in uygulamada kullanılan alt kümesi):
+#   FREQ=DAILY|WEEKLY|MONTHLY|YEARLY, INTERVAL, COUNT, UNTIL,
+#   BYDAY (MO,WE / aylıkta 1MO, -1FR), BYMONTHDAY (aylıkta 15, -1)
+# Zamanlar utils.timeutil politikasına göre naive UTC; hesap epoch saniyesi üzerinden yapılır.
+# Açılan oluşumlar (event_id, updated_at) anahtarlı sınırlı bir LRU'da tutulur; üst event
+# güncellenince updated_at değiştiği için eski kayıt kendiliğinden geçersiz olur.
+
+from __future__ import annotations
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from utils.timeutil import from_epoch, to_epoch
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+FREQS = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+# Bozuk/aşırı kurallara karşı tek açılımda üretilecek en fazla oluşum
+MAX_OCCURRENCES = 1000
+
+def parse_rrule(s: Optional[str]) -> Optional[dict]:
+    """
+    "RRULE=FREQ=WEEKLY;INTERVAL=1" / "RRULE:FREQ=..." / "FREQ=..." -> kural dict'i.
+    Desteklenmeyen veya bozuk kurallar için None (event tekil gösterilir).
+    """
+    if not s:
+        return None
+    text = str(s).strip()
+    for line in text.splitlines():  # "DTSTART:...\\nRRULE:..." biçimi
+        if line.upper().startswith("RRULE"):
+            text = line
+            break
+    if text[:6].upper() in ("RRULE=", "RRULE:"):
+        text = text[6:]
+    parts: Dict[str, str] = {}
+    for p in text.split(";"):
+        if "=" in p:
+            k, v = p.split("=", 1)
+            parts[k.strip().upper()] = v.strip().upper()
+    freq = parts.get("FREQ")
+    if freq not in FREQS:
+        return None
+    try:
+        rule = {
+            "freq": freq,
+            "interval": max(1, int(parts.get("INTERVAL") or 1)),
+            "count": int(parts["COUNT"]) if "COUNT" in parts else None,
+            "until": _parse_until(parts["UNTIL"]) if "UNTIL" in parts else None,
+            "byday": [_parse_byday(x) for x in parts["BYDAY"].split(",") if x] if "BYDAY" in parts else [],
+            "bymonthday": [int(x) for x in parts["BYMONTHDAY"].split(",") if x] if "BYMONTHDAY" in parts else [],
+        }
+    except (ValueError, KeyError):
+        return None
+    return rule
+
+def _parse_until(v: str) -> int:
+    # 20250131T235959Z | 20250131 | ISO
+    v = v.rstrip("Z")
+    for fmt in ("%Y%m%dT%H%M%S", "%Y%m%d"):
+        try:
+            d = datetime.strptime(v, fmt)
+            if fmt == "%Y%m%d":
+                d += timedelta(days=1, seconds=-1)  # gün boyunca dahil
+            return to_epoch(d.isoformat())
+        except ValueError:
+            pass
+    e = to_epoch(v)
+    if e is None:
+        raise ValueError(v)
+    return e
+
+def _parse_byday(v: str) -> Tuple[Optional[int], int]:
+    """'MO' -> (None, 0), '-1FR' -> (-1, 4)."""
+    wd = WEEKDAYS.index(v[-2:])
+    n = v[:-2]
+    return (int(n) if n else None, wd)
+
+def _add_months(d: datetime, months: int) -> Tuple[int, int]:
+    m = d.month - 1 + months
+    return d.year + m // 12, m % 12 + 1
+
+def _month_days(rule: dict, year: int, month: int, dtstart: datetime) -> List[int]:
+    """Aylık/yıllık periyotta o ayın hangi günleri (1..31)."""
+    ndays = monthrange(year, month)[1]
+    days = set()
+    for md in rule["bymonthday"]:
+        day = md if md > 0 else ndays + md + 1
+        if 1 <= day <= ndays:
+            days.add(day)
+    for nth, wd in rule["byday"]:
+        first_wd = monthrange(year, month)[0]
+        cands = [d for d in range(1, ndays + 1) if (first_wd + d - 1) % 7 == wd]
+        if nth is None:
+            days.update(cands)
+        elif -len(cands) <= nth <= len(cands) and nth != 0:
+            days.add(cands[nth - 1] if nth > 0 else cands[nth])
+    if not rule["bymonthday"] and not rule["byday"]:
+        if dtstart.day <= ndays:  # 31'inde başlayan kural kısa ayları atlar
+            days.add(dtstart.day)
+    return sorted(days)
+
+def _candidates(rule: dict, dtstart: datetime, skip_periods: int):
+    """Periyot periyot aday başlangıçlar (sıralı, dtstart'tan önceki dahil olabilir)."""
+    freq, interval = rule["freq"], rule["interval"]
+    tod = timedelta(hours=dtstart.hour, minutes=dtstart.minute, seconds=dtstart.second)
+    byweekday = {wd for _, wd in rule["byday"]}
+    k = skip_periods
+    while True:
+        if freq == "DAILY":
+            d = dtstart + timedelta(days=k * interval)
+            if not byweekday or d.weekday() in byweekday:
+                yield d
+        elif freq == "WEEKLY":
+            monday = (dtstart - timedelta(days=dtstart.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+            week = monday + timedelta(weeks=k * interval)
+            for wd in sorted(byweekday) if byweekday else [dtstart.weekday()]:
+                yield week + timedelta(days=wd) + tod
+        else:
+            months = k * interval * (12 if freq == "YEARLY" else 1)
+            y, m = _add_months(dtstart, months)
+            if freq == "YEARLY" and not rule["bymonthday"] and not rule["byday"]:
+                days = [dtstart.day] if dtstart.day <= monthrange(y, m)[1] else []
+            else:
+                days = _month_days(rule, y, m, dtstart)
+            for day in days:
+                yield datetime(y, m, day) + tod
+        k += 1
+
+def expand(rule: dict, start_epoch: int, duration: int,
+           win_start: int, win_end: int) -> List[int]:
+    """
+    [win_start, win_end) ile kesişen oluşumların başlangıç epoch'ları.
+    duration: event süresi (sn); pencereden önce başlayıp içine taşan oluşum da dahildir.
+    """
+    dtstart = from_epoch(start_epoch)
+    until, count = rule["until"], rule["count"]
+    skip = 0
+    if count is None and rule["freq"] in ("DAILY", "WEEKLY"):
+        # COUNT yoksa pencereye kadar olan periyotları aritmetik olarak atla
+        period = 86400 * (7 if rule["freq"] == "WEEKLY" else 1) * rule["interval"]
+        skip = max(0, (win_start - duration - start_epoch) // period - 1)
+    out: List[int] = []
+    seen = 0
+    for d in _candidates(rule, dtstart, skip):
+        e = to_epoch(d.isoformat())
+        if e < start_epoch:
+            continue
+        if e >= win_end or (until is not None and e > until):
+            break
+        seen += 1
+        if count is not None and seen > count:
+            break
+        if e + duration > win_start or (duration == 0 and e >= win_start):
+            out.append(e)
+            if len(out) >= MAX_OCCURRENCES:
+                break
+    return out
+
+class OccurrenceCache:
+    """
+    event_id -> (updated_at, pencere, oluşumlar) sınırlı LRU.
+    İstenen pencere önbellektekinin içindeyse kural yeniden çalıştırılmaz, süzülür.
+    """
+    def __init__(self, max_events: int = 2048):
+        self.max_events = max_events
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def occurrences(self, ev: dict, win_start: int, win_end: int) -> Optional[List[int]]:
+        """ev: events satırı (id, rrule, start_epoch, end_epoch, updated_at). Kural geçersizse None."""
+        eid, version = int(ev["id"]), ev.get("updated_at")
+        hit = self._data.get(eid)
+        if hit is not None and hit[0] == version and hit[1] <= win_start and win_end <= hit[2]:
+            self._data.move_to_end(eid)
+            self.hits += 1
+            starts, duration = hit[3], hit[4]
+            if starts is None:
+                return None
+            return [s for s in starts if s < win_end and (s + duration > win_start or (duration == 0 and s >= win_start))]
+        self.misses += 1
+        start_e, end_e = ev.get("start_epoch"), ev.get("end_epoch")
+        if start_e is None:
+            start_e = to_epoch(ev.get("start_ts"))
+            end_e = to_epoch(ev.get("end_ts"))
+        rule = parse_rrule(ev.get("rrule"))
+        duration = max(0, (end_e or start_e or 0) - (start_e or 0))
+        starts = None if rule is None or start_e is None else expand(rule, start_e, duration, win_start, win_end)
+        self._data[eid] = (version, win_start, win_end, starts, duration)
+        self._data.move_to_end(eid)
+        while len(self._data) > self.max_events:
+            self._data.popitem(last=False)
+        return starts
+
+    def invalidate(self, event_id: Optional[int] = None):
+        if event_id is None:
+            self._data.clear()
+        else:
+            self._data.pop(int(event_id), None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+def materialize(ev, starts: List[int]) -> list:
+    """
+    Üst event satırından (services.records.EventRow) oluşum kopyaları;
+    ilk oluşum üst satırın kendisidir.
+    """
+    duration = (ev.end_epoch or 0) - (ev.start_epoch or 0)
+    out = []
+    for s in starts:
+        if s == ev.start_epoch:
+            out.append(ev)
+            continue
+        out.append(ev.replace(
+            start_epoch=s, end_epoch=s + duration,
+            start_ts=from_epoch(s).isoformat(), end_ts=from_epoch(s + duration).isoformat(),
+            occurrence_of=ev.id,
+        ))
+    return out
@@ -1,106 +1,400 @@
 from __future__ import annotations
-from typing import Optional
+import queue, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
 from PyQt6 import QtCore
-from services.local_db import LocalDB
+from services import ids
+from services.db_actor import DBActor
+from services.local_db import DB_PATH
+from services.maintenance import MaintenanceScheduler
 import services.supabase_api as api
+from utils.timeutil import parse_ts, to_epoch, to_iso, utc_now_iso
 from datetime import datetime, timedelta
 
+# Görünür pencerenin iki yanına önceden yüklenen gün sayısı
+EVENT_PREFETCH_DAYS = 7
+
+# sync_queue drain: batch başına kayıt ve arka plan tick aralığı
+SYNC_BATCH_SIZE = 50
+SYNC_DRAIN_INTERVAL_MS = 2000
+
+# Toplu gönderim sırası: önce etiketler (görevler onlara, event'ler görevlere bağlı), silmeler
+# en sonda çocuktan üste. Etiket silme başta: aynı isimle yeniden eklenen etiket çakışmasın.
+PUSH_ORDER = (
+    ("tags", "delete"),
+    ("tags", "upsert"),
+    ("tasks", "upsert"),
+    ("events", "upsert"),
+    ("events", "delete"),
+    ("tasks", "delete"),
+)
+_BATCH_API = {
+    "tags": (api.upsert_tags, api.delete_tags),
+    "tasks": (api.upsert_tasks, api.delete_tasks),
+    "events": (api.upsert_events, api.delete_events),
+}
+
+# Çekim (server -> local) sırası: görevler etiketlere, event'ler görevlere bağlı
+PULL_TABLES = ("tags", "tasks", "events")
+_PAGES_API = {"tags": api.iter_tags, "tasks": api.iter_tasks, "events": api.iter_events}
+# Bu kadar saniyede bir tablo tam (prune'lu) çekilir: sayı kontrolünün kaçırdığı silmeler
+# (silme + ekleme aynı sayıyı verir) ve delta'nın kaçırdığı satırlar düzelir.
+FULL_RECONCILE_SECS = 24 * 3600
+# Delta watermark'tan bu kadar geriden başlar: sunucuda geç commit olan transaction'ın
+# updated_at'i (başlangıç zamanı) watermark'ın gerisinde kalabilir. Tekrar gelenler no-op.
+PULL_OVERLAP_SECS = 60
+# Tablolar paralel indirilir (aynı HTTP oturum havuzu), yazıcıya PULL_TABLES sırasıyla uygulanır.
+# Uygulanma sırasını bekleyen tablo için en fazla PULL_PREFETCH_PAGES sayfa bellekte tutulur.
+PULL_WORKERS = 3
+PULL_PREFETCH_PAGES = 4
+
+# ---------- çekim işçileri ----------
+
+class _PullEnd:
+    """Sayfa kuyruğunun sonu; delta çekimlerde sunucudaki satır sayısını da taşır."""
+    def __init__(self, server_count: Optional[int] = None):
+        self.server_count = server_count
+
+def _put(out: queue.Queue, item, cancel: threading.Event) -> bool:
+    while not cancel.is_set():
+        try:
+            out.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _fetch_pages(table: str, pages: Iterator[list], count: bool, out: queue.Queue, cancel: threading.Event):
+    """İşçi thread: sayfaları out'a koyar, sonda _PullEnd ya da hatanın kendisi."""
+    try:
+        for page in pages:
+            if not _put(out, page, cancel):
+                return
+        _put(out, _PullEnd(api.count_rows(table) if count else None), cancel)
+    except Exception as e:
+        _put(out, e, cancel)
+
+# ---------- yazıcı thread komutları ----------
+# Birden çok adımlı yazımlar tek komut olarak DBActor'da, yazıcı LocalDB ile çalışır.
+
+def _cmd_create_event(db, event_id: int, task_id: int, start_iso: str, end_iso: str,
+                      title: Optional[str], notes: Optional[str], rrule: Optional[str]) -> int:
+    with db.transaction():
+        eid = db.create_event(task_id, start_iso, end_iso, title=title, notes=notes, rrule=rrule, new_id=event_id)
+        db.mark_task_has_time(task_id, True)
+    return eid
+
+def _cmd_delete_event(db, event_id: int):
+    with db.transaction():
+        ev = db.get_event_by_id(event_id)
+        if ev and ev.get("task_id"):
+            db.mark_task_has_time(int(ev["task_id"]), False)
+        db.delete_event(event_id)
+
 class SyncOrchestrator(QtCore.QObject):
     tasksUpdated  = QtCore.pyqtSignal(list)
     eventsUpdated = QtCore.pyqtSignal(list)
     tagsUpdated   = QtCore.pyqtSignal(list)
     busyChanged   = QtCore.pyqtSignal(bool)
+    pomodoroUpdated = QtCore.pyqtSignal(object)  # task_id (63 bit id; Qt int'e sığmaz)
+    # ağ thread'i -> GUI: (iş türü, hata ya da None)
+    _netDone = QtCore.pyqtSignal(str, object)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db_path: str = DB_PATH):
         super().__init__(parent)
-        self.db = LocalDB()
+        # Yazımlar tek yazıcı thread'de; self.db yalnızca okuma bağlantısı
+        self._actor = DBActor(db_path, parent=self)
+        self._actor.committed.connect(self._on_committed)
+        self._actor.failed.connect(lambda name, err: print("db write error:", name, err))
+        self.db = self._actor.open_reader()
+        self._emit_scheduled = False
         self._busy = False
+        self._event_window: Optional[tuple[str, str]] = None
+        self._event_loaded: Optional[tuple[str, str]] = None
+        self._drain_timer: Optional[QtCore.QTimer] = None
+        self._drain_batch = SYNC_BATCH_SIZE
+        self._emitted_versions: dict[str, int] = {}
+        self._tag_filter: Optional[frozenset] = None  # None = tüm etiketler
+        self._maintenance: Optional[MaintenanceScheduler] = None
+        # Ağ işleri (çekim, kuyruk gönderimi) tek bir ağ thread'inde sırayla çalışır; GUI thread'i
+        # HTTP'yi ve yazıcı commit'lerini hiç beklemez, sonuç _netDone ile döner.
+        self._net = ThreadPoolExecutor(1, thread_name_prefix="sync")
+        self._net_pending: set[str] = set()
+        self._stopping = threading.Event()
+        self._netDone.connect(self._on_net_done)
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
 
     # ---------- lifecycle ----------
-    def bootstrap(self):
-        self._set_busy(True)
-        try:
-            try:    tasks  = api.fetch_tasks()
-            except: tasks = []
-            try:    events = api.fetch_events()
-            except: events = []
-            try:    tags   = api.fetch_tags()
-            except: tags   = []
-            self.db.replace_all("tasks", tasks)
-            self.db.replace_all("events", events)
-            self.db.replace_all("tags", tags)
-        finally:
-            self._emit_all_from_local()
-            self._set_busy(False)
+    def bootstrap(self, full: bool = False):
+        """
+        Sunucudan çeker (ağ thread'inde; hemen döner). Tablo başına tam çekim (watermark yoksa,
+        full=True ise ya da son tam çekimden FULL_RECONCILE_SECS geçtiyse) ya da updated_at >
+        watermark deltası yapılır; trafik değişenlerle orantılıdır. Üç tablo paralel indirilir,
+        bağımlılık sırasıyla uygulanır. Çekilemeyen tablo yerelde olduğu gibi kalır.
+        """
+        self._start_net_job("pull", self._pull, full)
 
     def refresh(self):
-        self._set_busy(True)
-        try:
-            items = self.db.dequeue_all()
-            for it in items:
-                table   = it.get("table")
-                op      = it.get("op")
-                payload = it.get("payload") or {}
-                if table == "tags":
-                    if op in ("insert","upsert"): api.upsert_tag(payload.get("name",""), payload.get("id"))
-                    elif op == "delete" and payload.get("id"): api.delete_tag(int(payload["id"]))
-                elif table == "tasks":
-                    if op in ("insert","upsert"): api.upsert_task(payload)
-                    elif op == "delete" and payload.get("id"): api.delete_task(int(payload["id"]))
-                elif table == "events":
-                    if op in ("insert","upsert"): api.upsert_event(payload)
-                    elif op == "delete" and payload.get("id"): api.delete_event(int(payload["id"]))
-            self.bootstrap()
-        except Exception as e:
-            print("refresh error:", e)
-            self._emit_all_from_local()
-        finally:
+        self._start_net_job("refresh", self._refresh)
+
+    def _start_net_job(self, kind: str, fn: Callable, *args) -> bool:
+        """Ağ işini kuyruğa atar; aynı türden bekleyen iş varsa yenisi eklenmez."""
+        if kind in self._net_pending or self._stopping.is_set():
+            return False
+        self._net_pending.add(kind)
+        if kind != "drain":
+            self._set_busy(True)
+
+        def run():
+            err = None
+            try:
+                fn(*args)
+            except Exception as e:
+                err = e
+            # ağ thread'inden emit: Qt GUI tarafına kuyruklu teslim eder
+            self._netDone.emit(kind, err)
+
+        self._net.submit(run)
+        return True
+
+    def _on_net_done(self, kind: str, err):
+        self._net_pending.discard(kind)
+        if kind != "drain" and not self._net_pending - {"drain"}:
             self._set_busy(False)
+        if err is not None:
+            print(f"{kind} error:", err)
+            if kind == "refresh":
+                self._emit_all_from_local()
+
+    def _refresh(self):
+        self.drain_queue()
+        self._pull()
+
+    # ---------- pull (server -> local), ağ thread'inde ----------
+    def _pull(self, full: bool = False):
+        now = time.time()
+        plans = {}
+        for table in PULL_TABLES:
+            state = self._actor.call("get_sync_state", table)
+            wm, full_at = state["watermark"], state["full_at"]
+            is_full = full or wm is None or full_at is None or now - full_at >= FULL_RECONCILE_SECS
+            plans[table] = (is_full, None if is_full else to_iso(wm - PULL_OVERLAP_SECS) + "Z")
+        pages = {t: queue.Queue(PULL_PREFETCH_PAGES) for t in PULL_TABLES}
+        cancel = {t: threading.Event() for t in PULL_TABLES}
+        with ThreadPoolExecutor(PULL_WORKERS, thread_name_prefix="pull") as pool:
+            for table, (is_full, since) in plans.items():
+                pool.submit(_fetch_pages, table, _PAGES_API[table](since), not is_full,
+                            pages[table], cancel[table])
+            try:
+                for table in PULL_TABLES:
+                    if self._stopping.is_set():
+                        break
+                    try:
+                        self._apply_pull(table, plans[table][0], pages[table], now)
+                    except Exception as e:
+                        print(f"pull error ({table}):", e)
+                    finally:
+                        cancel[table].set()
+            finally:
+                for ev in cancel.values():
+                    ev.set()
+
+    def _apply_pull(self, table: str, full: bool, pages: queue.Queue, now: float):
+        # Sayfalar geldikçe yazıcıda birleşir (UI commit sinyaliyle güncellenir); bir sonraki sayfa
+        # yazılmadan önce öncekinin commit'i beklenir. Watermark yalnızca son sayfadan sonra
+        # (finish_pull) ilerler: sayfalar id sırasıyla gelir, updated_at sırasıyla değil.
+        seen: set[int] = set()
+        mark: Optional[int] = None
+        prev = None
+        while True:
+            item = pages.get()
+            if isinstance(item, Exception):
+                raise item
+            if isinstance(item, _PullEnd):
+                break
+            if self._stopping.is_set():
+                return
+            for r in item:
+                if full:
+                    seen.add(int(r["id"]))
+                e = to_epoch(r.get("updated_at"))
+                if e is not None and (mark is None or e > mark):
+                    mark = e
+            if prev is not None:
+                prev.result()
+            prev = self._actor.submit("merge_rows", table, item)
+        if prev is not None:
+            prev.result()
+        server_ids = seen if full else None
+        if not full:
+            # Sunucuda fiziksel silinen satırlar delta'da gelmez: sayılar tutmuyorsa id listesiyle buda
+            local = self._actor.call("comparable_row_count", table)
+            if local is not None and local != item.server_count:
+                server_ids = api.fetch_ids(table)
+        self._actor.submit("finish_pull", table, mark, server_ids, full, now)
+
+    # ---------- push (sync_queue -> server) ----------
+    def drain_queue(self, max_batches: Optional[int] = None,
+                    batch_size: int = SYNC_BATCH_SIZE) -> tuple[int, int]:
+        """
+        Kuyruğu batch batch gönderir. Batch (tablo, işlem) gruplarına ayrılır ve her grup
+        toplu API çağrısıyla (supabase_api.upsert_*s / delete_*s) gider; yalnızca başarılı
+        kayıtlar ack edilir, satır hatası alanlar geri çekilmeyle yeniden planlanır.
+        Ağ yoksa batch'in gönderilmemiş kalanı bırakılır. (gönderilen, başarısız) döndürür.
+        HTTP ve yazıcıyı bekler: ağ thread'inde çalışır (refresh, arka plan tick'i).
+        """
+        pushed = failed = batches = 0
+        while (max_batches is None or batches < max_batches) and not self._stopping.is_set():
+            items = self._actor.call("claim_batch", batch_size)
+            if not items:
+                break
+            batches += 1
+            groups: dict[tuple[str, str], list] = {}
+            for it in items:
+                op = "delete" if it.get("op") == "delete" else "upsert"
+                groups.setdefault((it.get("table"), op), []).append(it)
+            ordered = [k for k in PUSH_ORDER if k in groups] + [k for k in groups if k not in PUSH_ORDER]
+            done = []
+            for n, key in enumerate(ordered):
+                group = groups[key]
+                try:
+                    errors = self._push_group(key[0], key[1], group)
+                except Exception as e:
+                    if api.is_offline_error(e):
+                        self._actor.submit("release", [it["id"] for k in ordered[n:] for it in groups[k]])
+                        self._actor.submit("ack", done)
+                        return pushed + len(done), failed
+                    errors = {it["id"]: str(e) for it in group}
+                for it in group:
+                    err = errors.get(it["id"])
+                    if err is None:
+                        done.append(it["id"])
+                    else:
+                        failed += 1
+                        self._actor.submit("nack", [it["id"]], err)
+            self._actor.submit("ack", done)
+            pushed += len(done)
+        return pushed, failed
+
+    def _push_group(self, table: str, op: str, group: list) -> dict[int, str]:
+        """Tek (tablo, işlem) grubunu toplu gönderir; {kuyruk_id: hata} döner."""
+        if table not in _BATCH_API:
+            return {}  # bilinmeyen tablo: eskisi gibi sessizce düşer
+        upsert, delete = _BATCH_API[table]
+        if op == "delete":
+            sent = [it for it in group if (it.get("payload") or {}).get("id")]  # id'siz silme gönderilemez
+            errors = delete([int(it["payload"]["id"]) for it in sent])
+        else:
+            sent = group
+            errors = upsert([it.get("payload") or {} for it in sent])
+        return {sent[i]["id"]: msg for i, msg in errors.items()}
+
+    def start_background_sync(self, rows_per_sec: float = 10.0,
+                              interval_ms: int = SYNC_DRAIN_INTERVAL_MS):
+        """Kuyruğu arka planda ~rows_per_sec hızla boşaltır (her tick'te ağ thread'inde tek batch)."""
+        self._drain_batch = max(1, int(rows_per_sec * interval_ms / 1000))
+        if self._drain_timer is None:
+            self._drain_timer = QtCore.QTimer(self)
+            self._drain_timer.timeout.connect(self._on_drain_tick)
+        self._drain_timer.start(int(interval_ms))
+
+    def stop_background_sync(self):
+        if self._drain_timer is not None:
+            self._drain_timer.stop()
+
+    def start_maintenance(self, window: Optional[QtCore.QObject] = None):
+        """
+        Boşta çalışan DB bakımını (tombstone temizliği, arşiv, optimize, vacuum) başlatır.
+        window: boşta olma ölçüsü için kullanıcı girdisi izlenen ana pencere.
+        """
+        if self._maintenance is None:
+            self._maintenance = MaintenanceScheduler(self._actor, is_busy=lambda: self._busy, parent=self)
+        self._maintenance.start(window=window)
+
+    def _on_drain_tick(self):
+        # Gönderim ağ thread'inde: timeout/yeniden deneme GUI'yi dondurmaz. Önceki tick'in işi
+        # bitmeden yenisi eklenmez.
+        if self._busy:
+            return
+        self._start_net_job("drain", self.drain_queue, 1, self._drain_batch)
 
     # ---------- TAGS ----------
     def add_tag(self, name: str):
-        self.db.add_tag_local(name)
-        self.tagsUpdated.emit(self.db.get_tags())
+        self._actor.submit("add_tag_local", name)
 
     def delete_tag(self, tag_id: int):
-        self.db.delete_tag_local(int(tag_id))
-        self.tagsUpdated.emit(self.db.get_tags())
+        self._actor.submit("delete_tag_local", int(tag_id))
+
+    def set_tag_filter(self, tag_ids):
+        """Kanban ve takvimi seçili etiketlere süzer (SQL'de); None/boş = filtre yok."""
+        tags = frozenset(int(t) for t in tag_ids or () if t is not None) or None
+        if tags == self._tag_filter:
+            return
+        self._tag_filter = tags
+        self.tasksUpdated.emit(self._get_tasks())
+        self._emit_events()
+
+    def set_task_tag(self, task_id: int, tag_id: Optional[int]):
+        self._actor.submit("set_task_tag", int(task_id), tag_id)
 
     # ---------- TASKS ----------
     def upsert_task(self, task_id: Optional[int], title: str, notes: str,
                     due_date_iso: Optional[str], has_time: bool=False) -> int:
-        tid = self.db.upsert_task(task_id, title, notes, due_date_iso, has_time=has_time)
-        self.tasksUpdated.emit(self.db.get_tasks())
-        return tid
+        # Yeni görevin id'si burada üretilir (services.ids): yazıcıyı beklemeye gerek yok
+        new_id = ids.new_id() if task_id is None else None
+        self._actor.submit("upsert_task", task_id, title, notes, due_date_iso, has_time=has_time, new_id=new_id)
+        return int(task_id) if task_id is not None else new_id
 
     def delete_task(self, task_id: int):
-        self.db.delete_task(task_id)
-        self.tasksUpdated.emit(self.db.get_tasks())
+        self._actor.submit("delete_task", task_id)
 
     def set_task_status(self, task_id: int, status: str):
         # 🔒 Sadece status güncellenir — title asla değişmez
-        self.db.set_task_status(task_id, status)
-        self.tasksUpdated.emit(self.db.get_tasks())
+        self._actor.submit("set_task_status", task_id, status)
+
+    # ---------- Hiyerarşi ----------
+    def set_task_parent(self, task_id: int, parent_id: Optional[int]):
+        """Döngü oluşturan taşıma ValueError verir (yazımı bekler)."""
+        self._actor.call("set_task_parent", int(task_id), parent_id)
+
+    def set_subtree_status(self, task_id: int, status: str):
+        self._actor.submit("set_subtree_status", int(task_id), status)
+
+    def get_subtree(self, task_id: int, include_self: bool = True) -> list:
+        return self.db.get_subtree(int(task_id), include_self)
+
+    def get_task_hierarchy(self) -> dict:
+        return self.db.get_task_hierarchy()
 
     # ---------- EVENTS ----------
     def create_event(self, task_id: int, start_iso: str, end_iso: str,
                      title: Optional[str]=None, notes: Optional[str]=None, rrule: Optional[str]=None) -> int:
-        eid = self.db.create_event(task_id, start_iso, end_iso, title=title, notes=notes, rrule=rrule)
-        self.db.mark_task_has_time(task_id, True)
-        self._emit_all_from_local()
+        eid = ids.new_id()
+        self._actor.submit(_cmd_create_event, eid, task_id, start_iso, end_iso, title, notes, rrule)
         return eid
 
     def update_event(self, event_id: int, start_iso: str, end_iso: str,
                      title: Optional[str]=None, notes: Optional[str]=None, rrule: Optional[str]=None):
-        self.db.update_event(event_id, start_iso, end_iso, title=title, notes=notes, rrule=rrule)
-        self.eventsUpdated.emit(self.db.get_events())
+        self._actor.submit("update_event", event_id, start_iso, end_iso, title=title, notes=notes, rrule=rrule)
+
+    def move_event(self, event_id: int, start_iso: str, end_iso: str):
+        self._actor.submit("move_event", event_id, start_iso, end_iso)
 
     def delete_event(self, event_id: int):
-        ev = self.db.get_event_by_id(event_id)
-        if ev and ev.get("task_id"):
-            self.db.mark_task_has_time(int(ev["task_id"]), False)
-        self.db.delete_event(event_id)
-        self._emit_all_from_local()
+        self._actor.submit(_cmd_delete_event, event_id)
+
+    def set_event_window(self, start_iso: str, end_iso: str):
+        """
+        Görünür takvim aralığını bildirir. Yüklü aralık (pencere ± EVENT_PREFETCH_DAYS)
+        yeni pencereyi zaten kapsıyorsa DB'ye gidilmez.
+        """
+        self._event_window = (start_iso, end_iso)
+        loaded = self._event_loaded
+        if loaded and loaded[0] <= start_iso and end_iso <= loaded[1]:
+            return
+        self._emit_events()
 
     # ---------- Pomodoro sessions ----------
     def add_pomodoro_session(
@@ -112,9 +406,10 @@ class SyncOrchestrator(QtCore.QObject):
     ):
         if not task_id:
             return
-        now = datetime.utcnow()
+        now = parse_ts(utc_now_iso())
         started = now - timedelta(seconds=int(actual_secs))
-        self.db.insert_pomodoro_session(
+        fut = self._actor.submit(
+            "insert_pomodoro_session",
             task_id=int(task_id),
             started_at_iso=started.isoformat(timespec="seconds"),
             ended_at_iso=now.isoformat(timespec="seconds"),
@@ -122,16 +417,95 @@ class SyncOrchestrator(QtCore.QObject):
             actual_secs=int(actual_secs),
             note=note or "",
         )
+        # yazıcı thread'den emit: Qt GUI tarafına kuyruklu teslim eder
+        fut.add_done_callback(lambda f: f.exception() is None and self.pomodoroUpdated.emit(int(task_id)))
 
     def get_pomodoro_sessions(self, task_id: int) -> list[dict]:
         return self.db.list_pomodoro_sessions_for_task(int(task_id))
 
+    def get_pomodoro_rollup(self, by: str = "task", start_day: Optional[str] = None,
+                            end_day: Optional[str] = None, task_id: Optional[int] = None,
+                            under: Optional[int] = None) -> list[dict]:
+        return self.db.pomodoro_rollup(by, start_day=start_day, end_day=end_day, task_id=task_id, under=under)
+
+    # ---------- Search ----------
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """Yerel tam metin arama (görev/event/pomodoro notu); ağ kullanmaz."""
+        return self.db.search(query, limit)
+
+    # ---------- id ile okuma (bellek içi önbellek) ----------
+    def get_task(self, task_id: int):
+        return self.db.get_task_by_id(int(task_id))
+
+    def get_tasks_by_ids(self, ids) -> dict:
+        return self.db.get_tasks_by_ids(ids)
+
+    def get_event(self, event_id: int):
+        return self.db.get_event_by_id(int(event_id))
+
+    # ---------- Change tracking ----------
+    def changes_since(self, table: str, version: int) -> dict:
+        """Artımlı yenileme için: {"version", "upserted", "deleted"} (LocalDB.changes_since)."""
+        return self.db.changes_since(table, version)
+
     # ---------- helpers ----------
+    def _on_committed(self, name: str, result):
+        # Art arda gelen commit'ler tek yenilemede birleşir
+        if not self._emit_scheduled:
+            self._emit_scheduled = True
+            QtCore.QTimer.singleShot(0, self._flush_emit)
+
+    def _flush_emit(self):
+        self._emit_scheduled = False
+        self._emit_changed()
+
+    def shutdown(self):
+        """Zamanlayıcıları durdurur, kuyruktaki yazımları diske yazıp yazıcıyı kapatır."""
+        self.stop_background_sync()
+        if self._maintenance is not None:
+            self._maintenance.stop()
+        # süren ağ işi bir sonraki adımda durur; beklenmez (HTTP timeout'u kapanışı uzatmasın)
+        self._stopping.set()
+        self._net.shutdown(wait=False, cancel_futures=True)
+        self._actor.close()
+        api.close()
+
+    def _emit_changed(self):
+        """Yalnızca değişiklik sayacı (LocalDB.table_versions) ilerlemiş tabloları emit eder."""
+        self.db.sync_caches()
+        versions = self.db.table_versions()
+        for table, emit in (
+            ("tags", lambda: self.tagsUpdated.emit(self.db.get_tags())),
+            ("tasks", lambda: self.tasksUpdated.emit(self._get_tasks())),
+            ("events", self._emit_events),
+        ):
+            v = versions.get(table, 0)
+            if self._emitted_versions.get(table) != v:
+                self._emitted_versions[table] = v
+                emit()
+
     def _emit_all_from_local(self):
-        self.tasksUpdated.emit(self.db.get_tasks())
-        self.eventsUpdated.emit(self.db.get_events())
+        self.tasksUpdated.emit(self._get_tasks())
+        self._emit_events()
         self.tagsUpdated.emit(self.db.get_tags())
 
+    def _get_tasks(self) -> list:
+        return self.db.get_tasks(tag_ids=self._tag_filter)
+
+    def _emit_events(self):
+        if self._event_window is None:
+            if self._tag_filter is None:
+                self.eventsUpdated.emit(self.db.get_events())
+            else:  # pencere yokken de filtre aynı sorgudan geçer
+                self.eventsUpdated.emit(self.db.get_events_in_range(0, 2**62, tag_ids=self._tag_filter))
+            return
+        margin = timedelta(days=EVENT_PREFETCH_DAYS)
+        start = (datetime.fromisoformat(self._event_window[0]) - margin).isoformat()
+        end   = (datetime.fromisoformat(self._event_window[1]) + margin).isoformat()
+        self._event_loaded = (start, end)
+        self.eventsUpdated.emit(self.db.get_events_in_range(
+            start, end, expand_recurring=True, tag_ids=self._tag_filter))
+
     def _set_busy(self, b: bool):
         if self._busy != b:
             self._busy = b
@@ -0,0 +1,25 @@
+# tests/conftest.py
+# Testler depo kökünden (python -m pytest) çalışır; paketler namespace olduğu için kök sys.path'e eklenir.
+# Qt testleri ekransız (offscreen) çalışır.
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+@pytest.fixture
+def db(tmp_path):
+    from services.local_db import LocalDB
+    d = LocalDB(str(tmp_path / "test.db"), durability="fast")
+    yield d
+    d.close()
+
+@pytest.fixture(scope="session")
+def qapp():
+    """Tüm Qt testlerinin paylaştığı tek QApplication (QCoreApplication testleri de bunu kullanır)."""
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
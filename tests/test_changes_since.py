@@ -0,0 +1,25 @@
+# tests/test_changes_since.py
+# change_counters / row_version / deleted_rows ile "şu sürümden beri ne değişti".
+
+def test_changes_since_reports_upserts_and_deletes(db):
+    v0 = db.changes_since("tasks", 0)["version"]
+    a = db.upsert_task(None, "a", "", None)
+    b = db.upsert_task(None, "b", "", None)
+    ch = db.changes_since("tasks", v0)
+    assert sorted(ch["upserted"]) == sorted([a, b]) and ch["deleted"] == []
+    assert ch["version"] > v0
+
+    db.delete_task(a)
+    ch2 = db.changes_since("tasks", ch["version"])
+    assert ch2["upserted"] == [] and ch2["deleted"] == [a]
+    assert db.changes_since("tasks", ch2["version"]) == {
+        "version": ch2["version"], "upserted": [], "deleted": [], "reset": False,
+    }
+
+def test_rekeyed_row_reports_old_id_as_deleted(db):
+    tag = db.add_tag_local("work")
+    v0 = db.changes_since("tags", 0)["version"]
+    db.merge_rows("tags", [{"id": 50, "name": "work"}])  # yerel etiket sunucu id'sine taşınır
+    ch = db.changes_since("tags", v0)
+    assert ch["upserted"] == [50]
+    assert ch["deleted"] == [tag]
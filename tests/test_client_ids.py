@@ -0,0 +1,68 @@
+# tests/test_client_ids.py
+# Eski (baseline) biçimli bir DB açılınca sunucuya gitmemiş yerel satırlar istemci id'si alır.
+import json
+import sqlite3
+
+from services import ids
+from services.local_db import LocalDB
+
+BASELINE_SCHEMA = """
+CREATE TABLE tasks(
+    id INTEGER PRIMARY KEY, title TEXT NOT NULL, notes TEXT DEFAULT '', status TEXT DEFAULT 'todo',
+    due_date TEXT, has_time INTEGER DEFAULT 0, deleted INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT (datetime('now')), updated_at TEXT DEFAULT (datetime('now')));
+CREATE TABLE events(
+    id INTEGER PRIMARY KEY, task_id INTEGER, title TEXT, notes TEXT DEFAULT '',
+    start_ts TEXT NOT NULL, end_ts TEXT NOT NULL, rrule TEXT, deleted INTEGER DEFAULT 0,
+    updated_at TEXT DEFAULT (datetime('now')));
+CREATE TABLE tags(id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE sync_queue(
+    id INTEGER PRIMARY KEY, table_name TEXT NOT NULL, op TEXT NOT NULL, payload TEXT NOT NULL,
+    created_at TEXT DEFAULT (datetime('now')));
+CREATE TABLE pomodoro_sessions(
+    id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER NOT NULL, started_at TEXT NOT NULL,
+    ended_at TEXT NOT NULL, planned_secs INTEGER NOT NULL, actual_secs INTEGER NOT NULL,
+    note TEXT DEFAULT '', created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE);
+"""
+
+def _baseline_db(path):
+    c = sqlite3.connect(path)
+    c.executescript(BASELINE_SCHEMA)
+    # sunucudan gelmiş görev (eski created_at) ve yerelde düzenlenmiş hali kuyrukta
+    c.execute("INSERT INTO tasks(id, title, created_at, updated_at) VALUES (1, 'sunucu', '2024-01-01T09:00:00', datetime('now'))")
+    # yerelde oluşturulmuş, henüz gönderilmemiş görev ve event'i (baseline bunları op='upsert' ile kuyruğa alırdı)
+    c.execute("INSERT INTO tasks(id, title, created_at, updated_at) VALUES (2, 'yerel', strftime('%Y-%m-%dT%H:%M:%f', 'now'), datetime('now'))")
+    c.execute("INSERT INTO events(id, task_id, title, start_ts, end_ts) VALUES (3, 2, 'yerel', '2025-01-06T10:00:00', '2025-01-06T11:00:00')")
+    q = [
+        ("tasks", {"id": 1, "title": "sunucu", "notes": "", "due_date": None, "has_time": False}),
+        ("tasks", {"id": 2, "title": "yerel", "notes": "", "due_date": None, "has_time": False}),
+        ("tasks", {"id": 2, "status": "done"}),
+        ("events", {"id": 3, "task_id": 2, "title": "yerel", "notes": "",
+                    "start_ts": "2025-01-06T10:00:00", "end_ts": "2025-01-06T11:00:00", "rrule": None}),
+    ]
+    c.executemany("INSERT INTO sync_queue(table_name, op, payload) VALUES (?, 'upsert', ?)",
+                  [(t, json.dumps(p)) for t, p in q])
+    c.commit()
+    c.close()
+
+def test_baseline_pending_creates_are_rekeyed(tmp_path):
+    path = str(tmp_path / "baseline.db")
+    _baseline_db(path)
+    db = LocalDB(path, durability="fast")
+
+    new_task = db.resolve_id("tasks", 2)
+    new_event = db.resolve_id("events", 3)
+    assert ids.is_client_id(new_task) and ids.is_client_id(new_event)
+    assert db.resolve_id("tasks", 1) == 1  # sunucudaki görev aynen kalır
+    assert db.get_task_by_id(new_task)["title"] == "yerel"
+    assert db.get_event_by_id(new_event)["task_id"] == new_task
+    # eski id'ler CDC tüketicilerine silinmiş olarak görünür
+    assert db.changes_since("tasks", 0)["deleted"] == [2]
+    assert db.changes_since("events", 0)["deleted"] == [3]
+
+    queued = {(it["table"], it["payload"]["id"]): it for it in db.dequeue_all()}
+    assert set(queued) == {("tasks", 1), ("tasks", new_task), ("events", new_event)}
+    assert queued[("tasks", new_task)]["op"] == "insert"
+    assert queued[("tasks", 1)]["op"] == "upsert"
+    assert queued[("events", new_event)]["payload"]["task_id"] == new_task
@@ -0,0 +1,51 @@
+# tests/test_db_actor.py
+# Tek yazıcı thread: komutlar sırayla yazıcıda çalışır, okuyucu bağlantı commit'leri görür;
+# bakım işleri (run_due) yazıcıda sırayla ve aralıklarına göre çalışır.
+import sqlite3
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+from services.db_actor import DBActor
+from services.maintenance import MAINTENANCE_TASKS, run_due
+
+@pytest.fixture
+def actor(tmp_path):
+    a = DBActor(str(tmp_path / "actor.db"), durability="fast")
+    yield a
+    a.close(timeout=5)
+
+def test_commands_run_in_order_on_the_writer_thread(actor):
+    threads = []
+
+    def add(db, i):
+        threads.append(threading.current_thread().name)
+        return db.upsert_task(None, f"t{i}", "", None)
+
+    futs = [actor.submit(add, i) for i in range(5)]
+    ids = [f.result(5) for f in futs]
+    assert set(threads) == {"LocalDB-writer"}
+
+    reader = actor.open_reader()
+    try:
+        assert [t.id for t in sorted(reader.get_tasks(), key=lambda t: t.title)] == ids
+        with pytest.raises(sqlite3.OperationalError):
+            reader.upsert_task(None, "x", "", None)  # okuyucu salt okunur
+    finally:
+        reader.close()
+
+def test_failed_command_does_not_stop_the_writer(actor):
+    with pytest.raises(ZeroDivisionError):
+        actor.call(lambda db: 1 / 0, timeout=5)
+    assert actor.call("upsert_task", None, "sonra", "", None, timeout=5)
+
+def test_run_due_runs_one_task_per_call_in_order(actor):
+    now = 1_000_000_000.0
+    ran = [actor.call(run_due, now, timeout=30)[0] for _ in MAINTENANCE_TASKS]
+    assert ran == [task for task, _ in MAINTENANCE_TASKS]
+    assert actor.call(run_due, now, timeout=5) is None  # hepsi yeni çalıştı
+
+    # bir saat sonra yalnızca saatlik iş vadesinde
+    assert actor.call(run_due, now + 3600, timeout=5)[0] == "optimize"
+    assert actor.call(run_due, now + 3600, timeout=5) is None
@@ -0,0 +1,23 @@
+# tests/test_event_range.py
+# get_events_in_range: [start, end) ile kesişen event'ler, bitiş sırasına göre, indeksle.
+
+def _event(db, task, start, end, title):
+    return db.create_event(task, start, end, title=title)
+
+def test_range_returns_only_overlapping_events(db):
+    task = db.upsert_task(None, "rapor", "", None)
+    before = _event(db, task, "2025-01-05T09:00:00", "2025-01-05T10:00:00", "önce")
+    spans = _event(db, task, "2025-01-05T23:00:00", "2025-01-06T01:00:00", "sınır")
+    inside = _event(db, task, "2025-01-08T09:00:00", "2025-01-08T10:00:00", "içeride")
+    _event(db, task, "2025-01-13T00:00:00", "2025-01-13T01:00:00", "sonra")  # end hariç
+    gone = _event(db, task, "2025-01-07T09:00:00", "2025-01-07T10:00:00", "silinen")
+    db.delete_event(gone)
+
+    rs = db.get_events_in_range("2025-01-06T00:00:00", "2025-01-13T00:00:00")
+    assert [e["id"] for e in rs] == [spans, inside]
+    assert before not in [e["id"] for e in db.get_events_in_range("2025-01-06T00:00:00", "2025-01-07T00:00:00")]
+
+def test_range_query_uses_the_end_index(db):
+    from services.local_db import SQL_GET_EVENTS_IN_RANGE
+    plan = " ".join(db.explain_query_plan(SQL_GET_EVENTS_IN_RANGE, (0, 0)))
+    assert "idx_events_deleted_end" in plan and "TEMP B-TREE" not in plan
@@ -0,0 +1,67 @@
+# tests/test_local_db_merge.py
+# Sunucu çekimlerinin (merge_rows / finish_pull) yerel tabloya birleştirilmesi.
+import pytest
+
+from services import local_db
+
+def _push_all(db):
+    """Kuyruğu sunucuya gitmiş gibi boşaltır."""
+    db.ack([it["id"] for it in db.claim_batch(1000)])
+
+def test_local_tag_adopts_server_id(db):
+    tag = db.add_tag_local("work")
+    task = db.upsert_task(None, "rapor", "", None)
+    db.set_task_tag(task, tag)
+    _push_all(db)
+
+    server_id = tag + 100  # sunucu etikete kendi id'sini verdi
+    db.merge_rows("tags", [{"id": server_id, "name": "work"}])
+    db.finish_pull("tags", None, {server_id}, full=True)
+
+    assert [(g["id"], g["name"]) for g in db.get_tags()] == [(server_id, "work")]
+    assert db.get_task_by_id(task)["tag_id"] == server_id
+    assert [t["id"] for t in db.get_tasks(tag_ids=[server_id])] == [task]
+    assert db.resolve_id("tags", tag) == server_id
+
+def test_tag_rekey_moves_local_tag_off_the_target_id(db):
+    work = db.add_tag_local("work")
+    home = db.add_tag_local("home")
+    _push_all(db)
+    # sunucuda "work" yerel "home"un id'sini almış; "home" sunucuda yok
+    db.replace_all("tags", [{"id": home, "name": "work"}])
+    assert {g["name"]: g["id"] for g in db.get_tags()} == {"work": home}
+    assert db.resolve_id("tags", work) == home
+
+def test_pending_local_tag_is_rekeyed_with_its_queue_entry(db):
+    tag = db.add_tag_local("work")
+    db.merge_rows("tags", [{"id": 50, "name": "work"}])
+    assert [g["id"] for g in db.get_tags()] == [50]
+    assert db.resolve_id("tags", tag) == 50
+    (item,) = db.dequeue_all()
+    assert item["payload"] == {"name": "work", "id": 50}
+
+def _server_task(i, title, ts="2025-01-01T00:00:00"):
+    return {"id": i, "title": title, "notes": "", "status": "todo", "updated_at": ts}
+
+def _found(db, text):
+    return sorted(r["id"] for r in db.search(text, 100) if r["kind"] == "task")
+
+def test_bulk_merge_keeps_fts_in_sync(db, monkeypatch):
+    if not db._fts_enabled():
+        pytest.skip("FTS5 yok")
+    monkeypatch.setattr(local_db, "FTS_BULK_MIN", 2)
+    rows = [_server_task(i, f"alpha {i}") for i in range(1, 11)]
+    db.replace_all("tasks", rows)  # boş tablo: rebuild yolu
+    assert _found(db, "alpha") == list(range(1, 11))
+
+    # az satır değişir: fark yolu (eski kayıt silinir, yenisi eklenir)
+    rows[0] = _server_task(1, "beta", "2025-02-01T00:00:00")
+    rows[1] = _server_task(2, "beta", "2025-02-01T00:00:00")
+    db.replace_all("tasks", rows[:9])
+    assert _found(db, "alpha") == list(range(3, 10))
+    assert _found(db, "beta") == [1, 2]
+
+    # trigger'lar geri kurulmuş olmalı
+    db.merge_rows("tasks", [_server_task(3, "gamma", "2025-03-01T00:00:00")])
+    assert _found(db, "gamma") == [3]
+    assert _found(db, "alpha") == list(range(4, 10))
@@ -0,0 +1,56 @@
+# tests/test_maintenance.py
+# Boşta bakım: girdi yalnızca ana pencerede izlenir; tombstone temizliği deleted_rows'u da budar.
+
+def _deleted_rows(db):
+    return db._conn.execute("SELECT COUNT(*) FROM deleted_rows").fetchone()[0]
+
+def _purge_deleted_task(db, title):
+    tid = db.upsert_task(None, title, "", None)
+    db.ack([it["id"] for it in db.claim_batch(1000)])
+    db.delete_task(tid)
+    db.ack([it["id"] for it in db.claim_batch(1000)])
+    db.purge_tombstones(grace_days=-1)
+    return tid
+
+def test_purge_tombstones_prunes_deleted_rows_after_one_interval(db):
+    _purge_deleted_task(db, "a")
+    assert _deleted_rows(db) == 1  # ilk temizlik: henüz kayıt önceki aralıktan değil
+    seen = db.table_version("tasks")
+    _purge_deleted_task(db, "b")
+    out = db.purge_tombstones(grace_days=-1)
+    assert out["deleted_rows"] == 1 and _deleted_rows(db) == 0
+
+    # budanan aralıktan eski bir sürümle soran okuyucu tümden yenilemeli
+    assert db.changes_since("tasks", seen - 1)["reset"] is True
+    ch = db.changes_since("tasks", db.table_version("tasks"))
+    assert ch["reset"] is False and ch["deleted"] == []
+
+def test_sync_caches_clears_on_reset(db):
+    tid = db.upsert_task(None, "kalıcı", "", None)
+    _purge_deleted_task(db, "a")
+    _purge_deleted_task(db, "b")
+    db._cache_versions["tasks"] = 1  # budanan aralıktan önce senkronlanmış okuyucu
+    db.get_task_by_id(tid)
+    db._row_cache["tasks"].put(999, object())  # CDC'de izi kalmamış (budanmış) bir satır
+    assert db._row_cache["tasks"].stats()["size"] == 2
+    db.sync_caches()
+    assert db._row_cache["tasks"].stats()["size"] == 0
+    assert db._cache_versions["tasks"] == db.table_version("tasks")
+
+def test_idle_tracking_watches_only_the_main_window(qapp):
+    from PyQt6 import QtCore, QtTest, QtWidgets
+    from services.maintenance import MaintenanceScheduler
+    win, other = QtWidgets.QWidget(), QtWidgets.QWidget()
+    sched = MaintenanceScheduler(actor=None)
+    sched.start(window=win)
+    win.show(); other.show()
+    assert sched._watched is win.windowHandle()
+
+    sched._last_input = 0.0
+    QtTest.QTest.mouseClick(other.windowHandle(), QtCore.Qt.MouseButton.LeftButton)
+    assert sched._last_input == 0.0
+    QtTest.QTest.mouseClick(win.windowHandle(), QtCore.Qt.MouseButton.LeftButton)
+    assert sched._last_input > 0.0
+    sched.stop()
+    assert sched._watched is None
+    win.close(); other.close()
@@ -0,0 +1,49 @@
+# tests/test_migrations.py
+import sqlite3
+
+import pytest
+
+from services import local_db
+from services.local_db import LocalDB, MIGRATIONS, SCHEMA_VERSION
+
+def _columns(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    finally:
+        conn.close()
+
+def _version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT version FROM schema_version").fetchone()[0]
+    finally:
+        conn.close()
+
+def test_failed_step_is_rolled_back_and_db_reopens(tmp_path, monkeypatch):
+    path = str(tmp_path / "m.db")
+    LocalDB(path, durability="fast").close()
+
+    def broken(c):
+        c.execute("ALTER TABLE sync_queue ADD COLUMN probe INTEGER")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(local_db, "MIGRATIONS", MIGRATIONS + [(SCHEMA_VERSION + 1, broken)])
+    with pytest.raises(RuntimeError):
+        LocalDB(path, durability="fast")
+
+    # ALTER geri alındı; sürüm yerinde
+    assert "probe" not in _columns(path, "sync_queue")
+    assert _version(path) == SCHEMA_VERSION
+
+    # düzeltilmiş adım aynı ALTER'ı tekrar çalıştırabilir ("duplicate column" yok)
+    def fixed(c):
+        c.execute("ALTER TABLE sync_queue ADD COLUMN probe INTEGER")
+
+    monkeypatch.setattr(local_db, "MIGRATIONS", MIGRATIONS + [(SCHEMA_VERSION + 1, fixed)])
+    LocalDB(path, durability="fast").close()
+    assert "probe" in _columns(path, "sync_queue")
+    assert _version(path) == SCHEMA_VERSION + 1
+
+def test_hot_queries_use_indexes(db):
+    assert db.check_query_plans() == []
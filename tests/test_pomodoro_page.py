@@ -0,0 +1,30 @@
+# tests/test_pomodoro_page.py
+# Pomodoro görev listesi ve günlük toplamlar: gün, PerformancePage'in sorduğu yerel tarihtir.
+import time
+
+import pytest
+
+@pytest.fixture
+def utc_plus_3(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("tzset yok")
+    monkeypatch.setenv("TZ", "Etc/GMT-3")  # POSIX işareti ters: UTC+3
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_daily_rollup_uses_the_local_day(utc_plus_3, db):
+    task = db.upsert_task(None, "rapor", "", None)
+    # UTC'de 1 Ocak 22:30, yerelde 2 Ocak 01:30
+    db.insert_pomodoro_session(task, "2025-01-01T22:05:00+00:00", "2025-01-01T22:30:00+00:00", 1500, 1500, "")
+    days = db.pomodoro_rollup("day", start_day="2025-01-02", end_day="2025-01-03")
+    assert [(d["day"], d["actual_secs"]) for d in days] == [("2025-01-02", 1500)]
+
+def test_normalize_keeps_id_title_pairs(qapp):
+    from pages.pomodoro_page import PomodoroPage
+    page = PomodoroPage()
+    out = page._normalize_tasks([(7, "rapor"), {"id": 8, "title": "x", "status": "todo"},
+                                 {"id": 9, "title": "y", "status": "In Progress"}])
+    assert [(t["id"], t["title"]) for t in out] == [(7, "rapor"), (9, "y")]
+    page.deleteLater()
@@ -0,0 +1,36 @@
+# tests/test_pomodoro_rollup.py
+# pomodoro_daily: oturum eklenince güncellenen günlük toplamlar; gruplar bunun üzerinden hesaplanır.
+
+def _session(db, task, day, planned, actual):
+    db.insert_pomodoro_session(task, f"{day}T11:00:00+00:00", f"{day}T12:00:00+00:00", planned, actual, "")
+
+def test_rollups_by_task_day_week_and_tag(db):
+    tag = db.add_tag_local("work")
+    a = db.upsert_task(None, "a", "", None)
+    b = db.upsert_task(None, "b", "", None)
+    db.set_task_tag(a, tag)
+    _session(db, a, "2025-01-06", 1500, 1500)   # pazartesi
+    _session(db, a, "2025-01-06", 1500, 750)
+    _session(db, b, "2025-01-12", 1500, 1500)   # pazar, aynı hafta
+    _session(db, b, "2025-01-13", 1500, 300)    # sonraki hafta
+
+    by_task = {r["task_id"]: r for r in db.pomodoro_rollup("task")}
+    assert (by_task[a]["sessions"], by_task[a]["actual_secs"], by_task[a]["ratio"]) == (2, 2250, 0.75)
+    assert by_task[b]["planned_secs"] == 3000
+
+    days = db.pomodoro_rollup("day", start_day="2025-01-06", end_day="2025-01-13")
+    assert [(r["day"], r["actual_secs"]) for r in days] == [("2025-01-06", 2250), ("2025-01-12", 1500)]
+
+    weeks = db.pomodoro_rollup("week")
+    assert [(r["week"], r["sessions"]) for r in weeks] == [("2025-01-06", 3), ("2025-01-13", 1)]
+
+    tags = {r["tag"]: r["actual_secs"] for r in db.pomodoro_rollup("tag")}
+    assert tags == {"work": 2250, None: 1800}
+
+def test_rollup_survives_archiving(db):
+    task = db.upsert_task(None, "a", "", None)
+    _session(db, task, "2020-01-01", 1500, 1500)
+    assert db.archive_pomodoro_sessions(older_than_days=30) == 1
+    assert db.list_pomodoro_sessions_for_task(task) == []
+    (row,) = db.pomodoro_rollup("task", task_id=task)
+    assert row["actual_secs"] == 1500
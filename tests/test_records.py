@@ -0,0 +1,28 @@
+# tests/test_records.py
+# Getter'lar dict yerine slotted kayıt döner; dict gibi okunabilir, kolon yolu aynı satırları verir.
+import pytest
+
+from services.records import TaskRow
+
+def test_rows_are_slotted_records_with_a_mapping_api(db):
+    tid = db.upsert_task(None, "rapor", "not", None)
+    (t,) = db.get_tasks()
+    assert isinstance(t, TaskRow) and not hasattr(t, "__dict__")
+    assert (t.id, t["title"], t.get("notes"), t.get("yok", 1)) == (tid, "rapor", "not", 1)
+    assert "status" in t and "yok" not in t
+    assert t.to_dict()["title"] == dict(t)["title"] == "rapor"
+    assert t.replace(title="x").title == "x" and t.title == "rapor"
+    with pytest.raises(KeyError):
+        t["yok"]
+
+def test_columnar_matches_get_tasks(db):
+    ids = [db.upsert_task(None, f"t{i}", "", None) for i in range(3)]
+    cols = db.get_tasks_columnar(("id", "title"))
+    rows = db.get_tasks()
+    assert cols == {"id": tuple(r.id for r in rows), "title": tuple(r.title for r in rows)}
+    assert sorted(cols["id"]) == sorted(ids)
+    with pytest.raises(ValueError):
+        db.get_tasks_columnar(("id", "password"))
+
+def test_columnar_on_an_empty_table(db):
+    assert db.get_tasks_columnar(("id", "title")) == {"id": (), "title": ()}
@@ -0,0 +1,69 @@
+# tests/test_recurring_occurrences.py
+# Açılmış tekrarlayan oluşumlar üst event'in id'sini taşır; taşınmaları seriyi değiştirmemeli.
+import types
+
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+from PyQt6 import QtCore, QtTest
+from widgets.calendar.week_view_editable import CalendarWeekView
+
+WEEK = ("2025-01-06T00:00:00", "2025-01-13T00:00:00")  # pazartesi-pazartesi
+
+@pytest.fixture
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+@pytest.fixture
+def series(db):
+    task = db.upsert_task(None, "standup", "", None)
+    eid = db.create_event(task, "2025-01-06T10:00:00", "2025-01-06T11:00:00",
+                          title="standup", rrule="RRULE=FREQ=DAILY;INTERVAL=1")
+    return eid
+
+def _view(app, db):
+    view = CalendarWeekView()
+    view.resize(900, 1500)
+    view.setAnchorDate(QtCore.QDate(2025, 1, 6))
+    view.setEvents(db.get_events_in_range(*WEEK, expand_recurring=True))
+    view.grab()  # paintEvent blok dikdörtgenlerini hesaplar
+    return view
+
+def _drag(view, idx):
+    r = view._event_rects[idx]
+    QtTest.QTest.mousePress(view, QtCore.Qt.MouseButton.LeftButton, pos=r.center())
+    QtTest.QTest.mouseMove(view, r.center() + QtCore.QPoint(0, 120))
+    QtTest.QTest.mouseRelease(view, QtCore.Qt.MouseButton.LeftButton, pos=r.center() + QtCore.QPoint(0, 120))
+
+def test_occurrences_carry_series_id(app, db, series):
+    view = _view(app, db)
+    occ = [b for b in view._events if b.occurrence_of is not None]
+    assert len(view._events) == 7 and len(occ) == 6
+    assert all(b.id == series and b.occurrence_of == series and b.read_only for b in occ)
+    assert len({b.occurrence_start for b in occ}) == 6
+
+def test_moving_an_occurrence_leaves_the_parent_unchanged(app, db, series):
+    from pages.planner_page import PlannerPage
+    before = db.get_event_by_id(series)
+    view = _view(app, db)
+    store = types.SimpleNamespace(get_event=db.get_event_by_id, move_event=db.move_event)
+    page = types.SimpleNamespace(store=store)
+    moved = []
+    view.blockMoved.connect(moved.append)
+    view.blockMoved.connect(lambda b: PlannerPage._on_block_moved(page, b))
+
+    idx = next(i for i, b in enumerate(view._events) if b.occurrence_of is not None and b.start.day == 8)
+    _drag(view, idx)
+    assert moved == []
+    # sinyal bir şekilde gelse bile sayfa oluşumu seriye yazmaz
+    PlannerPage._on_block_moved(page, view._events[idx])
+    after = db.get_event_by_id(series)
+    assert (after["start_ts"], after["end_ts"], after["rrule"]) == (before["start_ts"], before["end_ts"], before["rrule"])
+
+def test_series_anchor_block_is_still_draggable(app, db, series):
+    view = _view(app, db)
+    moved = []
+    view.blockMoved.connect(moved.append)
+    idx = next(i for i, b in enumerate(view._events) if b.occurrence_of is None)
+    _drag(view, idx)
+    assert moved and moved[-1].id == series
@@ -0,0 +1,41 @@
+# tests/test_row_cache.py
+# id ile okuma önbelleği: eski (yeniden anahtarlanmış) id'yle okunan kayıt, yeni id'ye yazılınca bayatlamamalı.
+from services import ids
+from services.local_db import _rekey_row
+
+def _legacy_task(db, old_id, title):
+    db.merge_rows("tasks", [{"id": old_id, "title": title, "notes": "", "status": "todo",
+                             "updated_at": "2025-01-01T00:00:00"}])
+    new_id = ids.new_id()
+    with db.transaction():
+        _rekey_row(db._conn, "tasks", old_id, new_id)
+    db.clear_caches()
+    return new_id
+
+def test_alias_lookup_follows_writes_to_the_new_id(db):
+    new_id = _legacy_task(db, 5, "eski")
+    assert db.get_task_by_id(5)["id"] == new_id
+    assert db.get_task_by_id(5)["title"] == "eski"  # önbellekten
+
+    db.upsert_task(new_id, "yeni", "", None)
+    assert db.get_task_by_id(5)["title"] == "yeni"
+    assert db.get_task_by_id(new_id)["title"] == "yeni"
+
+def test_alias_lookup_is_cached_while_the_table_is_unchanged(db):
+    _legacy_task(db, 7, "eski")
+    db.get_task_by_id(7)
+    hits = db._alias_cache.hits
+    db.get_task_by_id(7)
+    assert db._alias_cache.hits == hits + 1
+
+def test_move_does_not_rewrite_other_fields(db):
+    # sürükleme önbellekteki eski satırı okuyup geri yazmaz; yalnızca zaman gider
+    task = db.upsert_task(None, "rapor", "", None)
+    eid = db.create_event(task, "2025-01-06T10:00:00", "2025-01-06T11:00:00", title="eski")
+    db.update_event(eid, "2025-01-06T10:00:00", "2025-01-06T11:00:00", title="yeni", notes="n")
+    db.dequeue_all()
+    db.move_event(eid, "2025-01-06T12:00:00", "2025-01-06T13:00:00")
+    ev = db.get_event_by_id(eid)
+    assert (ev["title"], ev["notes"], ev["start_ts"]) == ("yeni", "n", "2025-01-06T12:00:00")
+    (item,) = db.dequeue_all()
+    assert item["payload"] == {"id": eid, "start_ts": "2025-01-06T12:00:00", "end_ts": "2025-01-06T13:00:00"}
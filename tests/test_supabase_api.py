@@ -0,0 +1,153 @@
+# tests/test_supabase_api.py
+# Toplu upsert/silme: parçalama ve 4xx'te ikiye bölerek hatalı satırın bulunması; yeniden deneme
+# ve timeout politikası (Session sahte).
+import json
+from urllib.parse import unquote
+
+import pytest
+
+requests = pytest.importorskip("requests")
+from services import supabase_api as api
+
+class _Resp:
+    def __init__(self, status_code: int, body=None):
+        self.status_code = status_code
+        self.headers = {}
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+class _Session:
+    """Gövdesinde/URL'inde 'bad' id'lerden biri olan isteği 400 ile reddeder."""
+    def __init__(self, bad_ids=(), status=400):
+        self.bad_ids = set(bad_ids)
+        self.status = status
+        self.calls = []
+
+    def request(self, method, url, **kw):
+        if method == "POST":
+            ids = [row.get("id") for row in json.loads(kw["data"])]
+        else:
+            ids = [int(x) for x in unquote(url).split("id=in.(", 1)[1].rstrip(")").split(",")]
+        self.calls.append((method, ids))
+        if self.bad_ids & set(ids):
+            return _Resp(self.status, {"message": "rejected"})
+        return _Resp(204)
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(**kw):
+        s = _Session(**kw)
+        monkeypatch.setattr(api, "_get_session", lambda: s)
+        monkeypatch.setattr(api.time, "sleep", lambda secs: None)
+        return s
+    return install
+
+def test_upsert_many_bisects_to_bad_rows(session, monkeypatch):
+    s = session(bad_ids={3, 7})
+    monkeypatch.setattr(api, "BATCH_MAX_ROWS", 4)
+    rows = [{"id": i, "title": f"t{i}", "status": "todo"} for i in range(1, 11)]
+    errors = api.upsert_tasks(rows)
+    assert set(errors) == {2, 6}  # girdi indeksleri
+    assert all("rejected" in e for e in errors.values())
+    # ilk istekler parça sınırına uyar; iyi satırların hepsi bir kez başarıyla gitmiştir
+    assert [len(ids) for _, ids in s.calls[:1]] == [4]
+    ok = [i for _, ids in s.calls for i in ids if not ({3, 7} & set(ids))]
+    assert sorted(ok) == [i for i in range(1, 11) if i not in (3, 7)]
+
+def test_upsert_many_groups_by_key_set(session):
+    s = session()
+    errors = api.upsert_tasks([{"id": 1, "title": "a"}, {"id": 2, "status": "done"}, {"id": 3, "title": "c"}])
+    assert errors == {}
+    assert sorted(ids for _, ids in s.calls) == [[1, 3], [2]]
+
+def test_delete_many_chunks_and_bisects(session, monkeypatch):
+    s = session(bad_ids={5})
+    monkeypatch.setattr(api, "DELETE_MAX_IDS", 3)
+    errors = api.delete_events(range(7))
+    assert set(errors) == {5}
+    assert s.calls[:3] == [("DELETE", [0, 1, 2]), ("DELETE", [3, 4, 5]), ("DELETE", [3])]
+
+def test_server_error_is_raised_not_bisected(session):
+    s = session(bad_ids={1}, status=500)
+    with pytest.raises(requests.HTTPError):
+        api.upsert_tasks([{"id": 1, "title": "a"}, {"id": 2, "title": "b"}])
+    assert len(s.calls) == 1
+
+class _Script:
+    """Sırayla verilen yanıtları döndürür ya da istisnaları fırlatır."""
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kw):
+        self.calls.append((method, kw.get("timeout")))
+        out = self.outcomes.pop(0)
+        if isinstance(out, BaseException):
+            raise out
+        return out
+
+@pytest.fixture
+def script(monkeypatch):
+    sleeps = []
+    def install(*outcomes):
+        s = _Script(*outcomes)
+        s.sleeps = sleeps
+        monkeypatch.setattr(api, "_get_session", lambda: s)
+        monkeypatch.setattr(api.time, "sleep", sleeps.append)
+        return s
+    return install
+
+def test_get_retries_transient_errors_with_timeouts(script):
+    s = script(requests.ConnectionError("reset"), _Resp(503), _Resp(200, [{"id": 1, "name": "a"}]), _Resp(200, []))
+    assert api.fetch_tags() == [{"id": 1, "name": "a"}]
+    assert len(s.calls) == 4 and len(s.sleeps) == 2
+    assert all(t == (api.CONNECT_TIMEOUT, api.READ_TIMEOUT) for _, t in s.calls)
+    assert all(0 <= d <= api.BACKOFF_MAX for d in s.sleeps)
+
+def test_retry_after_header_is_honoured(script):
+    busy = _Resp(429)
+    busy.headers["Retry-After"] = "2"
+    s = script(busy, _Resp(200, []))
+    assert api.fetch_tags() == []
+    assert s.sleeps == [2.0]
+
+def test_gives_up_after_max_retries(script, monkeypatch):
+    monkeypatch.setattr(api, "MAX_RETRIES", 2)
+    s = script(*[requests.ReadTimeout("slow")] * 3)
+    with pytest.raises(requests.ReadTimeout):
+        api.fetch_tags()
+    assert len(s.calls) == 3
+
+def test_insert_without_id_is_not_retried(script):
+    # id'siz upsert tekrarlanırsa sunucuda çift satır oluşabilir
+    s = script(requests.ReadTimeout("slow"))
+    with pytest.raises(requests.ReadTimeout):
+        api.upsert_tasks([{"title": "a"}])
+    assert len(s.calls) == 1
+    s = script(_Resp(503))
+    with pytest.raises(requests.HTTPError):
+        api.upsert_tasks([{"title": "a"}])
+    assert len(s.calls) == 1
+
+def test_connect_timeout_is_retried_even_for_inserts(script):
+    s = script(requests.ConnectTimeout("no route"), _Resp(204))
+    assert api.upsert_tasks([{"title": "a"}]) == {}
+    assert len(s.calls) == 2
+
+def test_session_is_shared_and_rebuilt_on_pool_resize(monkeypatch):
+    monkeypatch.setattr(api, "_session", None)
+    monkeypatch.setattr(api, "POOL_SIZE", api.POOL_SIZE)
+    first = api._get_session()
+    assert api._get_session() is first
+    api.configure(pool_size=api.POOL_SIZE + 1)
+    second = api._get_session()
+    assert second is not first
+    assert second.get_adapter("https://x").poolmanager.connection_pool_kw["maxsize"] == api.POOL_SIZE
+    api.close()
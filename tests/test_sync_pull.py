@@ -0,0 +1,97 @@
+# tests/test_sync_pull.py
+# SyncOrchestrator ağ işleri: çekimde watermark yalnızca çekim tamamlanınca ilerler; gönderim ağ thread'indedir.
+import pytest
+
+pytest.importorskip("requests")
+QtCore = pytest.importorskip("PyQt6.QtCore")
+from services import sync_orchestrator as so
+
+T0 = "2025-01-01T00:00:00Z"
+T1 = "2025-01-02T00:00:00Z"
+
+@pytest.fixture
+def store(tmp_path, qapp):
+    s = so.SyncOrchestrator(db_path=str(tmp_path / "sync.db"))
+    yield s
+    s.shutdown()
+
+def _serve(monkeypatch, tables, count=None):
+    """tables: {tablo: [sayfa | Exception]}; delta'da since'i yok sayar."""
+    def pages(table):
+        def it(since=None):
+            for p in tables.get(table, []):
+                if isinstance(p, Exception):
+                    raise p
+                yield p
+        return it
+    monkeypatch.setattr(so, "_PAGES_API", {t: pages(t) for t in so.PULL_TABLES})
+    monkeypatch.setattr(so.api, "count_rows", count or (lambda table: sum(
+        len(p) for p in tables.get(table, []) if not isinstance(p, Exception))))
+
+def test_full_pull_sets_watermark_after_last_page(store, monkeypatch):
+    _serve(monkeypatch, {"tasks": [[{"id": 1, "title": "a", "updated_at": T1}],
+                                   [{"id": 2, "title": "b", "updated_at": T0}]]})
+    store._pull()
+    state = store._actor.call("get_sync_state", "tasks")
+    assert state["watermark"] == so.to_epoch(T1) and state["full_at"] is not None
+    assert sorted(t["id"] for t in store._actor.call("get_tasks")) == [1, 2]
+
+def test_failed_delta_does_not_advance_watermark(store, monkeypatch):
+    _serve(monkeypatch, {"tasks": [[{"id": 1, "title": "a", "updated_at": T0}]]})
+    store._pull()
+    before = store._actor.call("get_sync_state", "tasks")
+
+    # ilk sayfada daha yeni bir satır, ikinci sayfa (daha eski updated_at'li satırlar) gelemedi
+    err = ConnectionError("offline")
+    _serve(monkeypatch, {"tasks": [[{"id": 5, "title": "new", "updated_at": T1}], err]})
+    store._pull()
+    after = store._actor.call("get_sync_state", "tasks")
+    assert after["watermark"] == before["watermark"]
+    assert store._actor.call("get_task_by_id", 5) is not None  # yazılan sayfa kalır
+
+def test_delta_prunes_rows_deleted_on_server(store, monkeypatch):
+    rows = [{"id": i, "title": str(i), "updated_at": T0} for i in (1, 2, 3)]
+    _serve(monkeypatch, {"tasks": [rows]})
+    store._pull()
+    _serve(monkeypatch, {"tasks": []}, count=lambda table: 2 if table == "tasks" else 0)
+    monkeypatch.setattr(so.api, "fetch_ids", lambda table: [1, 3])
+    store._pull()
+    assert sorted(t["id"] for t in store._actor.call("get_tasks")) == [1, 3]
+
+def test_drain_tick_runs_off_the_gui_thread(store, monkeypatch):
+    import threading
+    threads = []
+    monkeypatch.setattr(store, "drain_queue", lambda *a: threads.append(threading.current_thread()))
+    store._on_drain_tick()
+    assert "drain" in store._net_pending
+    store._on_drain_tick()  # önceki bitmeden ikinci iş eklenmez
+    store._net.submit(lambda: None).result()
+    assert len(threads) == 1 and threads[0] is not threading.current_thread()
+
+def test_tables_download_concurrently_and_apply_in_dependency_order(store, monkeypatch):
+    import threading
+    barrier = threading.Barrier(len(so.PULL_TABLES), timeout=5)
+    rows = {"tags": [{"id": 1, "name": "work", "updated_at": T0}],
+            "tasks": [{"id": 2, "title": "a", "tag_id": 1, "updated_at": T0}],
+            "events": [{"id": 3, "task_id": 2, "title": "e", "starts_at": T0, "ends_at": T1, "updated_at": T0}]}
+
+    def pages(table):
+        def it(since=None):
+            barrier.wait()  # üç indirme aynı anda sürmüyorsa zaman aşımı
+            yield rows[table]
+        return it
+    monkeypatch.setattr(so, "_PAGES_API", {t: pages(t) for t in so.PULL_TABLES})
+    monkeypatch.setattr(so.api, "count_rows", lambda table: 1)
+
+    merged = []
+    submit = store._actor.submit
+    def spy(cmd, *args, **kw):
+        if cmd == "merge_rows":
+            merged.append(args[0])
+        return submit(cmd, *args, **kw)
+    monkeypatch.setattr(store._actor, "submit", spy)
+
+    store._pull(full=True)
+    assert not barrier.broken
+    assert merged == ["tags", "tasks", "events"]
+    assert store._actor.call("get_task_by_id", 2)["tag_id"] == 1
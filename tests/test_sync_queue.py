@@ -0,0 +1,53 @@
+# tests/test_sync_queue.py
+# sync_queue: aynı satırın kayıtlarının birleştirilmesi ve lease/ack ile gönderim.
+import json
+
+def _queued(db):
+    return [(r["op"], json.loads(r["payload"]))
+            for r in db._conn.execute("SELECT op, payload FROM sync_queue ORDER BY id")]
+
+def test_successive_edits_coalesce_into_the_create(db):
+    task = db.upsert_task(None, "rapor", "", None)
+    db.set_task_status(task, "doing")
+    db.set_task_status(task, "done")
+    ((op, payload),) = _queued(db)
+    assert op == "insert" and payload["title"] == "rapor" and payload["status"] == "done"
+    assert db.queue_stats()["coalesced"] == 2
+
+def test_insert_then_delete_leaves_nothing(db):
+    task = db.upsert_task(None, "rapor", "", None)
+    db.delete_task(task)
+    assert _queued(db) == []
+    assert db.queue_stats()["cancelled"] == 1
+
+def test_upsert_then_delete_collapses_to_delete(db):
+    task = db.upsert_task(None, "rapor", "", None)
+    db.ack([it["id"] for it in db.claim_batch(10)])
+    db.set_task_status(task, "done")
+    db.delete_task(task)
+    assert _queued(db) == [("delete", {"id": task})]
+
+def test_compact_queue_merges_uncoalesced_rows(db):
+    rows = [("upsert", {"id": 5, "title": "a"}), ("upsert", {"id": 5, "status": "done"}),
+            ("insert", {"id": 6, "title": "b"}), ("delete", {"id": 6})]
+    db._conn.executemany("INSERT INTO sync_queue(table_name, op, payload, row_id) VALUES ('tasks', ?, ?, ?)",
+                         [(op, json.dumps(p), p["id"]) for op, p in rows])
+    db._conn.commit()
+    assert db.compact_queue() == 3
+    assert _queued(db) == [("upsert", {"id": 5, "title": "a", "status": "done"})]
+
+def test_edit_after_lease_expiry_survives_ack(db):
+    task = db.upsert_task(None, "rapor", "", None)
+    (item,) = db.claim_batch(10, lease_secs=0)  # gönderim lease'ten uzun sürdü
+    db.set_task_status(task, "done")
+    db.ack([item["id"]])
+    ((op, payload),) = _queued(db)
+    assert op == "upsert" and payload["status"] == "done"
+
+def test_released_entry_coalesces_again(db):
+    task = db.upsert_task(None, "rapor", "", None)
+    db.release([it["id"] for it in db.claim_batch(10)])
+    db.set_task_status(task, "done")
+    assert len(_queued(db)) == 1
+    db.compact_queue()
+    assert len(_queued(db)) == 1
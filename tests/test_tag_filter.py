@@ -0,0 +1,43 @@
+# tests/test_tag_filter.py
+# Etiket filtresi: "All" (id None) ve boş küme filtreyi kaldırır.
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+from widgets.layout.left_panel import LeftPanel
+
+@pytest.fixture
+def panel(qapp):
+    p = LeftPanel()
+    emitted = []
+    p.tagsChanged.connect(emitted.append)
+    p.applyServerTags([(1, "work"), (2, "home")])
+    emitted.clear()
+    p.emitted = emitted
+    yield p
+    p.deleteLater()
+
+def test_all_entry_clears_the_filter(panel):
+    assert panel.tags.currentId() is None
+    panel.tags._buttons[2].click()
+    panel.tags._buttons[None].click()
+    assert panel.emitted == [{2}, set()]
+    assert panel.tags._buttons[None].isChecked() and not panel.tags._buttons[2].isChecked()
+
+def test_refresh_keeps_selection_and_drops_a_deleted_tag(panel):
+    panel.tags._buttons[2].click()
+    panel.applyServerTags([(1, "work"), (2, "home"), (3, "gym")])
+    assert panel.tags.currentId() == 2
+    panel.applyServerTags([(1, "work")])
+    assert panel.tags.currentId() is None
+    assert panel.emitted == [{2}, set()]
+
+def test_empty_tag_set_means_unfiltered(panel, tmp_path):
+    from services import sync_orchestrator as so
+    store = so.SyncOrchestrator(db_path=str(tmp_path / "store.db"))
+    try:
+        store.set_tag_filter({3})
+        assert store._tag_filter == frozenset({3})
+        store.set_tag_filter(set())
+        assert store._tag_filter is None
+    finally:
+        store.shutdown()
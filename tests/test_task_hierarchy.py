@@ -0,0 +1,50 @@
+# tests/test_task_hierarchy.py
+# task_closure: alt ağaç sorguları, taşıma, proje toplamları ve alt ağaç durum değişikliği.
+import pytest
+
+@pytest.fixture
+def tree(db):
+    """proje > (a > a1), b"""
+    proj = db.upsert_task(None, "proje", "", None)
+    a = db.upsert_task(None, "a", "", None)
+    a1 = db.upsert_task(None, "a1", "", None)
+    b = db.upsert_task(None, "b", "", None)
+    db.set_task_parent(a, proj)
+    db.set_task_parent(a1, a)
+    db.set_task_parent(b, proj)
+    return proj, a, a1, b
+
+def test_subtree_and_ancestors(db, tree):
+    proj, a, a1, b = tree
+    assert {t.id for t in db.get_subtree(proj)} == {proj, a, a1, b}
+    assert [t.id for t in db.get_subtree(a, include_self=False)] == [a1]
+    assert [t.id for t in db.get_ancestors(a1)] == [proj, a]
+    h = db.get_task_hierarchy()
+    assert h[a1] == {"parent_id": a, "parent": "a", "project_id": proj, "project": "proje"}
+
+def test_moving_a_subtree_updates_the_closure(db, tree):
+    proj, a, a1, b = tree
+    db.set_task_parent(a, b)
+    assert [t.id for t in db.get_ancestors(a1)] == [proj, b, a]
+    db.set_task_parent(a, None)
+    assert [t.id for t in db.get_ancestors(a1)] == [a]
+    assert {t.id for t in db.get_subtree(proj)} == {proj, b}
+
+def test_cannot_move_under_own_descendant(db, tree):
+    proj, a, a1, _ = tree
+    with pytest.raises(ValueError):
+        db.set_task_parent(a, a1)
+    assert [t.id for t in db.get_ancestors(a1)] == [proj, a]
+
+def test_project_rollup_and_subtree_status(db, tree):
+    proj, a, a1, b = tree
+    for t in (proj, a1, b):
+        db.insert_pomodoro_session(t, "2025-01-06T11:00:00+00:00", "2025-01-06T12:00:00+00:00", 1500, 1000, "")
+    (row,) = db.pomodoro_rollup("project")
+    assert (row["project_id"], row["actual_secs"]) == (proj, 3000)
+    assert [r["task_id"] for r in db.pomodoro_rollup("task", under=a)] == [a1]
+
+    assert db.set_subtree_status(a, "done") == 2
+    assert {t.id: t.status for t in db.get_subtree(proj)}[b] != "done"
+    assert db.get_task_by_id(a1)["status"] == "done"
+    assert db.set_subtree_status(a, "done") == 0
@@ -0,0 +1,50 @@
+# tests/test_transactions.py
+# LocalDB.transaction(): iç içe çağrılar tek commit; hata tüm iş birimini geri alır.
+import sqlite3
+
+import pytest
+
+from services.local_db import LocalDB
+
+def _titles(path):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(r[0] for r in conn.execute("SELECT title FROM tasks"))
+    finally:
+        conn.close()
+
+def test_failed_unit_of_work_rolls_back_every_write(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            task = db.upsert_task(None, "a", "", None)
+            db.set_task_status(task, "done")
+            raise RuntimeError("boom")
+    assert db.get_tasks() == []
+    assert db.queue_stats()["depth"] == 0
+
+def test_nested_writes_commit_once_at_the_outermost_level(db):
+    with db.transaction():
+        db.upsert_task(None, "a", "", None)
+        with db.transaction():
+            db.upsert_task(None, "b", "", None)
+        assert _titles(db.path) == []  # başka bağlantı henüz görmez
+    assert _titles(db.path) == ["a", "b"]
+
+def test_run_batch_is_atomic(db):
+    with pytest.raises(ZeroDivisionError):
+        db.run_batch([lambda d: d.upsert_task(None, "a", "", None), lambda d: 1 / 0])
+    assert db.get_tasks() == []
+    (tid,) = db.run_batch([lambda d: d.upsert_task(None, "a", "", None)])
+    assert db.get_task_by_id(tid)["title"] == "a"
+
+def test_durability_profiles(tmp_path):
+    db = LocalDB(str(tmp_path / "d.db"), durability="safe")
+    try:
+        assert db._conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        db.set_durability("balanced")
+        assert db._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        with pytest.raises(ValueError):
+            db.set_durability("turbo")
+    finally:
+        db.close()
@@ -0,0 +1,48 @@
+# utils/timeutil.py
+# Tek zaman dilimi politikası:
+#   - Tüm zaman damgaları UTC kabul edilir.
+#   - TZ içeren değerler (…Z, …+03:00) UTC'ye çevrilir.
+#   - TZ içermeyen (naive) değerler UTC'dir. UI'nin takvim saatleri (QDateTime ISODate)
+#     de TZ'siz yazıldığı için "floating" duvar saati olarak UTC'de durur; sunucuya 'Z'
+#     ile gider ve aynı duvar saatiyle geri gelir.
+# SQLite'ın strftime('%s', …) yorumu da aynıdır; LocalDB'deki *_epoch kolonları buna dayanır.
+
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+
+_EPOCH = datetime(1970, 1, 1)
+
+def utc_now_iso(timespec: str = "auto") -> str:
+    """Şu an, naive UTC ISO string."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec=timespec)
+
+def parse_ts(s: str | None) -> datetime | None:
+    """ISO string -> naive UTC datetime (politikaya göre). Geçersizse None."""
+    if not s:
+        return None
+    try:
+        d = datetime.fromisoformat(str(s).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if d.tzinfo is not None:
+        d = d.astimezone(timezone.utc).replace(tzinfo=None)
+    return d
+
+def to_epoch(s: str | None) -> int | None:
+    d = parse_ts(s)
+    return None if d is None else int((d - _EPOCH).total_seconds() // 1)
+
+def from_epoch(e: int | None) -> datetime | None:
+    """Epoch saniye -> naive UTC datetime (takvimde gösterilecek duvar saati)."""
+    return None if e is None else _EPOCH + timedelta(seconds=int(e))
+
+def to_iso(e: int | None) -> str | None:
+    d = from_epoch(e)
+    return None if d is None else d.isoformat()
+
+def to_server_ts(s: str | None) -> str | None:
+    """timestamptz için açık UTC ('…Z'); çözümlenemeyen değerler olduğu gibi döner."""
+    d = parse_ts(s)
+    if d is None:
+        return s
+    return d.isoformat() + "Z"
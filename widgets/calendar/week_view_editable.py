@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from typing import List, Tuple, Dict, Iterable, Any
 from PyQt6 import QtCore, QtGui, QtWidgets
 from PyQt6.QtCore import QDate
+from utils.timeutil import from_epoch, parse_ts
 from theme.colors import COLOR_PRIMARY_BG, COLOR_SECONDARY_BG, COLOR_TEXT, COLOR_TEXT_MUTED, COLOR_ACCENT
 
 @dataclass
@@ -16,6 +17,14 @@ class EventBlock:
     # opsiyonel not/rrule alanları UI tarafında taşınabilir
     notes: str | None = None
     rrule: str | None = None
+    # Tekrarlayan serinin açılmış oluşumu: id üst event'in id'sidir. Oluşumlar sürüklenemez
+    # (taşımak serinin başlangıcını değiştirirdi); düzenleme seriyi açar.
+    occurrence_of: int | None = None
+    occurrence_start: int | None = None  # oluşumun UTC epoch başlangıcı
+
+    @property
+    def read_only(self) -> bool:
+        return self.occurrence_of is not None
 
 class CalendarWeekView(QtWidgets.QWidget):
     blockCreated   = QtCore.pyqtSignal(object)
@@ -56,16 +65,21 @@ class CalendarWeekView(QtWidgets.QWidget):
     def setEvents(self, events: Iterable[dict]):
         """Replace current events with those from ``events``.
 
-        Each ``events`` item should contain ISO formatted ``start`` and ``end``
-        datetimes and may optionally include ``title``, ``id``, ``notes`` and
-        ``rrule`` fields.
+        Each ``events`` item should contain LocalDB's UTC ``start_epoch``/
+        ``end_epoch`` or ISO formatted ``start``/``end`` datetimes and may
+        optionally include ``title``, ``id``, ``notes`` and ``rrule`` fields.
+        Expanded recurring occurrences carry ``occurrence_of`` (the series id)
+        and become read-only blocks.
         """
         self._events.clear()
         for ev in events:
-            try:
-                start = datetime.fromisoformat(ev["start"])
-                end = datetime.fromisoformat(ev["end"])
-            except Exception:
+            if ev.get("start_epoch") is not None and ev.get("end_epoch") is not None:
+                start = from_epoch(ev["start_epoch"])
+                end = from_epoch(ev["end_epoch"])
+            else:
+                start = parse_ts(ev.get("start") or ev.get("start_ts"))
+                end = parse_ts(ev.get("end") or ev.get("end_ts"))
+            if start is None or end is None:
                 continue
             block = EventBlock(
                 task_id=int(ev.get("task_id") or ev.get("taskId") or 0),
@@ -75,6 +89,8 @@ class CalendarWeekView(QtWidgets.QWidget):
                 id=int(ev["id"]) if ev.get("id") is not None else None,
                 notes=ev.get("notes"),
                 rrule=ev.get("rrule"),
+                occurrence_of=int(ev["occurrence_of"]) if ev.get("occurrence_of") is not None else None,
+                occurrence_start=ev.get("start_epoch") if ev.get("occurrence_of") is not None else None,
             )
             self._events.append(block)
         self.update()
@@ -112,7 +128,7 @@ class CalendarWeekView(QtWidgets.QWidget):
     def mousePressEvent(self, e: QtGui.QMouseEvent):
         if e.button() in (QtCore.Qt.MouseButton.RightButton, QtCore.Qt.MouseButton.LeftButton):
             idx = self._hit_test(e.position().toPoint())
-            if idx != -1:
+            if idx != -1 and not self._events[idx].read_only:
                 self._active_index = idx
                 r = self._event_rects.get(idx)
                 if r and r.bottom()-6 <= e.position().y() <= r.bottom()+6:
@@ -145,7 +161,7 @@ class CalendarWeekView(QtWidgets.QWidget):
         pos = e.position().toPoint()
         idx = self._hit_test(pos)
         if self._drag_mode is None:
-            if idx != -1:
+            if idx != -1 and not self._events[idx].read_only:
                 r = self._event_rects.get(idx)
                 if r and r.bottom()-6 <= pos.y() <= r.bottom()+6:
                     self.setCursor(QtCore.Qt.CursorShape.SizeVerCursor)
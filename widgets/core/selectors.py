@@ -4,7 +4,7 @@ from theme.colors import COLOR_TEXT, COLOR_SECONDARY_BG, COLOR_ACCENT
 
 class SlidingSelector(QtWidgets.QFrame):
     """Dikey tek-seçim klasör listesi (şeffaf zemin, aktif= koyu gri arka plan)."""
-    changed = QtCore.pyqtSignal(int)  # seçilen id
+    changed = QtCore.pyqtSignal(object)  # seçilen id (TagFolderList'te "All" için None)
 
     def __init__(self, parent=None, item_height=36, radius=12):
         super().__init__(parent)
@@ -77,13 +77,21 @@ class SlidingSelector(QtWidgets.QFrame):
     def currentId(self):
         return self._current_id
 
-    def setCurrentById(self, _id: int):
+    def setCurrentById(self, _id: int | None):
         if _id not in self._buttons:
             return
-        if self._current_id is not None and self._current_id in self._buttons:
+        if self._current_id in self._buttons:
             self._buttons[self._current_id].setChecked(False)
         self._buttons[_id].setChecked(True)
         self._current_id = _id
 
 class TagFolderList(SlidingSelector):
-    pass
+    """Etiket klasörleri; en üstteki "All" (id None) filtreyi kaldırır."""
+    ALL_LABEL = "All"
+
+    def setItems(self, items: List[Tuple[int, str]]):
+        # liste yenilenince seçim korunur; seçili etiket silindiyse "All"a düşer
+        prev = self._current_id
+        super().setItems([(None, self.ALL_LABEL)] + list(items))
+        if prev in self._buttons:
+            self.setCurrentById(prev)
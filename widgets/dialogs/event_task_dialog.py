@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
-from datetime import datetime
+from utils.timeutil import from_epoch, parse_ts
 
 from PyQt6 import QtCore, QtWidgets
 
@@ -103,9 +103,9 @@ class EventTaskDialog(QtWidgets.QDialog):
         rlo.setContentsMargins(12, 12, 12, 12)
         rlo.setSpacing(8)
 
-        lbl_hist = QtWidgets.QLabel("Pomodorolar")
-        lbl_hist.setStyleSheet("font-weight:600;")
-        rlo.addWidget(lbl_hist)
+        self.lbl_hist = QtWidgets.QLabel("Pomodorolar")
+        self.lbl_hist.setStyleSheet("font-weight:600;")
+        rlo.addWidget(self.lbl_hist)
 
         self.list_pomo = QtWidgets.QListWidget()
         self.list_pomo.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
@@ -207,12 +207,19 @@ class EventTaskDialog(QtWidgets.QDialog):
             sessions = self.store.get_pomodoro_sessions(task_id)  # type: ignore[attr-defined]
         except Exception:
             sessions = []
+        try:
+            totals = self.store.get_pomodoro_rollup("task", task_id=task_id)  # type: ignore[attr-defined]
+        except Exception:
+            totals = []
+        if totals and totals[0]["sessions"]:
+            t = totals[0]
+            ratio = f" · plan %{round(t['ratio'] * 100)}" if t["ratio"] else ""
+            self.lbl_hist.setText(f"Pomodorolar — {t['sessions']} × {int(t['actual_secs']) // 60}m{ratio}")
+        else:
+            self.lbl_hist.setText("Pomodorolar")
 
         for s in sessions:
-            try:
-                ended = datetime.fromisoformat(s["ended_at"])
-            except Exception:
-                ended = None
+            ended = from_epoch(s.get("ended_epoch")) if s.get("ended_epoch") is not None else parse_ts(s["ended_at"])
             dur_m = int(max(1, s["actual_secs"])) // 60
             plan_m = int(max(1, s["planned_secs"])) // 60
             title = f"{ended.strftime('%d %b %H:%M') if ended else s['ended_at']} — {dur_m}m (plan:{plan_m}m)"
@@ -65,12 +65,18 @@ class LeftPanel(QtWidgets.QWidget):
         self._store.tagsUpdated.connect(self._on_server_tags)
 
     def applyServerTags(self, items: list[tuple[int,str]]):
+        self._set_tag_items(items)
+
+    def _set_tag_items(self, items: list[tuple[int,str]]):
         self.tags.setItems(items)
+        if self.tags.currentId() != self._current_tid:
+            # seçili etiket artık yok -> "All"; filtreyi de kaldır
+            self._on_tag_changed(self.tags.currentId())
 
     # ---- UI handlers ----
-    def _on_tag_changed(self, tid: int):
+    def _on_tag_changed(self, tid: int | None):
         self._current_tid = tid
-        self.tagsChanged.emit({tid})
+        self.tagsChanged.emit(set() if tid is None else {tid})
 
     def _toggle_new_bar(self):
         show = not self.new_bar.isVisible()
@@ -93,12 +99,13 @@ class LeftPanel(QtWidgets.QWidget):
         if self._current_tid is None: return
         if self._store:
             self._store.delete_tag(int(self._current_tid))
-        self._current_tid = None
+        self.tags.setCurrentById(None)
+        self._on_tag_changed(None)
 
     # ---- store callback ----
     def _on_server_tags(self, rows: list[dict]):
         items = [(int(r["id"]), r["name"]) for r in rows]
-        self.tags.setItems(items)
+        self._set_tag_items(items)
 
     # ---- public ----
     def setMonthNavIcons(self, prev_path, next_path, icon_px: int | None = None):
@@ -45,6 +45,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # Diğer sayfalar
         self.page_health = HealthActivityPage()
         self.page_perf   = PerformancePage()
+        self.page_perf.set_store(self.page_planner.store)
         self.page_journal= JournalPage()
         self.page_pomo   = self.page_planner.pomo
 
@@ -67,6 +68,9 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.nav.pageRequested.connect(self._on_page_requested)
 
+        # DB bakımı boştayken çalışır; girdi yalnızca bu pencerede izlenir
+        self.page_planner.store.start_maintenance(window=self)
+
         self.setCentralWidget(root)
         # arka planı tema rengine sabitle
         self.setStyleSheet(self.styleSheet() + f" QMainWindow {{ background: {COLOR_PRIMARY_BG}; }}")